@@ -367,7 +367,8 @@ function processReceiptsToPatches_(statementData, normalizedItems, lineToSheetRo
 
   const receipts = items.map((it) => ({
     gcsUri: it.gcsUri,
-    mime: it.mime || it.mimeType || null
+    mime: it.mime || it.mimeType || null,
+    sha256: it.sha256 || null
   })).filter((it) => !!it.gcsUri);
 
   const rows = [];
@@ -544,6 +545,8 @@ function runStage1Upload_(mode) {
     gcsUri: it.normalized?.gcsUri,
     mime: it.normalized?.mime,
     mimeType: it.normalized?.mime, // compat
+    sha256: it.normalized?.sha256 || null,
+    pages: it.normalized?.pages || null,
     normalizedIndex: String(idx).padStart(4, '0'),
     originalName: it.source?.originalName || null,
     driveFileId: it.source?.driveFileId || (it.source?.originalName ? driveIdByName.get(it.source.originalName) : null)
@@ -697,7 +700,8 @@ function stage2_process_receipts_tarjeta_(options) {
   const normalizedItems = getNormalizedItemsForMode_(st, 'tarjeta');
   const receipts = (normalizedItems || []).map((it) => ({
     gcsUri: it.gcsUri,
-    mime: it.mime || it.mimeType || null
+    mime: it.mime || it.mimeType || null,
+    sha256: it.sha256 || null
   })).filter((it) => !!it.gcsUri);
 
   if (!receipts.length) {
@@ -767,7 +771,8 @@ function stage2_process_analyze_efectivo_() {
 
   const receipts = (normalizedItems || []).map((it) => ({
     gcsUri: it.gcsUri,
-    mime: it.mime || it.mimeType || null
+    mime: it.mime || it.mimeType || null,
+    sha256: it.sha256 || null
   })).filter((it) => !!it.gcsUri);
 
   const rows = [];
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Throughput end-to-end de /v1/normalize contra un backend de storage local (file://) o en memoria."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+INPUT_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".pdf"}
+
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 48).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    buf = io.BytesIO()
+    Image.blend(noise, gradient, 0.5).save(buf, format="JPEG", quality=92)
+    return buf.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end de normalize sin bucket real.")
+    parser.add_argument("--inputs", help="Carpeta con imágenes/PDFs (default: fotos sintéticas)")
+    parser.add_argument("--count", type=int, default=20, help="Fotos sintéticas a generar (default: 20)")
+    parser.add_argument("--backend", choices=("file", "memory"), default="file", help="Storage de salida")
+    parser.add_argument("--out", help="Directorio de salida para file:// (default: temporal)")
+    parser.add_argument("--runs", type=int, default=2, help="Corridas (la 2da mide índice/journal; default: 2)")
+    args = parser.parse_args()
+
+    if args.backend == "memory":
+        os.environ["REN_GCS_BACKEND"] = "memory"
+    from src import gcs
+    from src.config import Settings
+    from src.execution import shutdown_cpu_pool
+    from src.models import NormalizeRequest
+    from src.services.normalize import run_normalize
+
+    if args.inputs:
+        paths = [p for p in sorted(Path(args.inputs).iterdir()) if p.suffix.lower() in INPUT_EXTS]
+        files = [(p.name, p.read_bytes()) for p in paths]
+    else:
+        files = [(f"foto_{i:03d}.jpg", synthetic_photo(3024, 4032)) for i in range(args.count)]
+    if not files:
+        print("No hay archivos para medir")
+        return
+
+    if args.backend == "memory":
+        prefix = "gs://bench/normalize/"
+    else:
+        out_dir = Path(args.out or tempfile.mkdtemp(prefix="bench_normalize_")).resolve()
+        prefix = f"file://{out_dir}/"
+        os.environ.setdefault("REN_LOCAL_STORAGE_ROOT", str(out_dir))
+    request = NormalizeRequest(
+        rendicionId="bench",
+        input={"files": [{"filename": name, "contentBase64": base64.b64encode(data).decode()} for name, data in files]},
+        output={"gcsPrefix": prefix},
+    )
+    input_mb = sum(len(data) for _, data in files) / 1e6
+    settings = Settings()
+    print(f"{len(files)} archivos, {input_mb:.1f} MB -> {prefix}")
+    try:
+        for run in range(1, args.runs + 1):
+            started = time.perf_counter()
+            response = asyncio.run(run_normalize(request, settings))
+            elapsed = time.perf_counter() - started
+            output_mb = sum(item.normalized.bytes or 0 for item in response.items) / 1e6
+            print(
+                f"corrida {run}: ok={response.ok} {elapsed:.2f}s  {len(files) / elapsed:.1f} archivos/s  "
+                f"{input_mb / elapsed:.1f} MB/s entrada  {output_mb:.1f} MB salida"
+            )
+    finally:
+        shutdown_cpu_pool()
+    print(json.dumps(gcs.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Mide latencia por imagen y memoria pico de la normalización para cada tier de resample."""
+
+from __future__ import annotations
+
+import argparse
+import io
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from src.utils import RESAMPLE_TIERS, decode_resized, ensure_rgb, image_to_jpeg_bytes  # noqa: E402
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    """Foto de comprobante simulada: ruido + gradiente, JPEG q92 con orientación EXIF 6."""
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 48).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    img = Image.blend(noise, gradient, 0.5)
+    exif = img.getexif()
+    exif[0x0112] = 6
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=92, exif=exif)
+    return buf.getvalue()
+
+
+def legacy(data: bytes, max_side: int, quality: int) -> bytes:
+    """Ruta anterior: decode completo, exif_transpose, LANCZOS, ensure_rgb."""
+    from PIL import Image, ImageOps
+
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    width, height = img.size
+    if max(width, height) > max_side:
+        scale = max_side / float(max(width, height))
+        img = img.resize((int(width * scale), int(height * scale)), Image.LANCZOS)
+    img = ensure_rgb(img)
+    return image_to_jpeg_bytes(img, quality)
+
+
+def _reset_peak_rss() -> None:
+    # Linux: "5" reinicia VmHWM; si no se puede, ru_maxrss arrastra el pico del padre.
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss está en KiB en Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _current_rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return _peak_rss_mb()
+
+
+def _run_tier(tier: str, images: list[bytes], max_side: int, quality: int, out) -> None:
+    _reset_peak_rss()
+    baseline = _current_rss_mb()
+    latencies = []
+    total_bytes = 0
+    for data in images:
+        started = time.perf_counter()
+        if tier == "anterior":
+            encoded = legacy(data, max_side, quality)
+        else:
+            encoded = image_to_jpeg_bytes(decode_resized(data, max_side, tier), quality)
+        latencies.append(time.perf_counter() - started)
+        total_bytes += len(encoded)
+    out.send((latencies, _peak_rss_mb() - baseline, total_bytes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de tiers de normalización de imágenes.")
+    parser.add_argument("--images", help="Carpeta con imágenes (default: fotos sintéticas)")
+    parser.add_argument("--count", type=int, default=8, help="Fotos sintéticas a generar (default: 8)")
+    parser.add_argument("--size", default="4032x3024", help="Tamaño de las fotos sintéticas (default: 4032x3024)")
+    parser.add_argument("--max-side", type=int, default=2000, help="Lado mayor destino (default: 2000)")
+    parser.add_argument("--quality", type=int, default=90, help="Calidad JPEG (default: 90)")
+    args = parser.parse_args()
+
+    if args.images:
+        images = [p.read_bytes() for p in sorted(Path(args.images).iterdir()) if p.suffix.lower() in IMAGE_EXTS]
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        images = [synthetic_photo(width, height) for _ in range(args.count)]
+    if not images:
+        print("No hay imágenes para medir")
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'tier':<10}{'imgs':>6}{'ms p50':>9}{'ms p95':>9}{'ms max':>9}{'pico MB':>10}{'MB salida':>11}")
+    for tier in ("anterior", *RESAMPLE_TIERS):
+        # Un proceso por tier para que ru_maxrss mida sólo ese tier.
+        recv, send = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_run_tier, args=(tier, images, args.max_side, args.quality, send))
+        proc.start()
+        latencies, peak_mb, total_bytes = recv.recv()
+        proc.join()
+        ms = sorted(v * 1000 for v in latencies)
+        p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+        print(
+            f"{tier:<10}{len(ms):>6}{statistics.median(ms):>9.1f}{p95:>9.1f}{ms[-1]:>9.1f}"
+            f"{peak_mb:>10.1f}{total_bytes / 1e6:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Compara el rasterizado de estados de cuenta: PNG serial (ruta anterior) vs motor paralelo."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "service"))
+
+from src.execution import cpu_count  # noqa: E402
+from src.rasterize import RasterOptions, rasterize_pdf  # noqa: E402
+
+
+def synthetic_statement(pages: int) -> bytes:
+    """PDF A4 con tabla de movimientos densa, parecido a un estado de cuenta escaneado."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((40, 50), f"ESTADO DE CUENTA - Página {p + 1}", fontsize=14)
+        y = 80
+        for row in range(55):
+            page.insert_text(
+                (40, y),
+                f"{(row % 28) + 1:02d}/10  COMPRA COMERCIO {p:02d}{row:03d} MONTEVIDEO   UYU {1234.56 + row * 7.3:>10.2f}",
+                fontsize=9,
+            )
+            page.draw_line((40, y + 3), (555, y + 3), color=(0.8, 0.8, 0.8), width=0.3)
+            y += 13
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def serial_png(pdf_bytes: bytes, max_side: int) -> list[bytes]:
+    """Ruta previa de process_statement: PNG página a página, sin tope de DPI."""
+    import fitz  # PyMuPDF
+
+    out = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            scale = max_side / max(page.rect.width, page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+            out.append(pix.tobytes("png"))
+    return out
+
+
+def _timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de rasterizado de PDFs de estado de cuenta.")
+    parser.add_argument("--pdf", help="PDF a usar (default: estado sintético)")
+    parser.add_argument("--pages", type=int, default=20, help="Páginas del PDF sintético (default: 20)")
+    parser.add_argument("--max-side", type=int, default=2000, help="Lado mayor en píxeles (default: 2000)")
+    parser.add_argument("--max-dpi", type=int, default=200, help="Tope de DPI del motor nuevo (default: 200)")
+    parser.add_argument("--quality", type=int, default=85, help="Calidad JPEG/WebP (default: 85)")
+    parser.add_argument("--workers", type=int, default=cpu_count(), help="Procesos (default: CPUs)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones; se informa el mejor tiempo")
+    args = parser.parse_args()
+
+    pdf_bytes = Path(args.pdf).read_bytes() if args.pdf else synthetic_statement(args.pages)
+
+    rows = []
+    seconds, pages = _timed(lambda: serial_png(pdf_bytes, args.max_side), args.repeat)
+    rows.append(("png serial (anterior)", seconds, sum(len(p) for p in pages), len(pages)))
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context("spawn")) as pool:
+        # Arranque de los procesos fuera de la medición (en el servicio el pool es persistente).
+        list(pool.map(abs, range(args.workers)))
+        for fmt in ("png", "jpeg", "webp"):
+            opts = RasterOptions(
+                max_side=args.max_side, fmt=fmt, quality=args.quality, max_dpi=args.max_dpi
+            )
+            for label, executor in ((f"{fmt} serial", None), (f"{fmt} x{args.workers}", pool)):
+                seconds, pages = _timed(
+                    lambda: rasterize_pdf(pdf_bytes, opts, executor=executor, workers=args.workers),
+                    args.repeat,
+                )
+                rows.append((label, seconds, sum(len(p.data) for p in pages), len(pages)))
+
+    base_seconds, base_bytes = rows[0][1], rows[0][2]
+    print(f"{'variante':<24}{'páginas':>8}{'segundos':>10}{'MB':>9}{'x tiempo':>10}{'x bytes':>9}")
+    for label, seconds, size, count in rows:
+        print(
+            f"{label:<24}{count:>8}{seconds:>10.2f}{size / 1e6:>9.2f}"
+            f"{base_seconds / seconds:>10.2f}{size / base_bytes:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
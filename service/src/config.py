@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -11,13 +13,91 @@ class Settings(BaseSettings):
         default=None,
         description="Default bucket to use when clients only provide prefixes.",
     )
+    gcs_backend: Literal["gcs", "memory"] = Field(
+        "gcs",
+        description="Storage behind gs:// URIs: Cloud Storage, or an in-process fake for tests/benchmarks.",
+    )
+    local_storage_root: str | None = Field(
+        default=None,
+        description="Enables file:// URIs, confined to this directory (unset = file:// rejected).",
+    )
+    gcs_pool_size: int = Field(
+        0,
+        description="HTTP connections in the shared GCS client pool; 0 = derived from normalize/offload workers.",
+        ge=0,
+    )
+    gcs_chunk_bytes: int = Field(
+        8 * 1024 * 1024,
+        description="Chunk size of resumable uploads; a failed chunk is retried on its own (multiple of 256 KiB).",
+        ge=256 * 1024,
+        multiple_of=256 * 1024,
+    )
+    gcs_resumable_threshold_bytes: int = Field(
+        8 * 1024 * 1024,
+        description="Uploads at least this large use chunked resumable uploads instead of a single request.",
+        ge=0,
+    )
+    gcs_composite_threshold_bytes: int = Field(
+        128 * 1024 * 1024,
+        description="Seekable uploads at least this large go as parallel parts composed server-side (0 = never).",
+        ge=0,
+    )
+    gcs_composite_parts: int = Field(
+        8,
+        description="Parts (and concurrent part uploads) of a parallel composite upload.",
+        ge=2,
+        le=32,
+    )
     drive_enabled: bool = Field(
         default=False,
         description="Whether Drive API is enabled and credentials can read/write Drive.",
     )
+    drive_chunk_bytes: int = Field(
+        8 * 1024 * 1024,
+        description="Chunk size for Drive media downloads and Drive->GCS streaming copies (multiple of 256 KiB).",
+        ge=256 * 1024,
+        multiple_of=256 * 1024,
+    )
+    drive_parallel_min_bytes: int = Field(
+        32 * 1024 * 1024,
+        description="Drive files at least this large are downloaded with parallel ranged requests (0 = never).",
+        ge=0,
+    )
+    drive_parallel_parts: int = Field(
+        4,
+        description="Concurrent ranged requests per large Drive download.",
+        ge=1,
+    )
+    fetch_workers: int = Field(
+        8,
+        description="Concurrent downloads per fetch_many call (finalize items, statement pages).",
+        ge=1,
+    )
+    fetch_timeout_seconds: float = Field(
+        60.0,
+        description="Connect/read timeout for signed URL downloads.",
+        gt=0,
+    )
+    fetch_cache_enabled: bool = Field(
+        True,
+        description="Read-through disk cache for fetched GCS/Drive documents (keyed by object version).",
+    )
+    fetch_cache_dir: str = Field(
+        "/tmp/ren-fetch-cache",
+        description="Directory of the fetch cache (instance-local).",
+    )
+    fetch_cache_max_bytes: int = Field(
+        256 * 1024 * 1024,
+        description="Total size of the fetch cache; least recently used files are evicted beyond it.",
+        ge=1,
+    )
 
     default_jpg_quality: int = Field(90, description="JPEG quality used when none is provided.")
     default_max_side_px: int = Field(2000, description="Max side in pixels when resizing images.")
+    default_resample: str = Field(
+        "balanced",
+        description='Default normalize decode/resize tier ("fast" | "balanced" | "archival").',
+    )
     default_pdf_mode: str = Field(
         "keep",
         description='Default PDF handling strategy ("keep" | "rasterize").',
@@ -45,13 +125,64 @@ class Settings(BaseSettings):
     )
     docflow_workers: int = Field(
         4,
-        description="Parallel workers for DocFlow per-file extraction.",
+        description="Max DocFlow per-file extractions in flight per request.",
+        ge=1,
+    )
+    docflow_scheduler_workers: int = Field(
+        16,
+        description="Extraction workers shared by all concurrent Stage 2 requests on the instance.",
+        ge=1,
+    )
+    docflow_max_inflight: int = Field(
+        16,
+        description="Upper bound for the adaptive (AIMD) limit on concurrent Gemini calls per instance.",
+        ge=1,
+    )
+    docflow_min_inflight: int = Field(
+        1,
+        description="Lower bound the adaptive limit shrinks to under sustained quota errors.",
+        ge=1,
+    )
+    docflow_limit_decrease: float = Field(
+        0.5,
+        description="Factor applied to the adaptive limit on a quota error (multiplicative decrease).",
+        gt=0,
+        lt=1,
+    )
+    docflow_prefetch: int = Field(
+        4,
+        description="Receipts downloaded ahead of extraction in process_receipts_batch (bounded look-ahead).",
         ge=1,
     )
-    docflow_batch_size: int = Field(
-        6,
-        description="Max docs per extraction batch inside process_receipts_batch.",
+    raster_format: Literal["png", "jpeg", "webp"] = Field(
+        "jpeg",
+        description="Image format for rasterized statement pages.",
+    )
+    raster_quality: int = Field(
+        85,
+        description="JPEG/WebP quality for rasterized statement pages.",
         ge=1,
+        le=100,
+    )
+    raster_max_dpi: int = Field(
+        200,
+        description="DPI cap when rasterizing PDF pages (small pages are not blown up to max side).",
+        ge=36,
+    )
+    statement_window_pages: int = Field(
+        0,
+        description="Pages per extraction window for long statements; longer PDFs are split and extracted concurrently (0 = one call).",
+        ge=0,
+    )
+    statement_window_overlap: int = Field(
+        1,
+        description="Pages shared by consecutive statement windows; rows repeated on shared pages are deduplicated (0 = none).",
+        ge=0,
+    )
+    cpu_workers: int = Field(
+        0,
+        description="Processes in the shared CPU pool (PDF rendering, normalize transforms); 0 = number of CPUs available.",
+        ge=0,
     )
     docflow_retry_max_attempts: int = Field(
         4,
@@ -73,11 +204,89 @@ class Settings(BaseSettings):
         description="Backoff multiplier for DocFlow retries.",
         ge=1.0,
     )
+    docflow_cache_enabled: bool = Field(
+        True,
+        description="Reuse DocFlow results for identical document + profile + model requests.",
+    )
+    docflow_cache_max_items: int = Field(
+        1024,
+        description="Max entries kept in the in-memory DocFlow result cache (LRU).",
+        ge=1,
+    )
+    docflow_cache_uri: str | None = Field(
+        default=None,
+        description="Persistent DocFlow result cache location (gs://bucket/prefix/ or a local directory).",
+    )
     normalize_workers: int = Field(
         4,
-        description="Parallel workers for /v1/normalize download + processing.",
+        description="Parallel workers for /v1/normalize downloads and uploads (I/O stage).",
+        ge=1,
+    )
+    normalize_queue_size: int = Field(
+        8,
+        description="Transformed normalize entries waiting for an upload thread (bounds memory between stages).",
+        ge=1,
+    )
+    normalize_index_enabled: bool = Field(
+        True,
+        description="Skip re-normalizing inputs already processed under the same output prefix with the same options.",
+    )
+    normalize_index_uri: str | None = Field(
+        default=None,
+        description="Content index location (gs://bucket/prefix/ or a local directory); default <gcsPrefix>/index/.",
+    )
+    normalize_journal_enabled: bool = Field(
+        True,
+        description="Checkpoint each completed normalize entry so a repeated request (same rendicionId and inputs) resumes.",
+    )
+    normalize_spool_dir: str | None = Field(
+        default=None,
+        description="Directory for spooled zipGcsUri archives, normalize inputs and finalize outputs (default: system temp).",
+    )
+    finalize_spool_bytes: int = Field(
+        16 * 1024 * 1024,
+        description="Bytes of each finalize output (PDF/XLSM) kept in memory before spilling to normalize_spool_dir.",
+        ge=0,
+    )
+    normalize_upload_spool_bytes: int = Field(
+        1024 * 1024,
+        description="Bytes of each normalize input (uploaded file, Drive download) kept in memory before spilling to disk.",
+        ge=0,
+    )
+    offload_workers: int = Field(
+        8,
+        description="Threads running blocking Stage 2 handlers off the event loop (requests in flight per instance).",
+        ge=1,
+    )
+    offload_max_pending: int = Field(
+        32,
+        description="Max requests waiting for an offload thread before new ones are rejected with 503.",
+        ge=0,
+    )
+    jobs_store_uri: str = Field(
+        "/tmp/rendiciones_jobs.sqlite3",
+        description="Where /v1/jobs state is persisted: gs://bucket/prefix/, file:///dir/ or a local SQLite path.",
+    )
+    jobs_workers: int = Field(
+        2,
+        description="Background jobs running at once on this instance.",
         ge=1,
     )
+    jobs_lease_seconds: float = Field(
+        90.0,
+        description="Lease held by the instance running a job; expired jobs are resumed elsewhere.",
+        gt=0,
+    )
+    jobs_poll_seconds: float = Field(
+        30.0,
+        description="Interval for renewing job leases and resuming orphaned jobs.",
+        gt=0,
+    )
+    jobs_checkpoint_seconds: float = Field(
+        2.0,
+        description="Min interval between progress writes while a job is extracting.",
+        ge=0,
+    )
 
     class Config:
         env_prefix = "REN_"
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterable, List, Tuple
+
+from google.auth import default as google_auth_default  # type: ignore
+from google.auth.transport.requests import Request as GoogleAuthRequest  # type: ignore
+from googleapiclient.discovery import build  # type: ignore
+from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload  # type: ignore
+
+
+# Drive access shared by normalize, fetch and finalize. Credentials are resolved once per
+# scope (ADC / Workload Identity) and each thread keeps its own client, because the
+# httplib2 transport under googleapiclient is not thread-safe.
+
+READONLY = "https://www.googleapis.com/auth/drive.readonly"
+FILE = "https://www.googleapis.com/auth/drive.file"
+FULL = "https://www.googleapis.com/auth/drive"
+
+# Drive caps batch requests at 100 calls and files.list pages at 1000 entries.
+BATCH_SIZE = 100
+LIST_PAGE_SIZE = 1000
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+_local = threading.local()
+_refresh_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _credentials(scope: str) -> Any:
+    creds, _ = google_auth_default(scopes=[scope])
+    return creds
+
+
+def _fresh_credentials(scope: str) -> Any:
+    creds = _credentials(scope)
+    if creds and not creds.valid:
+        with _refresh_lock:
+            if not creds.valid:
+                creds.refresh(GoogleAuthRequest())
+    return creds
+
+
+def service(scope: str = READONLY) -> Any:
+    """Drive v3 client for the calling thread, built once per thread and scope."""
+    services: Dict[str, Any] | None = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = {}
+    client = services.get(scope)
+    if client is None:
+        client = services[scope] = build(
+            "drive", "v3", credentials=_fresh_credentials(scope), cache_discovery=False
+        )
+    return client
+
+
+def list_folder(folder_id: str, scope: str = READONLY) -> List[Tuple[str, str]]:
+    """
+    Returns list of tuples (name, fileId).
+    """
+    files: List[Tuple[str, str]] = []
+    page_token = None
+    while True:
+        response = (
+            service(scope)
+            .files()
+            .list(
+                q=f"'{folder_id}' in parents and trashed=false",
+                fields="nextPageToken, files(id, name)",
+                pageSize=LIST_PAGE_SIZE,
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        for f in response.get("files", []):
+            files.append((f["name"], f["id"]))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+    return files
+
+
+def get_metadata(file_ids: Iterable[str], fields: str = "name, size", scope: str = READONLY) -> Dict[str, dict]:
+    """
+    fileId -> metadata for many files with one batch request per 100 ids. Ids whose lookup
+    failed are left out, so callers can fall back to a single get (and its error).
+    """
+    ids = list(dict.fromkeys(file_ids))
+    found: Dict[str, dict] = {}
+    drive = service(scope)
+
+    def _collect(request_id: str, response: Any, exception: Exception | None) -> None:
+        if exception is None and response:
+            found[request_id] = response
+
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = drive.new_batch_http_request(callback=_collect)
+        for file_id in ids[start : start + BATCH_SIZE]:
+            batch.add(drive.files().get(fileId=file_id, fields=fields), request_id=file_id)
+        batch.execute()
+    return found
+
+
+def get_file_name(file_id: str, scope: str = READONLY) -> str:
+    meta = service(scope).files().get(fileId=file_id, fields="name").execute()
+    return meta.get("name", file_id)
+
+
+def get_md5_checksum(file_id: str, scope: str = READONLY) -> str | None:
+    # Only binary files have one; Google Docs/Sheets return None.
+    return service(scope).files().get(fileId=file_id, fields="md5Checksum").execute().get("md5Checksum")
+
+
+def get_file_size(file_id: str, scope: str = READONLY) -> int | None:
+    # Google Docs/Sheets have no binary size.
+    size = service(scope).files().get(fileId=file_id, fields="size").execute().get("size")
+    return int(size) if size is not None else None
+
+
+def _download_range(file_id: str, start: int, end: int, scope: str) -> bytes:
+    request = service(scope).files().get_media(fileId=file_id)
+    request.headers["Range"] = f"bytes={start}-{end}"
+    data = request.execute()
+    if len(data) != end - start + 1:
+        raise IOError(f"Drive range {start}-{end} of {file_id} returned {len(data)} bytes")
+    return data
+
+
+def _download_ranges(file_id: str, fileobj: BinaryIO, size: int, parts: int, chunk_size: int, scope: str) -> None:
+    part_bytes = max(chunk_size, -(-size // parts))
+    ranges = [(start, min(size, start + part_bytes) - 1) for start in range(0, size, part_bytes)]
+    base = fileobj.tell()
+    write_lock = threading.Lock()
+
+    def _fetch(span: Tuple[int, int]) -> None:
+        start, end = span
+        data = _download_range(file_id, start, end, scope)
+        with write_lock:
+            fileobj.seek(base + start)
+            fileobj.write(data)
+
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="drive-range") as executor:
+        list(executor.map(_fetch, ranges))
+    fileobj.seek(base + size)
+
+
+def download_to_file(
+    file_id: str,
+    fileobj: BinaryIO,
+    scope: str = READONLY,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_BYTES,
+    parallel_min_bytes: int = 0,
+    parallel_parts: int = 1,
+    size: int | None = None,
+) -> None:
+    """
+    Writes the file into fileobj without holding it whole. Files of at least
+    `parallel_min_bytes` (size looked up unless given) are fetched as `parallel_parts`
+    concurrent ranged requests; the rest stream in `chunk_size` pieces.
+    """
+    if parallel_min_bytes and parallel_parts > 1:
+        if size is None:
+            size = get_file_size(file_id, scope)
+        if size is not None and size >= parallel_min_bytes:
+            _download_ranges(file_id, fileobj, size, parallel_parts, chunk_size, scope)
+            return
+    request = service(scope).files().get_media(fileId=file_id)
+    downloader = MediaIoBaseDownload(fileobj, request, chunksize=chunk_size)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+
+
+def download_file(file_id: str, scope: str = READONLY, **kwargs: Any) -> bytes:
+    """Whole file as bytes (see download_to_file for the keyword options)."""
+    fh = io.BytesIO()
+    download_to_file(file_id, fh, scope, **kwargs)
+    return fh.getvalue()
+
+
+def upload_file(
+    name: str,
+    folder_id: str,
+    data: bytes | BinaryIO,
+    mime_type: str,
+    scope: str = FILE,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_BYTES,
+) -> str:
+    """Bytes go in one request; file-like sources as a resumable upload in `chunk_size` chunks."""
+    if isinstance(data, (bytes, bytearray)):
+        media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mime_type, resumable=False)
+    else:
+        media = MediaIoBaseUpload(data, mimetype=mime_type, chunksize=chunk_size, resumable=True)
+    metadata = {"name": name, "parents": [folder_id]}
+    file = service(scope).files().create(body=metadata, media_body=media, fields="id").execute()
+    return file["id"]
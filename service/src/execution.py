@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+from .config import Settings, get_settings
+
+
+T = TypeVar("T")
+
+_cancel_event: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar(
+    "offload_cancel_event", default=None
+)
+
+
+class OffloadCancelled(RuntimeError):
+    """Raised inside offloaded work (or by OffloadPool.run) once the client went away."""
+
+
+class OffloadRejected(RuntimeError):
+    """Raised when the offload queue is already at its configured depth."""
+
+
+def is_cancelled() -> bool:
+    event = _cancel_event.get()
+    return bool(event and event.is_set())
+
+
+def raise_if_cancelled() -> None:
+    if is_cancelled():
+        raise OffloadCancelled("Request cancelled by client")
+
+
+def cancellable_sleep(seconds: float) -> None:
+    """
+    time.sleep replacement for offloaded work: wakes up early (and raises) when the
+    request is cancelled, so retry backoffs do not pin a worker after a disconnect.
+    """
+    event = _cancel_event.get()
+    if event is None:
+        time.sleep(seconds)
+        return
+    if event.wait(seconds):
+        raise OffloadCancelled("Request cancelled by client")
+
+
+def bind_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Wraps fn so it runs in a copy of the caller's context. ThreadPoolExecutor.submit
+    does not propagate contextvars, so nested pools use this to keep cancellation.
+    """
+    ctx = contextvars.copy_context()
+
+    def _runner(*args: Any, **kwargs: Any) -> T:
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return _runner
+
+
+class OffloadPool:
+    """
+    Bounded thread pool for blocking handler work.
+
+    - At most `max_workers` jobs run at once; up to `max_pending` more wait in the queue.
+    - Queue depth and wait times are tracked for /v1/stats.
+    - If the client disconnects, queued work is dropped and running work is signalled
+      through a cancel event (see raise_if_cancelled / cancellable_sleep).
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, name: str = "offload") -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+        self._started_count = 0
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+        poll_interval: float = 0.5,
+        **kwargs: Any,
+    ) -> T:
+        with self._lock:
+            free = max(0, self.max_workers - self._running)
+            if self._queued + 1 - free > self.max_pending:
+                self._rejected += 1
+                raise OffloadRejected(
+                    f"{self.name} queue is full ({self._queued} pending, {self._running} running)"
+                )
+            self._queued += 1
+
+        enqueued_at = time.monotonic()
+        cancel = threading.Event()
+        state = {"started": False}
+        ctx = contextvars.copy_context()
+        ctx.run(_cancel_event.set, cancel)
+
+        def _call() -> T:
+            with self._lock:
+                state["started"] = True
+                wait = time.monotonic() - enqueued_at
+                self._queued -= 1
+                self._running += 1
+                self._started_count += 1
+                self._wait_total += wait
+                self._wait_last = wait
+                self._wait_max = max(self._wait_max, wait)
+            ok = False
+            try:
+                if cancel.is_set():
+                    raise OffloadCancelled("Request cancelled by client")
+                result = ctx.run(fn, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    if ok:
+                        self._completed += 1
+                    elif cancel.is_set():
+                        self._cancelled += 1
+                    else:
+                        self._failed += 1
+
+        cfut = self._executor.submit(_call)
+        afut = asyncio.wrap_future(cfut)
+        try:
+            while True:
+                done, _ = await asyncio.wait({afut}, timeout=poll_interval if is_disconnected else None)
+                if done:
+                    return afut.result()
+                if is_disconnected and await is_disconnected():
+                    raise OffloadCancelled("Request cancelled by client")
+        except (OffloadCancelled, asyncio.CancelledError):
+            cancel.set()
+            if cfut.cancel():
+                with self._lock:
+                    if not state["started"]:
+                        self._queued -= 1
+                        self._cancelled += 1
+            raise
+
+    async def stream(self, gen_fn: Callable[..., Iterable[T]], *args: Any, **kwargs: Any) -> AsyncIterator[T]:
+        """
+        Runs a blocking generator on the pool and yields its items on the event loop as
+        they are produced. Closing the async iterator (e.g. the client disconnected
+        mid-stream) cancels the producer like OffloadPool.run does.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        end = object()
+
+        def _push(item: Any, exc: BaseException | None = None) -> None:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, exc))
+            except RuntimeError:
+                # Event loop already closed; nobody is listening anymore.
+                raise OffloadCancelled("Request cancelled by client") from None
+
+        def _drain() -> None:
+            try:
+                for item in gen_fn(*args, **kwargs):
+                    _push(item)
+                    raise_if_cancelled()
+            except BaseException as exc:  # noqa: BLE001
+                _push(end, exc)
+                return
+            _push(end)
+
+        async def _produce() -> None:
+            try:
+                await self.run(_drain)
+            except BaseException as exc:  # noqa: BLE001
+                # Rejected or cancelled before the generator ran; unblock the consumer.
+                queue.put_nowait((end, exc))
+
+        task = asyncio.ensure_future(_produce())
+        try:
+            while True:
+                item, exc = await queue.get()
+                if item is end:
+                    if exc is not None:
+                        raise exc
+                    return
+                yield item
+        finally:
+            if not task.done():
+                task.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            started = self._started_count
+            return {
+                "maxWorkers": self.max_workers,
+                "maxPending": self.max_pending,
+                "queueDepth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+                "waitSecondsAvg": (self._wait_total / started) if started else 0.0,
+                "waitSecondsMax": self._wait_max,
+                "waitSecondsLast": self._wait_last,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def _offload_pool(max_workers: int, max_pending: int) -> OffloadPool:
+    return OffloadPool(max_workers=max_workers, max_pending=max_pending, name="offload")
+
+
+def get_offload_pool(settings: Settings | None = None) -> OffloadPool:
+    settings = settings or get_settings()
+    return _offload_pool(settings.offload_workers, settings.offload_max_pending)
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (affinity-aware where the platform supports it)."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+_cpu_pool: ProcessPoolExecutor | None = None
+_cpu_pool_lock = threading.Lock()
+
+
+def cpu_workers(settings: Settings | None = None) -> int:
+    settings = settings or get_settings()
+    return settings.cpu_workers or cpu_count()
+
+
+def get_cpu_pool(settings: Settings | None = None) -> ProcessPoolExecutor | None:
+    """Shared process pool for CPU-bound work; None when only one CPU is available."""
+    global _cpu_pool
+    workers = cpu_workers(settings)
+    if workers <= 1:
+        return None
+    with _cpu_pool_lock:
+        if _cpu_pool is None:
+            # spawn: workers must not inherit the parent's threads and locks (gRPC, thread pools).
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _cpu_pool
+
+
+def shutdown_cpu_pool() -> None:
+    global _cpu_pool
+    with _cpu_pool_lock:
+        pool, _cpu_pool = _cpu_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,47 +1,185 @@
 from __future__ import annotations
 
-import io
-import urllib.request
+import hashlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from urllib.parse import urlsplit
 
-from google.auth import default as google_auth_default  # type: ignore
-from google.auth.transport.requests import Request as GoogleAuthRequest  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
-from googleapiclient.http import MediaIoBaseDownload  # type: ignore
+import requests
+from requests.adapters import HTTPAdapter
 
-from . import gcs
+from . import drive, gcs
 from .config import Settings
+from .execution import bind_context
+from .fetch_cache import get_fetch_cache
 
 
-def _drive_service() -> any:
-    # Relies on Application Default Credentials; for Workload Identity, ADC will be used.
-    creds, _ = google_auth_default(scopes=["https://www.googleapis.com/auth/drive"])
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(GoogleAuthRequest())
-    return build("drive", "v3", credentials=creds, cache_discovery=False)
+@dataclass
+class Fetched:
+    """Outcome of one reference in fetch_many: the bytes, or the error that item raised."""
 
+    index: int
+    data: bytes | None = None
+    error: Exception | None = None
 
-def fetch_bytes_from_drive(file_id: str) -> bytes:
-    service = _drive_service()
-    request = service.files().get_media(fileId=file_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    return fh.getvalue()
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
+    def unwrap(self) -> bytes:
+        if self.error is not None:
+            raise self.error
+        return self.data  # type: ignore[return-value]
 
-def fetch_bytes(ref: dict, settings: Settings) -> bytes:
+
+@lru_cache(maxsize=None)
+def _session(origin: str, pool_size: int) -> requests.Session:
+    """One keep-alive session per scheme://host, shared by all threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount(origin, adapter)
+    return session
+
+
+def fetch_bytes_from_url(url: str, settings: Settings) -> bytes:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"signedUrl must be http(s): {url}")
+    session = _session(f"{parts.scheme}://{parts.netloc}", settings.fetch_workers)
+    resp = session.get(url, timeout=settings.fetch_timeout_seconds)
+    resp.raise_for_status()
+    return resp.content
+
+
+def fetch_bytes_from_drive(
+    file_id: str, settings: Settings, size: int | None = None, scope: str = drive.FULL
+) -> bytes:
+    return drive.download_file(
+        file_id,
+        scope=scope,
+        chunk_size=settings.drive_chunk_bytes,
+        parallel_min_bytes=settings.drive_parallel_min_bytes,
+        parallel_parts=settings.drive_parallel_parts,
+        size=size,
+    )
+
+
+def _read_through(
+    settings: Settings,
+    source: str,
+    current_version: Callable[[], str | None],
+    load: Callable[[], Tuple[bytes, str | None]],
+) -> bytes:
+    """
+    Serves `source` from the fetch cache when its current version is cached. The version is
+    only looked up (a metadata request) when some version of the source is cached already;
+    on a miss the download itself reports the version the bytes were read at.
     """
-    ref accepts keys: gcsUri, signedUrl, driveFileId
+    cache = get_fetch_cache(settings)
+    if cache is None:
+        return load()[0]
+    if cache.has_source(source):
+        version = current_version()
+        if version:
+            data = cache.get(source, version)
+            if data is not None:
+                return data
+    cache.record_miss()
+    data, version = load()
+    if version:
+        cache.put(source, version, data)
+    return data
+
+
+def _load_drive(ref: dict, settings: Settings, scope: str) -> Tuple[bytes, str | None]:
+    data = fetch_bytes_from_drive(ref["driveFileId"], settings, ref.get("size"), scope)
+    # Drive's md5Checksum is the MD5 of the content: no metadata request needed.
+    return data, hashlib.md5(data).hexdigest()
+
+
+def fetch_bytes(ref: dict, settings: Settings, drive_scope: str = drive.FULL) -> bytes:
+    """
+    ref accepts keys: gcsUri, signedUrl, driveFileId (plus optional size / md5Checksum
+    hints for Drive). GCS and Drive documents go through the local fetch cache, keyed by
+    object generation / md5Checksum; signed URLs carry no version and are always fetched.
     """
     if ref.get("gcsUri"):
-        return gcs.download_bytes(ref["gcsUri"])
+        uri = ref["gcsUri"]
+        return _read_through(settings, uri, lambda: gcs.generation(uri), lambda: gcs.download_versioned(uri))
     if ref.get("signedUrl"):
-        with urllib.request.urlopen(ref["signedUrl"]) as resp:  # nosec B310
-            return resp.read()
+        return fetch_bytes_from_url(ref["signedUrl"], settings)
     if ref.get("driveFileId"):
         if not settings.drive_enabled:
             raise RuntimeError("Drive API disabled")
-        return fetch_bytes_from_drive(ref["driveFileId"])
+        file_id = ref["driveFileId"]
+        return _read_through(
+            settings,
+            f"drive:{file_id}",
+            lambda: ref.get("md5Checksum") or drive.get_md5_checksum(file_id, drive_scope),
+            lambda: _load_drive(ref, settings, drive_scope),
+        )
     raise ValueError("No valid reference provided")
+
+
+def _fetch_one(index: int, ref: dict, settings: Settings, drive_scope: str) -> Fetched:
+    try:
+        return Fetched(index, data=fetch_bytes(ref, settings, drive_scope))
+    except Exception as exc:  # noqa: BLE001
+        return Fetched(index, error=exc)
+
+
+def iter_fetch_many(
+    refs: Iterable[dict],
+    settings: Settings,
+    *,
+    workers: int | None = None,
+    ordered: bool = True,
+    drive_scope: str = drive.FULL,
+) -> Iterator[Fetched]:
+    """
+    Fetches many references concurrently, each through its own backend, and yields one
+    Fetched per ref: in input order by default, or as each download completes with
+    ordered=False. At most `workers` (default fetch_workers) downloads are in flight or
+    waiting to be taken, so memory stays bounded however long the list is. Errors are
+    reported per item; they never stop the rest of the batch.
+    """
+    pending = iter(enumerate(refs))
+    limit = max(1, workers or settings.fetch_workers)
+    with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="fetch") as executor:
+        inflight: Dict[Future, int] = {}
+        queue: deque[Future] = deque()
+
+        def _submit_next() -> None:
+            item = next(pending, None)
+            if item is not None:
+                fut = executor.submit(bind_context(_fetch_one), item[0], item[1], settings, drive_scope)
+                inflight[fut] = item[0]
+                if ordered:
+                    queue.append(fut)
+
+        for _ in range(limit):
+            _submit_next()
+        while inflight:
+            if ordered:
+                done = [queue.popleft()]
+            else:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                del inflight[fut]
+                result = fut.result()
+                yield result
+                _submit_next()
+
+
+def fetch_many(
+    refs: Iterable[dict],
+    settings: Settings,
+    *,
+    workers: int | None = None,
+    drive_scope: str = drive.FULL,
+) -> List[Fetched]:
+    """All results of iter_fetch_many, in input order."""
+    return list(iter_fetch_many(refs, settings, workers=workers, drive_scope=drive_scope))
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Set
+
+from .config import Settings
+
+
+class FetchCache:
+    """
+    Read-through cache of fetched documents on local disk. Entries are stored per source
+    (GCS URI, Drive file id) and version (GCS generation, Drive md5Checksum), so a rewritten
+    object is a different entry and is never served stale; storing a new version drops the
+    older ones. has_source tells callers whether a version lookup is worth a metadata
+    request at all. Least recently used files are evicted once the total passes max_bytes.
+    Files left in the directory by an earlier process are adopted on start (oldest first).
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._sources: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._adopt_existing()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._dir, name)
+
+    def _adopt_existing(self) -> None:
+        found = []
+        for entry in os.scandir(self._dir):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(".partial"):
+                _unlink(entry.path)
+                continue
+            st = entry.stat()
+            found.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(found):
+            if "." not in name:
+                # Not a cache entry.
+                _unlink(self._path(name))
+                continue
+            self._add(name, size)
+        with self._lock:
+            evicted = self._evict()
+        for name in evicted:
+            _unlink(self._path(name))
+
+    def _add(self, name: str, size: int) -> None:
+        self._entries[name] = size
+        self._bytes += size
+        self._sources.setdefault(_source_of(name), set()).add(name)
+
+    def _remove(self, name: str) -> int | None:
+        size = self._entries.pop(name, None)
+        if size is None:
+            return None
+        self._bytes -= size
+        names = self._sources.get(_source_of(name))
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._sources[_source_of(name)]
+        return size
+
+    def _evict(self) -> List[str]:
+        evicted = []
+        while self._bytes > self._max_bytes and self._entries:
+            name = next(iter(self._entries))
+            self._remove(name)
+            self._counters["evictions"] += 1
+            evicted.append(name)
+        return evicted
+
+    def has_source(self, source: str) -> bool:
+        """Whether some version of `source` is cached (only then is its current version needed)."""
+        with self._lock:
+            return _hash(source) in self._sources
+
+    def get(self, source: str, version: str) -> bytes | None:
+        """Cached bytes of `source` at `version`; misses are counted by the caller (see record_miss)."""
+        name = _name(source, version)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        path = self._path(name)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+        except OSError:
+            # Evicted or removed underneath us (another worker process sharing the directory).
+            with self._lock:
+                self._remove(name)
+            return None
+        with self._lock:
+            self._counters["hits"] += 1
+        return data
+
+    def record_miss(self) -> None:
+        """Counts one download the cache could not save: nothing cached, or only a stale version."""
+        with self._lock:
+            self._counters["misses"] += 1
+
+    def put(self, source: str, version: str, data: bytes) -> None:
+        if len(data) > self._max_bytes:
+            return
+        name = _name(source, version)
+        path = self._path(name)
+        partial = f"{path}.{uuid.uuid4().hex}.partial"
+        try:
+            with open(partial, "wb") as fh:
+                fh.write(data)
+            os.replace(partial, path)
+        except OSError:
+            _unlink(partial)
+            with self._lock:
+                self._counters["errors"] += 1
+            return
+        with self._lock:
+            # Older versions of the same source can never be read again.
+            stale = [old for old in self._sources.get(_source_of(name), ()) if old != name]
+            for old in stale:
+                self._remove(old)
+            self._remove(name)
+            self._add(name, len(data))
+            self._counters["stores"] += 1
+            evicted = self._evict()
+        for old in stale + evicted:
+            _unlink(self._path(old))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "items": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+                "directory": self._dir,
+            }
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _name(source: str, version: str) -> str:
+    # "<source hash>.<version hash>": the source of an adopted file is known without an index.
+    return f"{_hash(source)}.{_hash(version)[:32]}"
+
+
+def _source_of(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@lru_cache
+def _fetch_cache(directory: str, max_bytes: int) -> FetchCache:
+    return FetchCache(directory, max_bytes)
+
+
+def get_fetch_cache(settings: Settings) -> FetchCache | None:
+    if not settings.fetch_cache_enabled:
+        return None
+    return _fetch_cache(settings.fetch_cache_dir, settings.fetch_cache_max_bytes)
@@ -1,14 +1,32 @@
 from __future__ import annotations
 
+import io
+import itertools
+import os
 import re
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from typing import Tuple
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
 
+import google.auth
+from google.api_core.exceptions import NotFound, PreconditionFailed
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
 from google.cloud.storage import Blob
+from google.cloud.storage.retry import DEFAULT_RETRY
+from requests.adapters import HTTPAdapter
 
+from .config import Settings, get_settings
 
+
+# Object storage behind the service's URIs, picked by scheme: gs://bucket/path goes to
+# Cloud Storage (or the in-memory fake), file:///abs/dir/path to a local directory (only
+# when REN_LOCAL_STORAGE_ROOT is set, and only below it).
 _GCS_URI_RE = re.compile(r"^gs://(?P<bucket>[^/]+)/(?P<path>.+)$")
+_FILE_URI_RE = re.compile(r"^file://(?P<path>/.+)$")
 
 
 def parse_gcs_uri(uri: str) -> Tuple[str, str]:
@@ -18,38 +36,582 @@ def parse_gcs_uri(uri: str) -> Tuple[str, str]:
     return match.group("bucket"), match.group("path")
 
 
+def is_storage_uri(uri: str) -> bool:
+    return bool(_GCS_URI_RE.match(uri) or _FILE_URI_RE.match(uri))
+
+
 def normalize_prefix(prefix: str) -> str:
     if not prefix.endswith("/"):
         return prefix + "/"
     return prefix
 
 
+class ClientBackend:
+    """
+    Cloud Storage through one process-wide `storage.Client`: credentials are resolved once
+    and its HTTP connection pool is sized for the threads that upload/download in parallel.
+    The client and its session are shared across threads.
+    """
+
+    name = "gcs"
+    composite = True
+
+    def __init__(self, pool_size: int) -> None:
+        self.pool_size = pool_size
+        credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+        session = AuthorizedSession(credentials)
+        session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+        # `_http` is the client's supported hook for a caller-built transport.
+        self._client = storage.Client(project=project, credentials=credentials, _http=session)
+
+    def _blob(self, bucket_name: str, blob_path: str) -> Blob:
+        return self._client.bucket(bucket_name).blob(blob_path)
+
+    def upload(self, bucket_name: str, blob_path: str, data: bytes, content_type: str | None) -> None:
+        self._blob(bucket_name, blob_path).upload_from_string(data, content_type=content_type)
+
+    def open_writer(self, bucket_name: str, blob_path: str, chunk_size: int, content_type: str | None) -> BinaryIO:
+        # DEFAULT_RETRY on a resumable session retries the failed chunk from the last
+        # committed offset instead of restarting the object.
+        return self._blob(bucket_name, blob_path).open(
+            "wb", chunk_size=chunk_size, content_type=content_type, ignore_flush=True, retry=DEFAULT_RETRY
+        )
+
+    def compose(self, bucket_name: str, part_paths: List[str], blob_path: str, content_type: str | None) -> None:
+        bucket = self._client.bucket(bucket_name)
+        target = bucket.blob(blob_path)
+        target.content_type = content_type
+        target.compose([bucket.blob(path) for path in part_paths], retry=DEFAULT_RETRY)
+
+    def download(self, bucket_name: str, blob_path: str) -> bytes:
+        return self._blob(bucket_name, blob_path).download_as_bytes()
+
+    def download_versioned(self, bucket_name: str, blob_path: str) -> Tuple[bytes, str]:
+        # The generation comes back in the download's response headers: no extra request.
+        blob = self._blob(bucket_name, blob_path)
+        data = blob.download_as_bytes()
+        return data, str(blob.generation)
+
+    def upload_if_generation(
+        self, bucket_name: str, blob_path: str, data: bytes, content_type: str | None, generation: str | None
+    ) -> None:
+        # if_generation_match=0 means "only if the object does not exist"; a mismatch is a 412.
+        self._blob(bucket_name, blob_path).upload_from_string(
+            data, content_type=content_type, if_generation_match=int(generation) if generation else 0
+        )
+
+    def generation(self, bucket_name: str, blob_path: str) -> str:
+        blob = self._client.bucket(bucket_name).get_blob(blob_path)
+        if blob is None:
+            raise NotFound(f"gs://{bucket_name}/{blob_path}")
+        return str(blob.generation)
+
+    def download_to_file(self, bucket_name: str, blob_path: str, fileobj: BinaryIO) -> None:
+        self._blob(bucket_name, blob_path).download_to_file(fileobj)
+
+    def delete(self, bucket_name: str, blob_path: str) -> None:
+        self._blob(bucket_name, blob_path).delete()
+
+    def list(self, bucket_name: str, prefix: str) -> List[str]:
+        return [blob.name for blob in self._client.list_blobs(bucket_name, prefix=prefix)]
+
+    def signed_url(self, bucket_name: str, blob_path: str, ttl_seconds: int) -> str:
+        return self._blob(bucket_name, blob_path).generate_signed_url(expiration=timedelta(seconds=ttl_seconds))
+
+
+class _MemoryWriter(io.BytesIO):
+    def __init__(self, backend: "MemoryBackend", key: Tuple[str, str], content_type: str | None) -> None:
+        super().__init__()
+        self._backend = backend
+        self._key = key
+        self._content_type = content_type
+
+    def close(self) -> None:
+        if not self.closed:
+            self._backend.upload(*self._key, self.getvalue(), self._content_type)
+        super().close()
+
+
+class MemoryBackend:
+    """
+    In-process stand-in for Cloud Storage with the same interface (thread-safe dict of
+    objects). Selected with REN_GCS_BACKEND=memory or `set_backend(MemoryBackend())` so
+    tests and benchmarks run the upload/download hot path without network access.
+    """
+
+    name = "memory"
+    composite = True
+
+    def __init__(self) -> None:
+        self._objects: Dict[Tuple[str, str], Tuple[bytes, str | None]] = {}
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._next_generation = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def upload(self, bucket_name: str, blob_path: str, data: bytes, content_type: str | None) -> None:
+        with self._lock:
+            self._objects[(bucket_name, blob_path)] = (bytes(data), content_type)
+            self._generations[(bucket_name, blob_path)] = next(self._next_generation)
+
+    def open_writer(self, bucket_name: str, blob_path: str, chunk_size: int, content_type: str | None) -> BinaryIO:
+        return _MemoryWriter(self, (bucket_name, blob_path), content_type)
+
+    def download(self, bucket_name: str, blob_path: str) -> bytes:
+        with self._lock:
+            found = self._objects.get((bucket_name, blob_path))
+        if found is None:
+            raise NotFound(f"gs://{bucket_name}/{blob_path}")
+        return found[0]
+
+    def download_versioned(self, bucket_name: str, blob_path: str) -> Tuple[bytes, str]:
+        with self._lock:
+            found = self._objects.get((bucket_name, blob_path))
+            generation = self._generations.get((bucket_name, blob_path))
+        if found is None:
+            raise NotFound(f"gs://{bucket_name}/{blob_path}")
+        return found[0], str(generation)
+
+    def upload_if_generation(
+        self, bucket_name: str, blob_path: str, data: bytes, content_type: str | None, generation: str | None
+    ) -> None:
+        key = (bucket_name, blob_path)
+        with self._lock:
+            current = self._generations.get(key)
+            if (str(current) if current is not None else None) != generation:
+                raise PreconditionFailed(f"gs://{bucket_name}/{blob_path} is not at generation {generation}")
+            self._objects[key] = (bytes(data), content_type)
+            self._generations[key] = next(self._next_generation)
+
+    def generation(self, bucket_name: str, blob_path: str) -> str:
+        with self._lock:
+            found = self._generations.get((bucket_name, blob_path))
+        if found is None:
+            raise NotFound(f"gs://{bucket_name}/{blob_path}")
+        return str(found)
+
+    def download_to_file(self, bucket_name: str, blob_path: str, fileobj: BinaryIO) -> None:
+        fileobj.write(self.download(bucket_name, blob_path))
+
+    def delete(self, bucket_name: str, blob_path: str) -> None:
+        with self._lock:
+            self._generations.pop((bucket_name, blob_path), None)
+            if self._objects.pop((bucket_name, blob_path), None) is None:
+                raise NotFound(f"gs://{bucket_name}/{blob_path}")
+
+    def list(self, bucket_name: str, prefix: str) -> List[str]:
+        with self._lock:
+            return sorted(path for bucket, path in self._objects if bucket == bucket_name and path.startswith(prefix))
+
+    def compose(self, bucket_name: str, part_paths: List[str], blob_path: str, content_type: str | None) -> None:
+        data = b"".join(self.download(bucket_name, path) for path in part_paths)
+        self.upload(bucket_name, blob_path, data, content_type)
+
+    def signed_url(self, bucket_name: str, blob_path: str, ttl_seconds: int) -> str:
+        return f"https://storage.googleapis.com/{bucket_name}/{blob_path}?X-Memory-Expires={ttl_seconds}"
+
+    def content_type(self, gcs_uri: str) -> str | None:
+        with self._lock:
+            found = self._objects.get(parse_gcs_uri(gcs_uri))
+        return found[1] if found else None
+
+
+class _LocalWriter(io.FileIO):
+    """Writes next to the target and renames on close, so readers never see partial files."""
+
+    def __init__(self, path: str) -> None:
+        self._target = path
+        self._partial = f"{path}.{uuid.uuid4().hex}.partial"
+        super().__init__(self._partial, "wb")
+
+    def close(self) -> None:
+        if not self.closed:
+            super().close()
+            os.replace(self._partial, self._target)
+
+
+class LocalBackend:
+    """
+    file:// URIs as plain files (bucket is always "" and paths are absolute). Same
+    interface as the Cloud Storage backends, so the whole pipeline can run against a
+    local directory for development, CI and reproducible profiling. Paths reach it only
+    through _locate, which confines them to REN_LOCAL_STORAGE_ROOT.
+    """
+
+    name = "local"
+    # Parallel composite uploads buy nothing on a local disk; large files stream instead.
+    composite = False
+
+    def __init__(self) -> None:
+        self._cas_lock = threading.Lock()
+
+    def _prepare(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def upload(self, bucket_name: str, blob_path: str, data: bytes, content_type: str | None) -> None:
+        with self.open_writer(bucket_name, blob_path, 0, content_type) as writer:
+            writer.write(data)
+
+    def open_writer(self, bucket_name: str, blob_path: str, chunk_size: int, content_type: str | None) -> BinaryIO:
+        return _LocalWriter(self._prepare(blob_path))
+
+    def download(self, bucket_name: str, blob_path: str) -> bytes:
+        try:
+            with open(blob_path, "rb") as fh:
+                return fh.read()
+        except FileNotFoundError as exc:
+            raise NotFound(f"file://{blob_path}") from exc
+
+    def download_versioned(self, bucket_name: str, blob_path: str) -> Tuple[bytes, str]:
+        with self._cas_lock:
+            return self.download(bucket_name, blob_path), self.generation(bucket_name, blob_path)
+
+    def upload_if_generation(
+        self, bucket_name: str, blob_path: str, data: bytes, content_type: str | None, generation: str | None
+    ) -> None:
+        # Atomic within this process only; file:// is for single-instance local runs.
+        with self._cas_lock:
+            try:
+                current: str | None = self.generation(bucket_name, blob_path)
+            except NotFound:
+                current = None
+            if current != generation:
+                raise PreconditionFailed(f"file://{blob_path} is not at generation {generation}")
+            self.upload(bucket_name, blob_path, data, content_type)
+
+    def generation(self, bucket_name: str, blob_path: str) -> str:
+        # Files are replaced by rename, so mtime + size changes with every write.
+        try:
+            st = os.stat(blob_path)
+        except FileNotFoundError as exc:
+            raise NotFound(f"file://{blob_path}") from exc
+        return f"{st.st_mtime_ns}-{st.st_size}"
+
+    def download_to_file(self, bucket_name: str, blob_path: str, fileobj: BinaryIO) -> None:
+        try:
+            with open(blob_path, "rb") as fh:
+                shutil.copyfileobj(fh, fileobj)
+        except FileNotFoundError as exc:
+            raise NotFound(f"file://{blob_path}") from exc
+
+    def delete(self, bucket_name: str, blob_path: str) -> None:
+        try:
+            os.remove(blob_path)
+        except FileNotFoundError as exc:
+            raise NotFound(f"file://{blob_path}") from exc
+
+    def list(self, bucket_name: str, prefix: str) -> List[str]:
+        base = prefix if prefix.endswith("/") else os.path.dirname(prefix)
+        found = []
+        for root, _, files in os.walk(base):
+            for name in files:
+                path = os.path.join(root, name)
+                if path.startswith(prefix) and not name.endswith(".partial"):
+                    found.append(path)
+        return sorted(found)
+
+    def signed_url(self, bucket_name: str, blob_path: str, ttl_seconds: int) -> str | None:
+        return None
+
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+_local_backend = LocalBackend()
+
+
+def pool_size(settings: Settings) -> int:
+    if settings.gcs_pool_size:
+        return settings.gcs_pool_size
+    # Normalize uploads (+ originals) and offloaded Stage 2 handlers may all hit GCS at once.
+    return max(10, 2 * settings.normalize_workers + settings.offload_workers)
+
+
+def get_backend() -> Any:
+    """Backend for gs:// URIs (Cloud Storage, or the in-memory fake)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                settings = get_settings()
+                if settings.gcs_backend == "memory":
+                    _backend = MemoryBackend()
+                else:
+                    _backend = ClientBackend(pool_size(settings))
+    return _backend
+
+
+def set_backend(backend: Any) -> Any:
+    """Swaps the process-wide gs:// backend (e.g. a MemoryBackend in tests); returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+def _local_path(path: str) -> str:
+    """Resolves a file:// path, which must stay inside REN_LOCAL_STORAGE_ROOT after symlinks."""
+    root = get_settings().local_storage_root
+    if not root:
+        raise ValueError("file:// storage is disabled; set REN_LOCAL_STORAGE_ROOT to enable it")
+    if ".." in path.split("/"):
+        raise ValueError(f"'..' is not allowed in file:// URIs: {path}")
+    base = os.path.realpath(root)
+    resolved = os.path.realpath(path)
+    if os.path.commonpath([base, resolved]) != base:
+        raise ValueError(f"file:// URI outside REN_LOCAL_STORAGE_ROOT: {path}")
+    # Keep the trailing slash: prefixes ("dir/") and names ("dir/x") list differently.
+    return resolved + "/" if path.endswith("/") and resolved != "/" else resolved
+
+
+def _locate(uri: str) -> Tuple[Any, str, str, str]:
+    """uri -> (backend, bucket, path, scheme prefix used to rebuild URIs)."""
+    match = _GCS_URI_RE.match(uri)
+    if match:
+        return get_backend(), match.group("bucket"), match.group("path"), f"gs://{match.group('bucket')}/"
+    match = _FILE_URI_RE.match(uri)
+    if match:
+        return _local_backend, "", _local_path(match.group("path")), "file://"
+    raise ValueError(f"Unsupported storage URI (expected gs://bucket/path or file:///path): {uri}")
+
+
+class _Counters:
+    """Operations and bytes per backend, to compare storage costs between backends."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_backend: Dict[str, Dict[str, int]] = {}
+
+    def add(self, backend: Any, op: str, nbytes: int = 0) -> None:
+        with self._lock:
+            counts = self._by_backend.setdefault(backend.name, {})
+            counts[op] = counts.get(op, 0) + 1
+            if nbytes:
+                counts[f"{op}Bytes"] = counts.get(f"{op}Bytes", 0) + nbytes
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._by_backend.items()}
+
+
+_counters = _Counters()
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    return _counters.stats()
+
+
 def upload_bytes(
     data: bytes,
     gcs_uri: str,
     content_type: str | None = None,
 ) -> str:
-    bucket_name, blob_path = parse_gcs_uri(gcs_uri)
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob: Blob = bucket.blob(blob_path)
-    blob.upload_from_string(data, content_type=content_type)
-    return f"gs://{bucket_name}/{blob_path}"
+    if len(data) >= get_settings().gcs_resumable_threshold_bytes:
+        return upload_stream(io.BytesIO(data), gcs_uri, content_type=content_type, size=len(data))
+    backend, bucket_name, blob_path, root = _locate(gcs_uri)
+    backend.upload(bucket_name, blob_path, data, content_type)
+    _counters.add(backend, "upload", len(data))
+    return f"{root}{blob_path}"
+
+
+def _chunks(source: BinaryIO | Iterable[bytes], chunk_size: int) -> Iterator[bytes]:
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for chunk in source:
+            if chunk:
+                yield chunk
+
+
+def _source_size(source: BinaryIO | Iterable[bytes]) -> int | None:
+    if not (hasattr(source, "seek") and hasattr(source, "tell")):
+        return None
+    try:
+        position = source.tell()
+        end = source.seek(0, io.SEEK_END)
+        source.seek(position)
+    except (OSError, ValueError):
+        return None
+    return end - position
+
+
+def _upload_composite(
+    backend: Any,
+    bucket_name: str,
+    blob_path: str,
+    source: BinaryIO,
+    size: int,
+    content_type: str | None,
+    settings: Settings,
+) -> None:
+    """
+    Parallel composite upload: parts are read in order and uploaded as temporary objects
+    with at most `gcs_composite_parts` in flight (memory stays at that many parts), then
+    composed into the target (32 sources per compose call) and deleted.
+    """
+    # At least one chunk per part and at most 32*32 parts, i.e. two compose levels.
+    part_bytes = max(settings.gcs_chunk_bytes, -(-size // (32 * 32)))
+    staging = f"{blob_path}.composite-{uuid.uuid4().hex}/"
+    part_paths: List[str] = []
+    slots = threading.BoundedSemaphore(settings.gcs_composite_parts)
+
+    def _upload_part(part_path: str, chunk: bytes) -> None:
+        try:
+            backend.upload(bucket_name, part_path, chunk, None)
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=settings.gcs_composite_parts, thread_name_prefix="gcs-part") as executor:
+            futures = []
+            for index, chunk in enumerate(_chunks(source, part_bytes)):
+                slots.acquire()
+                part_path = f"{staging}{index:05d}"
+                part_paths.append(part_path)
+                futures.append(executor.submit(_upload_part, part_path, chunk))
+                del chunk
+            for future in futures:
+                future.result()
+        sources = list(part_paths)
+        while len(sources) > 32:
+            merged = []
+            for start in range(0, len(sources), 32):
+                merged_path = f"{staging}merged-{len(part_paths):05d}"
+                backend.compose(bucket_name, sources[start : start + 32], merged_path, None)
+                part_paths.append(merged_path)
+                merged.append(merged_path)
+            sources = merged
+        backend.compose(bucket_name, sources, blob_path, content_type)
+        _counters.add(backend, "compose")
+    finally:
+        for part_path in part_paths:
+            try:
+                backend.delete(bucket_name, part_path)
+            except NotFound:
+                pass
+
+
+def upload_stream(
+    source: BinaryIO | Iterable[bytes],
+    gcs_uri: str,
+    content_type: str | None = None,
+    size: int | None = None,
+) -> str:
+    """
+    Uploads from a file-like object (read from its current position) or an iterator of
+    byte chunks without materializing it. Below `gcs_resumable_threshold_bytes` it is one
+    request; above, a resumable upload in `gcs_chunk_bytes` chunks where a failed chunk is
+    retried on its own; from `gcs_composite_threshold_bytes` (seekable sources of known
+    size on GCS) parts are uploaded in parallel and composed.
+    """
+    settings = get_settings()
+    backend, bucket_name, blob_path, root = _locate(gcs_uri)
+    if size is None:
+        size = _source_size(source)
+    if size is not None and size < settings.gcs_resumable_threshold_bytes:
+        data = b"".join(_chunks(source, max(size, 1)))
+        backend.upload(bucket_name, blob_path, data, content_type)
+        _counters.add(backend, "upload", len(data))
+        return f"{root}{blob_path}"
+    if (
+        size is not None
+        and settings.gcs_composite_threshold_bytes
+        and size >= settings.gcs_composite_threshold_bytes
+        and getattr(backend, "composite", False)
+        and hasattr(source, "read")
+    ):
+        _upload_composite(backend, bucket_name, blob_path, source, size, content_type, settings)
+        _counters.add(backend, "upload", size)
+        return f"{root}{blob_path}"
+    written = 0
+    writer = backend.open_writer(bucket_name, blob_path, settings.gcs_chunk_bytes, content_type)
+    try:
+        for chunk in _chunks(source, settings.gcs_chunk_bytes):
+            writer.write(chunk)
+            written += len(chunk)
+    except BaseException:
+        try:
+            writer.close()
+        finally:
+            delete_if_exists(gcs_uri)
+        raise
+    writer.close()
+    _counters.add(backend, "upload", written)
+    return f"{root}{blob_path}"
 
 
 def download_bytes(gcs_uri: str) -> bytes:
-    bucket_name, blob_path = parse_gcs_uri(gcs_uri)
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob: Blob = bucket.blob(blob_path)
-    return blob.download_as_bytes()
+    backend, bucket_name, blob_path, _ = _locate(gcs_uri)
+    data = backend.download(bucket_name, blob_path)
+    _counters.add(backend, "download", len(data))
+    return data
+
+
+def download_versioned(gcs_uri: str) -> Tuple[bytes, str]:
+    """Object bytes and the generation they were read at, from a single request."""
+    backend, bucket_name, blob_path, _ = _locate(gcs_uri)
+    data, generation_ = backend.download_versioned(bucket_name, blob_path)
+    _counters.add(backend, "download", len(data))
+    return data, generation_
+
+
+def upload_if_generation(
+    data: bytes, gcs_uri: str, generation: str | None, content_type: str | None = None
+) -> str:
+    """
+    Writes the object only if it is still at `generation` (None: only if it does not
+    exist yet). Raises PreconditionFailed when another writer got there first.
+    """
+    backend, bucket_name, blob_path, root = _locate(gcs_uri)
+    backend.upload_if_generation(bucket_name, blob_path, data, content_type, generation)
+    _counters.add(backend, "upload", len(data))
+    return f"{root}{blob_path}"
+
+
+def generation(gcs_uri: str) -> str:
+    """Version of the object (GCS generation); changes whenever the object is rewritten."""
+    backend, bucket_name, blob_path, _ = _locate(gcs_uri)
+    _counters.add(backend, "metadata")
+    return backend.generation(bucket_name, blob_path)
+
+
+def download_to_file(gcs_uri: str, fileobj: BinaryIO) -> int:
+    """Streams the object into fileobj (chunked, never fully in memory). Returns bytes written."""
+    backend, bucket_name, blob_path, _ = _locate(gcs_uri)
+    start = fileobj.tell()
+    backend.download_to_file(bucket_name, blob_path, fileobj)
+    written = fileobj.tell() - start
+    _counters.add(backend, "download", written)
+    return written
+
+
+def download_bytes_if_exists(gcs_uri: str) -> bytes | None:
+    try:
+        return download_bytes(gcs_uri)
+    except NotFound:
+        return None
+
+
+def delete_if_exists(gcs_uri: str) -> None:
+    backend, bucket_name, blob_path, _ = _locate(gcs_uri)
+    _counters.add(backend, "delete")
+    try:
+        backend.delete(bucket_name, blob_path)
+    except NotFound:
+        pass
+
+
+def list_uris(prefix_uri: str) -> List[str]:
+    backend, bucket_name, prefix, root = _locate(prefix_uri)
+    _counters.add(backend, "list")
+    return [f"{root}{name}" for name in backend.list(bucket_name, prefix)]
 
 
 def maybe_signed_url(gcs_uri: str, ttl_seconds: int | None) -> str | None:
     if not ttl_seconds:
         return None
-    bucket_name, blob_path = parse_gcs_uri(gcs_uri)
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob: Blob = bucket.blob(blob_path)
-    return blob.generate_signed_url(expiration=timedelta(seconds=ttl_seconds))
+    backend, bucket_name, blob_path, _ = _locate(gcs_uri)
+    return backend.signed_url(bucket_name, blob_path, ttl_seconds)
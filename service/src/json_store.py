@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, List
+
+from pydantic_core import to_jsonable_python
+
+from . import gcs
+
+
+class JsonStore:
+    """Stores one JSON object per key under a storage prefix (gs://, file://) or a local directory."""
+
+    def __init__(self, uri: str) -> None:
+        self._uri = uri.rstrip("/") + "/"
+        self._is_gcs = gcs.is_storage_uri(self._uri)
+        if not self._is_gcs:
+            Path(self._uri).mkdir(parents=True, exist_ok=True)
+
+    def _location(self, key: str) -> str:
+        return f"{self._uri}{key[:2]}/{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        location = self._location(key)
+        if self._is_gcs:
+            raw = gcs.download_bytes_if_exists(location)
+        else:
+            path = Path(location)
+            raw = path.read_bytes() if path.exists() else None
+        if raw is None:
+            return None
+        return json.loads(raw.decode("utf-8"))
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        location = self._location(key)
+        # Values may carry DocFlow meta (datetimes, Decimals, models): encode them the way pydantic does.
+        raw = json.dumps(to_jsonable_python(value, fallback=str), ensure_ascii=True).encode("utf-8")
+        if self._is_gcs:
+            gcs.upload_bytes(raw, location, content_type="application/json")
+            return
+        path = Path(location)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(raw)
+        tmp.replace(path)
+
+    def keys(self) -> List[str]:
+        """All stored keys, with a single listing call."""
+        if self._is_gcs:
+            locations = gcs.list_uris(self._uri)
+        else:
+            locations = [p.as_posix() for p in Path(self._uri).glob("*/*.json")]
+        return [loc.rsplit("/", 1)[-1][: -len(".json")] for loc in locations if loc.endswith(".json")]
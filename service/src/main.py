@@ -1,9 +1,19 @@
-from fastapi import Depends, FastAPI, HTTPException
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from . import gcs
 from .config import Settings, get_settings
+from .execution import OffloadCancelled, OffloadRejected, get_offload_pool, shutdown_cpu_pool
+from .fetch_cache import get_fetch_cache
 from .models import (
     FinalizeRequest,
     FinalizeResponse,
+    JobRequest,
+    JobStatus,
     NormalizeRequest,
     NormalizeResponse,
     ProcessReceiptsBatchRequest,
@@ -12,21 +22,102 @@ from .models import (
     ProcessStatementResponse,
 )
 from .services.finalize import run_finalize
+from .services.jobs import get_job_runner
 from .services.normalize import run_normalize
-from .services.process_stage2 import run_process_receipts_batch, run_process_statement
+from .services.normalize_upload import run_normalize_upload
+from .services.extraction_cache import get_extraction_cache
+from .services.scheduler import get_scheduler
+from .services.profile_registry import get_profile_registry
+from .services.process_stage2 import (
+    get_provider_pool,
+    get_rate_limiter,
+    iter_process_receipts_batch,
+    run_process_receipts_batch,
+    run_process_statement,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        names = get_profile_registry(get_settings()).preload()
+        logger.info("Preloaded DocFlow profiles: %s", ", ".join(names) or "-")
+    except Exception:  # noqa: BLE001
+        # Profiles still load lazily on first use; a bad profile must not block startup.
+        logger.exception("Failed to preload DocFlow profiles")
+    jobs_task = asyncio.create_task(_jobs_heartbeat(get_settings()))
+    yield
+    jobs_task.cancel()
+    get_job_runner(get_settings()).shutdown()
+    get_offload_pool().shutdown()
+    shutdown_cpu_pool()
+
+
+async def _jobs_heartbeat(settings: Settings) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(get_job_runner(settings).heartbeat)
+        except Exception:  # noqa: BLE001
+            logger.exception("Job heartbeat failed")
+        await asyncio.sleep(settings.jobs_poll_seconds)
+
 
 app = FastAPI(
     title="Rendiciones Cloud Run Service",
     version="0.1.0",
     description="Skeleton implementation for normalize/finalize endpoints.",
+    lifespan=lifespan,
 )
 
+# Non-standard status (nginx convention) used when the client went away mid-request.
+CLIENT_CLOSED_REQUEST = 499
+
+
+def _overloaded(exc: OffloadRejected) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail={"code": "OVERLOADED", "message": str(exc), "details": get_offload_pool().stats()},
+    )
+
+
+async def _offload(http_request: Request, fn, *args):
+    try:
+        return await get_offload_pool().run(fn, *args, is_disconnected=http_request.is_disconnected)
+    except OffloadRejected as exc:
+        raise _overloaded(exc) from exc
+
+
+def _stream_record(event, sse: bool) -> str:
+    payload = event.model_dump_json()
+    if sse:
+        return f"event: {event.type}\ndata: {payload}\n\n"
+    return payload + "\n"
+
 
 @app.get("/healthz")
 async def healthcheck():
     return {"ok": True}
 
 
+@app.get("/v1/stats")
+async def stats(settings: Settings = Depends(get_settings)):
+    cache = get_extraction_cache(settings)
+    fetch_cache = get_fetch_cache(settings)
+    return {
+        "offload": get_offload_pool().stats(),
+        "extractionCache": cache.stats() if cache else None,
+        "scheduler": get_scheduler(settings).stats(),
+        "rateLimiter": get_rate_limiter(settings).stats(),
+        "providers": get_provider_pool().stats(),
+        "profiles": get_profile_registry(settings).stats(),
+        "storage": gcs.stats(),
+        "fetchCache": fetch_cache.stats() if fetch_cache else None,
+    }
+
+
 @app.post("/v1/normalize", response_model=NormalizeResponse)
 async def normalize(
     request: NormalizeRequest, settings: Settings = Depends(get_settings)
@@ -38,6 +129,20 @@ async def normalize(
     return response
 
 
+@app.post("/v1/normalize/upload", response_model=NormalizeResponse)
+async def normalize_upload(
+    http_request: Request, settings: Settings = Depends(get_settings)
+) -> NormalizeResponse:
+    # The body is parsed incrementally: no base64, and files are normalized while the rest arrives.
+    response = await run_normalize_upload(
+        http_request.headers.get("content-type", ""), http_request.stream(), settings
+    )
+    if not response.ok and response.error:
+        status = 400 if response.error.code in {"INVALID_ARGUMENT"} else 500
+        raise HTTPException(status_code=status, detail=response.error.model_dump())
+    return response
+
+
 @app.post("/v1/finalize", response_model=FinalizeResponse)
 async def finalize(
     request: FinalizeRequest, settings: Settings = Depends(get_settings)
@@ -51,9 +156,14 @@ async def finalize(
 
 @app.post("/v1/process_statement", response_model=ProcessStatementResponse)
 async def process_statement(
-    request: ProcessStatementRequest, settings: Settings = Depends(get_settings)
+    request: ProcessStatementRequest,
+    http_request: Request,
+    settings: Settings = Depends(get_settings),
 ) -> ProcessStatementResponse:
-    response = run_process_statement(request, settings)
+    try:
+        response = await _offload(http_request, run_process_statement, request, settings)
+    except OffloadCancelled:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     if not response.ok and response.error:
         raise HTTPException(status_code=500, detail=response.error.model_dump())
     return response
@@ -61,14 +171,63 @@ async def process_statement(
 
 @app.post("/v1/process_receipts_batch", response_model=ProcessReceiptsBatchResponse)
 async def process_receipts_batch(
-    request: ProcessReceiptsBatchRequest, settings: Settings = Depends(get_settings)
+    request: ProcessReceiptsBatchRequest,
+    http_request: Request,
+    settings: Settings = Depends(get_settings),
 ) -> ProcessReceiptsBatchResponse:
-    response = run_process_receipts_batch(request, settings)
+    try:
+        response = await _offload(http_request, run_process_receipts_batch, request, settings)
+    except OffloadCancelled:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     if not response.ok and response.error:
         raise HTTPException(status_code=500, detail=response.error.model_dump())
     return response
 
 
+@app.post("/v1/process_receipts_stream")
+async def process_receipts_stream(
+    request: ProcessReceiptsBatchRequest,
+    http_request: Request,
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    events = get_offload_pool().stream(iter_process_receipts_batch, request, settings)
+    try:
+        # The start record arrives once the work is admitted to the pool, so overload
+        # still maps to a 503 before any body is sent.
+        first = await events.__anext__()
+    except OffloadRejected as exc:
+        raise _overloaded(exc) from exc
+
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+
+    async def body():
+        try:
+            yield _stream_record(first, sse)
+            async for event in events:
+                yield _stream_record(event, sse)
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(body(), media_type="text/event-stream" if sse else "application/x-ndjson")
+
+
+@app.post("/v1/jobs", response_model=JobStatus, status_code=202)
+async def create_job(request: JobRequest, settings: Settings = Depends(get_settings)) -> JobStatus:
+    record = await asyncio.to_thread(get_job_runner(settings).submit, request)
+    return JobStatus.model_validate(record.model_dump(exclude={"request"}))
+
+
+@app.get("/v1/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, settings: Settings = Depends(get_settings)) -> JobStatus:
+    record = await asyncio.to_thread(get_job_runner(settings).get, job_id)
+    if record is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "NOT_FOUND", "message": f"Job {job_id} not found", "details": {}},
+        )
+    return JobStatus.model_validate(record.model_dump(exclude={"request"}))
+
+
 # NOTE: uvicorn entrypoint is declared in Dockerfile; keep for local dev.
 def get_app() -> FastAPI:
     return app
@@ -1,6 +1,19 @@
-from typing import Any, List, Literal, Optional
+from typing import Annotated, Any, List, Literal, Optional
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+
+from .config import get_settings
+
+
+def _storage_uri(value: str) -> str:
+    # file:// reaches the container filesystem; clients may only use it when the operator
+    # has enabled local storage (and then only below REN_LOCAL_STORAGE_ROOT, see gcs._locate).
+    if value.startswith("file://") and not get_settings().local_storage_root:
+        raise ValueError("file:// URIs are disabled; set REN_LOCAL_STORAGE_ROOT to enable local storage")
+    return value
+
+
+StorageUri = Annotated[str, AfterValidator(_storage_uri)]
 
 
 class Warning(BaseModel):
@@ -25,7 +38,7 @@ class NormalizeInput(BaseModel):
     driveFolderId: str | None = Field(default=None)
     zipBase64: str | None = Field(default=None)
     zipFilename: str | None = Field(default=None)
-    zipGcsUri: str | None = Field(default=None)
+    zipGcsUri: StorageUri | None = Field(default=None)
     driveFileIds: List[str] | None = Field(default=None)
     files: List[InlineFile] | None = Field(default=None)
 
@@ -46,16 +59,28 @@ class NormalizeInput(BaseModel):
 
 
 class NormalizeOutput(BaseModel):
-    gcsPrefix: str = Field(
+    gcsPrefix: StorageUri = Field(
         ...,
-        description="gs://bucket/path/prefix/",
+        description="gs://bucket/path/prefix/ (or file:///dir/ below REN_LOCAL_STORAGE_ROOT for local runs)",
     )
 
 
 class NormalizeOptions(BaseModel):
-    jpgQuality: int = Field(default=90, ge=1, le=100)
+    jpgQuality: int = Field(default=90, ge=1, le=100, description="Encoder quality (upper bound with targetBytes).")
     maxSidePx: int = Field(default=2000, ge=1)
+    outputFormat: Literal["jpeg", "webp"] = Field(default="jpeg", description="Encoding of normalized images.")
+    progressive: bool = Field(default=False, description="Progressive JPEG (ignored for webp).")
+    targetBytes: int | None = Field(
+        default=None,
+        ge=1,
+        description="Per-image byte budget: quality is searched down from jpgQuality to minQuality until it fits.",
+    )
+    minQuality: int = Field(default=40, ge=1, le=100, description="Lowest quality tried for targetBytes.")
     pdfMode: Literal["keep", "rasterize"] = Field(default="keep")
+    resample: Literal["fast", "balanced", "archival"] = Field(
+        default="balanced",
+        description="Decode/resize tier: fast (draft + bilinear), balanced (draft + Lanczos), archival (full decode + Lanczos).",
+    )
     uploadOriginals: bool = Field(
         default=False,
         description="If true, upload originals under originals/; default false.",
@@ -69,14 +94,44 @@ class NormalizeRequest(BaseModel):
     options: NormalizeOptions | None = None
 
 
+class NormalizeUploadMetadata(BaseModel):
+    """`metadata` form field of /v1/normalize/upload; files come as separate parts."""
+
+    rendicionId: str
+    output: NormalizeOutput
+    options: NormalizeOptions | None = None
+
+
+class NormalizedPage(BaseModel):
+    pageNumber: int = Field(description="1-based page number in the parent PDF.")
+    parentGcsUri: StorageUri | None = Field(default=None, description="Normalized PDF this page was rendered from.")
+    gcsUri: StorageUri
+    mime: str
+    sha256: str
+    bytes: int | None = None
+    width: int | None = None
+    height: int | None = None
+
+
 class NormalizedArtifact(BaseModel):
     gcsUri: str
     mime: str
     sha256: str
     bytes: int | None = None
+    width: int | None = None
+    height: int | None = None
+    quality: int | None = Field(
+        default=None,
+        description="Encoder quality used (may be below jpgQuality with targetBytes).",
+    )
+    bytesPerPixel: float | None = None
     pageCount: int | None = None
     originalGcsUri: str | None = None
     originalMime: str | None = None
+    pages: List[NormalizedPage] | None = Field(
+        default=None,
+        description="Per-page JPEG renders of a PDF (pdfMode=rasterize), in page order.",
+    )
 
 
 class SourceInfo(BaseModel):
@@ -100,7 +155,7 @@ class NormalizeResponse(BaseModel):
 
 # -------- Finalize --------
 class CoverRef(BaseModel):
-    gcsUri: str | None = None
+    gcsUri: StorageUri | None = None
     driveFileId: str | None = None
     signedUrl: str | None = None
 
@@ -113,7 +168,7 @@ class CoverRef(BaseModel):
 
 
 class XlsmTemplateRef(BaseModel):
-    gcsUri: str | None = None
+    gcsUri: StorageUri | None = None
     driveFileId: str | None = None
 
     @model_validator(mode="after")
@@ -125,9 +180,13 @@ class XlsmTemplateRef(BaseModel):
 
 
 class FinalizeNormalizedItem(BaseModel):
-    gcsUri: str
+    gcsUri: StorageUri
     mime: str | None = None
     originalName: str | None = None
+    pages: List[NormalizedPage] | None = Field(
+        default=None,
+        description="Pre-rendered pages of a PDF item; when present they are merged instead of the PDF.",
+    )
 
 
 class XlsmValue(BaseModel):
@@ -146,7 +205,7 @@ class FinalizeInputs(BaseModel):
 
 class FinalizeOutput(BaseModel):
     driveFolderId: str | None = None
-    gcsPrefix: str | None = None
+    gcsPrefix: StorageUri | None = None
 
     @model_validator(mode="after")
     def validate_one_of(cls, values: "FinalizeOutput") -> "FinalizeOutput":
@@ -187,10 +246,14 @@ class FinalizeResponse(BaseModel):
 
 # -------- Stage 2 --------
 class DocumentRef(BaseModel):
-    gcsUri: str | None = None
+    gcsUri: StorageUri | None = None
     signedUrl: str | None = None
     driveFileId: str | None = None
     mime: str | None = None
+    sha256: str | None = Field(
+        default=None,
+        description="Content hash from the normalize manifest; lets cached results skip the download.",
+    )
 
     @model_validator(mode="after")
     def validate_one_of(cls, values: "DocumentRef") -> "DocumentRef":
@@ -208,11 +271,34 @@ class ProcessOptions(BaseModel):
         ge=1,
         description="Override max side in pixels when rasterizing statement PDFs.",
     )
+    rasterFormat: Literal["png", "jpeg", "webp"] | None = Field(
+        default=None,
+        description="Image format for rasterized statement pages (defaults to REN_RASTER_FORMAT).",
+    )
+    rasterQuality: int | None = Field(
+        default=None,
+        ge=1,
+        le=100,
+        description="JPEG/WebP quality for rasterized statement pages.",
+    )
+    pages: str | None = Field(
+        default=None,
+        description='1-based page ranges of the statement PDF to process, e.g. "1-3,5" or "2-".',
+    )
+    windowPages: int | None = Field(
+        default=None,
+        ge=0,
+        description="Pages per concurrent extraction window for long statements (0 = single call).",
+    )
 
 
 class ProcessStatementRequest(BaseModel):
     rendicionId: str
     statement: DocumentRef
+    pages: List[DocumentRef] | None = Field(
+        default=None,
+        description="Pre-rendered statement pages in order (normalize pdfMode=rasterize); skips rasterizing the PDF.",
+    )
     options: ProcessOptions | None = None
 
 
@@ -254,3 +340,83 @@ class ProcessReceiptsBatchResponse(BaseModel):
     rows: List[DocflowRow] | None = None
     warnings: List[Warning] | None = None
     error: ErrorPayload | None = None
+
+
+class ReceiptStreamStart(BaseModel):
+    type: Literal["start"] = "start"
+    rendicionId: str
+    total: int
+
+
+class ReceiptStreamRow(BaseModel):
+    type: Literal["row"] = "row"
+    index: int = Field(..., description="Position of the receipt in the request's receipts[].")
+    row: DocflowRow
+
+
+class ReceiptStreamSummary(BaseModel):
+    type: Literal["summary"] = "summary"
+    ok: bool
+    rendicionId: str
+    total: int
+    completed: int
+    warnings: List[Warning] | None = None
+    error: ErrorPayload | None = None
+
+
+# -------- Jobs --------
+class JobExtractSpec(BaseModel):
+    mode: Literal["efectivo", "tarjeta"]
+    statement: StatementContext | None = None
+    options: ProcessOptions | None = None
+
+    @model_validator(mode="after")
+    def validate_statement_for_mode(cls, values: "JobExtractSpec") -> "JobExtractSpec":
+        if values.mode == "tarjeta" and not values.statement:
+            raise ValueError("extract.statement.parsed is required when mode=tarjeta")
+        return values
+
+
+class JobRequest(BaseModel):
+    kind: Literal["normalize_extract", "finalize"]
+    normalize: NormalizeRequest | None = None
+    extract: JobExtractSpec | None = None
+    finalize: FinalizeRequest | None = None
+
+    @model_validator(mode="after")
+    def validate_stage(cls, values: "JobRequest") -> "JobRequest":
+        if values.kind == "normalize_extract" and not (values.normalize and values.extract):
+            raise ValueError("kind=normalize_extract requires normalize and extract")
+        if values.kind == "finalize" and not values.finalize:
+            raise ValueError("kind=finalize requires finalize")
+        return values
+
+    @property
+    def rendicionId(self) -> str:
+        stage = self.normalize if self.kind == "normalize_extract" else self.finalize
+        return stage.rendicionId
+
+
+class JobItem(BaseModel):
+    index: int
+    status: Literal["pending", "done", "failed"] = "pending"
+    normalized: NormalizeItem | None = None
+    row: DocflowRow | None = None
+    error: ErrorPayload | None = None
+
+
+class JobStatus(BaseModel):
+    jobId: str
+    kind: Literal["normalize_extract", "finalize"]
+    rendicionId: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: str | None = None
+    createdAt: str
+    updatedAt: str
+    total: int | None = None
+    completed: int = 0
+    items: List[JobItem] = Field(default_factory=list)
+    normalize: NormalizeResponse | None = None
+    finalize: FinalizeResponse | None = None
+    warnings: List[Warning] | None = None
+    error: ErrorPayload | None = None
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import io
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, List
+
+from PIL import Image
+
+
+RASTER_FORMATS = {
+    "png": ("image/png", "png", "PNG"),
+    "jpeg": ("image/jpeg", "jpg", "JPEG"),
+    "webp": ("image/webp", "webp", "WEBP"),
+}
+POINTS_PER_INCH = 72.0
+
+
+@dataclass(frozen=True)
+class RasterOptions:
+    max_side: int
+    fmt: str = "jpeg"
+    quality: int = 85
+    max_dpi: int | None = 200
+    pages: str | None = None
+
+
+@dataclass
+class RenderedPage:
+    page_number: int  # 1-based
+    data: bytes
+    mime: str
+    ext: str
+    width: int
+    height: int
+
+
+def _fitz():
+    try:
+        import fitz  # PyMuPDF
+    except Exception as exc:  # noqa: BLE001
+        raise RuntimeError("PyMuPDF no está instalado") from exc
+    return fitz
+
+
+def parse_page_ranges(spec: str | None, page_count: int) -> List[int]:
+    """
+    "1-3,5,8-" -> 0-based page indices, in document order. None/"" selects every page.
+    Pages past the end are ignored.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+    selected: set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start_raw, end_raw = part.split("-", 1)
+                start = int(start_raw) if start_raw.strip() else 1
+                end = int(end_raw) if end_raw.strip() else page_count
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValueError(f"Rango de páginas inválido: {part}") from None
+        if start < 1 or end < start:
+            raise ValueError(f"Rango de páginas inválido: {part}")
+        selected.update(range(start - 1, min(end, page_count)))
+    return sorted(selected)
+
+
+def page_scale(width_pt: float, height_pt: float, max_side: int, max_dpi: int | None) -> float:
+    """Fits the longest side to max_side, but never renders small pages above max_dpi."""
+    scale = max_side / max(width_pt, height_pt)
+    if max_dpi:
+        scale = min(scale, max_dpi / POINTS_PER_INCH)
+    return scale
+
+
+def _encode_pixmap(pix, opts: RasterOptions) -> bytes:
+    if opts.fmt == "png":
+        return pix.tobytes("png")
+    _, _, pil_format = RASTER_FORMATS[opts.fmt]
+    image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    buf = io.BytesIO()
+    image.save(buf, format=pil_format, quality=opts.quality)
+    return buf.getvalue()
+
+
+def render_pages(pdf_bytes: bytes, indices: List[int], opts: RasterOptions) -> List[RenderedPage]:
+    """Renders the given 0-based pages. Top-level so it can run in a process pool."""
+    fitz = _fitz()
+    mime, ext, _ = RASTER_FORMATS[opts.fmt]
+    pages: List[RenderedPage] = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for i in indices:
+            page = doc[i]
+            scale = page_scale(page.rect.width, page.rect.height, opts.max_side, opts.max_dpi)
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False, colorspace=fitz.csRGB)
+            pages.append(
+                RenderedPage(
+                    page_number=i + 1,
+                    data=_encode_pixmap(pix, opts),
+                    mime=mime,
+                    ext=ext,
+                    width=pix.width,
+                    height=pix.height,
+                )
+            )
+    return pages
+
+
+def pdf_page_count(pdf_bytes: bytes) -> int:
+    fitz = _fitz()
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def submit_rasterize(
+    pdf_bytes: bytes,
+    opts: RasterOptions,
+    executor: Executor | None = None,
+    workers: int = 1,
+) -> Callable[[], List[RenderedPage]]:
+    """
+    Starts rendering the selected pages, spread over `workers` tasks on `executor` (a
+    process pool) when more than one page is requested, and returns a callable that waits
+    for the pages in page order. Pages are interleaved across tasks so dense and sparse
+    pages balance out. Without an executor the pages render when the callable is invoked.
+    """
+    if opts.fmt not in RASTER_FORMATS:
+        raise ValueError(f"Formato de rasterizado no soportado: {opts.fmt}")
+    page_count = pdf_page_count(pdf_bytes)
+    if page_count < 1:
+        raise ValueError("PDF sin páginas")
+    indices = parse_page_ranges(opts.pages, page_count)
+    if not indices:
+        raise ValueError(f"El rango de páginas {opts.pages!r} no selecciona ninguna página")
+
+    tasks = max(1, min(workers, len(indices)))
+    if executor is None or tasks == 1:
+        return partial(render_pages, pdf_bytes, indices, opts)
+
+    groups = [indices[i::tasks] for i in range(tasks)]
+    futures = [executor.submit(render_pages, pdf_bytes, group, opts) for group in groups]
+
+    def _collect() -> List[RenderedPage]:
+        pages = [page for fut in futures for page in fut.result()]
+        pages.sort(key=lambda p: p.page_number)
+        return pages
+
+    return _collect
+
+
+def rasterize_pdf(
+    pdf_bytes: bytes,
+    opts: RasterOptions,
+    executor: Executor | None = None,
+    workers: int = 1,
+) -> List[RenderedPage]:
+    """Renders the selected pages (in parallel on `executor` when given), in page order."""
+    return submit_rasterize(pdf_bytes, opts, executor, workers)()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, List
+
+from ..config import Settings
+from ..execution import OffloadCancelled
+from ..json_store import JsonStore
+
+
+@dataclass
+class CachedExtraction:
+    """Rehydrated extraction result; exposes the same `data`/`meta` fields the handlers use."""
+
+    data: Any
+    meta: dict[str, Any] | None
+
+
+def profile_fingerprint(profile) -> str:
+    payload = {
+        "prompt": getattr(profile, "prompt", None),
+        "system_instruction": getattr(profile, "system_instruction", None),
+        "schema": getattr(profile, "schema", None),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_cache_key(
+    doc_hashes: List[str],
+    profile_name: str,
+    profile,
+    model: str | None,
+    multi_mode: str,
+) -> str:
+    parts = [
+        "v1",
+        ",".join(doc_hashes),
+        profile_name,
+        profile_fingerprint(profile),
+        model or "default",
+        multi_mode,
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Two-tier cache for DocFlow results: in-memory LRU in front of an optional persistent
+    tier. Concurrent lookups of the same key are coalesced so only one extraction runs.
+    """
+
+    def __init__(self, max_items: int, persistent_uri: str | None = None) -> None:
+        self._max_items = max_items
+        self._memory: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+        self._persistent = JsonStore(persistent_uri) if persistent_uri else None
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "memoryHits": 0,
+            "persistentHits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "persistentErrors": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _remember(self, key: str, value: dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._max_items:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str, count: bool = True) -> dict[str, Any] | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                if count:
+                    self._counters["memoryHits"] += 1
+                return value
+        if self._persistent is None:
+            return None
+        try:
+            value = self._persistent.get(key)
+        except Exception:  # noqa: BLE001
+            self._count("persistentErrors")
+            return None
+        if value is not None:
+            if count:
+                self._count("persistentHits")
+            self._remember(key, value)
+        return value
+
+    def contains(self, key: str) -> bool:
+        """Presence check that does not touch hit counters (promotes persistent hits to memory)."""
+        return self._lookup(key, count=False) is not None
+
+    def get(self, key: str) -> CachedExtraction | None:
+        value = self._lookup(key)
+        if value is None:
+            return None
+        return CachedExtraction(data=value.get("data"), meta=value.get("meta"))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            with self._lock:
+                pending = self._inflight.get(key)
+                leader = pending is None
+                if leader:
+                    pending = Future()
+                    self._inflight[key] = pending
+                else:
+                    self._counters["coalesced"] += 1
+            if leader:
+                break
+            try:
+                return pending.result()
+            except OffloadCancelled:
+                # The leader's client went away; take over instead of failing this request.
+                continue
+
+        self._count("misses")
+        try:
+            result = compute()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_exception(exc)
+            raise
+        value = {"data": getattr(result, "data", None), "meta": getattr(result, "meta", None)}
+        self._remember(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        pending.set_result(result)
+        self._persist(key, value)
+        return result
+
+    def _persist(self, key: str, value: dict[str, Any]) -> None:
+        if self._persistent is None:
+            return
+        try:
+            self._persistent.put(key, value)
+        except Exception:  # noqa: BLE001
+            self._count("persistentErrors")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "memoryItems": len(self._memory),
+                "maxItems": self._max_items,
+                "persistent": self._persistent is not None,
+                "inflight": len(self._inflight),
+            }
+
+
+@lru_cache
+def _extraction_cache(max_items: int, persistent_uri: str | None) -> ExtractionCache:
+    return ExtractionCache(max_items=max_items, persistent_uri=persistent_uri)
+
+
+def get_extraction_cache(settings: Settings) -> ExtractionCache | None:
+    if not settings.docflow_cache_enabled:
+        return None
+    return _extraction_cache(settings.docflow_cache_max_items, settings.docflow_cache_uri)
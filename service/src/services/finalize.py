@@ -2,20 +2,18 @@ from __future__ import annotations
 
 import io
 import os
+import tempfile
+from contextlib import ExitStack, closing
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import BinaryIO, List
 
-from google.auth import default as google_auth_default  # type: ignore
-from google.auth.transport.requests import Request as GoogleAuthRequest  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
-from googleapiclient.http import MediaIoBaseUpload  # type: ignore
 from openpyxl import load_workbook
 from pypdf import PdfReader, PdfWriter
 from PIL import Image
 
-from .. import gcs
+from .. import drive, gcs
 from ..config import Settings
-from ..fetch import fetch_bytes
+from ..fetch import fetch_bytes, iter_fetch_many
 from ..models import (
     ErrorPayload,
     FinalizeArtifact,
@@ -26,21 +24,6 @@ from ..models import (
 from ..utils import SUPPORTED_IMAGE_EXTS, ensure_rgb
 
 
-def _drive_service():
-    creds, _ = google_auth_default(scopes=["https://www.googleapis.com/auth/drive.file"])
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(GoogleAuthRequest())
-    return build("drive", "v3", credentials=creds, cache_discovery=False)
-
-
-def _upload_drive_file(name: str, folder_id: str, data: bytes, mime_type: str) -> str:
-    service = _drive_service()
-    media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mime_type, resumable=False)
-    metadata = {"name": name, "parents": [folder_id]}
-    file = service.files().create(body=metadata, media_body=media, fields="id").execute()
-    return file["id"]
-
-
 def _image_bytes_to_pdf_page(image_bytes: bytes) -> bytes:
     image = Image.open(io.BytesIO(image_bytes))
     image = ensure_rgb(image)
@@ -63,16 +46,44 @@ def _load_template_bytes(template_ref, settings: Settings) -> bytes:
     return fetch_bytes(template_ref, settings)
 
 
+def _spool(stack: ExitStack, settings: Settings) -> BinaryIO:
+    return stack.enter_context(
+        tempfile.SpooledTemporaryFile(max_size=settings.finalize_spool_bytes, dir=settings.normalize_spool_dir)
+    )
+
+
+def _rewind(fileobj: BinaryIO) -> int:
+    """Size of the spooled output, left positioned at its start for the upload."""
+    size = fileobj.seek(0, io.SEEK_END)
+    fileobj.seek(0)
+    return size
+
+
 async def run_finalize(request: FinalizeRequest, settings: Settings) -> FinalizeResponse:
+    with ExitStack() as stack:
+        return await _run_finalize(request, settings, stack)
+
+
+async def _run_finalize(request: FinalizeRequest, settings: Settings, stack: ExitStack) -> FinalizeResponse:
     warnings: List[Warning] = []
 
     pdf_name = request.options.pdfName if request.options else "rendicion.pdf"
     xlsm_name = request.options.xlsmName if request.options else "rendicion.xlsm"
     signed_ttl = request.options.signedUrlTtlSeconds if request.options else settings.default_signed_url_ttl
 
+    # Cover, items and rendered pages are downloaded concurrently (bounded look-ahead) and
+    # consumed in merge order.
+    refs = [request.inputs.cover.model_dump()]
+    for item in request.inputs.normalizedItems:
+        if item.pages:
+            refs.extend({"gcsUri": page.gcsUri} for page in item.pages)
+        else:
+            refs.append(item.model_dump())
+    fetched = stack.enter_context(closing(iter_fetch_many(refs, settings)))
+
     # Fetch cover
     try:
-        cover_bytes = fetch_bytes(request.inputs.cover.model_dump(), settings)
+        cover_bytes = next(fetched).unwrap()
     except Exception as exc:  # noqa: BLE001
         return FinalizeResponse(
             ok=False,
@@ -105,7 +116,13 @@ async def run_finalize(request: FinalizeRequest, settings: Settings) -> Finalize
 
     for item in request.inputs.normalizedItems:
         try:
-            content = fetch_bytes(item.model_dump(), settings)
+            if item.pages:
+                # PDF already rendered by normalize (pdfMode=rasterize): merge its page images.
+                pages = [next(fetched) for _ in item.pages]
+                for page in pages:
+                    append_pdf_content(_image_bytes_to_pdf_page(page.unwrap()))
+                continue
+            content = next(fetched).unwrap()
             ext = ""
             if item.mime:
                 ext = item.mime.split("/")[-1]
@@ -133,9 +150,10 @@ async def run_finalize(request: FinalizeRequest, settings: Settings) -> Finalize
                 )
             )
 
-    pdf_buf = io.BytesIO()
-    writer.write(pdf_buf)
-    final_pdf_bytes = pdf_buf.getvalue()
+    # Outputs are written to spooled temp files and streamed to storage, so large
+    # rendiciones are not held again as one bytes object for the upload.
+    final_pdf = _spool(stack, settings)
+    writer.write(final_pdf)
 
     # Build XLSM
     try:
@@ -146,9 +164,8 @@ async def run_finalize(request: FinalizeRequest, settings: Settings) -> Finalize
         for cell_value in request.inputs.xlsmValues:
             ws = wb[cell_value.sheet]
             ws.cell(row=cell_value.row, column=cell_value.col).value = cell_value.value
-        xlsm_buf = io.BytesIO()
-        wb.save(xlsm_buf)
-        final_xlsm_bytes = xlsm_buf.getvalue()
+        final_xlsm = _spool(stack, settings)
+        wb.save(final_xlsm)
     except Exception as exc:  # noqa: BLE001
         return FinalizeResponse(
             ok=False,
@@ -165,13 +182,17 @@ async def run_finalize(request: FinalizeRequest, settings: Settings) -> Finalize
     try:
         if request.output.gcsPrefix:
             prefix = gcs.normalize_prefix(request.output.gcsPrefix)
-            pdf_uri = gcs.upload_bytes(
-                final_pdf_bytes, f"{prefix}outputs/{pdf_name}", content_type="application/pdf"
+            pdf_uri = gcs.upload_stream(
+                final_pdf,
+                f"{prefix}outputs/{pdf_name}",
+                content_type="application/pdf",
+                size=_rewind(final_pdf),
             )
-            xlsm_uri = gcs.upload_bytes(
-                final_xlsm_bytes,
+            xlsm_uri = gcs.upload_stream(
+                final_xlsm,
                 f"{prefix}outputs/{xlsm_name}",
                 content_type="application/vnd.ms-excel.sheet.macroEnabled.12",
+                size=_rewind(final_xlsm),
             )
             pdf_artifact.gcsUri = pdf_uri
             xlsm_artifact.gcsUri = xlsm_uri
@@ -209,12 +230,21 @@ async def run_finalize(request: FinalizeRequest, settings: Settings) -> Finalize
                         details={},
                     ),
                 )
-            pdf_drive_id = _upload_drive_file(pdf_name, request.output.driveFolderId, final_pdf_bytes, "application/pdf")
-            xlsm_drive_id = _upload_drive_file(
+            _rewind(final_pdf)
+            _rewind(final_xlsm)
+            pdf_drive_id = drive.upload_file(
+                pdf_name,
+                request.output.driveFolderId,
+                final_pdf,
+                "application/pdf",
+                chunk_size=settings.drive_chunk_bytes,
+            )
+            xlsm_drive_id = drive.upload_file(
                 xlsm_name,
                 request.output.driveFolderId,
-                final_xlsm_bytes,
+                final_xlsm,
                 "application/vnd.ms-excel.sheet.macroEnabled.12",
+                chunk_size=settings.drive_chunk_bytes,
             )
             pdf_artifact.driveFileId = pdf_drive_id
             xlsm_artifact.driveFileId = xlsm_drive_id
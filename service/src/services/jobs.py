@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+from .. import gcs
+from ..config import Settings, get_settings
+from ..models import (
+    DocumentRef,
+    ErrorPayload,
+    JobItem,
+    JobRequest,
+    JobStatus,
+    ProcessReceiptsBatchRequest,
+    ReceiptStreamRow,
+    ReceiptStreamSummary,
+)
+from .finalize import run_finalize
+from .normalize import run_normalize
+from .process_stage2 import iter_process_receipts_batch
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class LeaseLost(RuntimeError):
+    """Another instance took over this job's lease; this instance must stop writing to it."""
+
+
+class JobRecord(JobStatus):
+    """Persisted job: the public status plus the request needed to resume it."""
+
+    request: JobRequest
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SqliteJobStore:
+    """Local stand-in for the GCS store (single instance / local development)."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL,"
+                " lease_owner TEXT, lease_expires REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=30)
+
+    def save(self, record: JobRecord) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, payload) VALUES (?, ?, ?)"
+                " ON CONFLICT(job_id) DO UPDATE SET status=excluded.status, payload=excluded.payload",
+                (record.jobId, record.status, record.model_dump_json()),
+            )
+
+    def load(self, job_id: str) -> JobRecord | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobRecord.model_validate_json(row[0]) if row else None
+
+    def list_active(self) -> List[JobRecord]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+            ).fetchall()
+        return [JobRecord.model_validate_json(row[0]) for row in rows]
+
+    def claim(self, job_id: str, owner: str, expires_at: float) -> bool:
+        """Takes or renews the lease unless another owner holds an unexpired one (atomic)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_owner = ?, lease_expires = ? WHERE job_id = ?"
+                " AND (lease_owner IS NULL OR lease_owner = ? OR lease_expires IS NULL OR lease_expires <= ?)",
+                (owner, expires_at, job_id, owner, time.time()),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_owner = NULL, lease_expires = NULL WHERE job_id = ? AND lease_owner = ?",
+                (job_id, owner),
+            )
+
+    def lease(self, job_id: str) -> Tuple[str | None, float | None]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT lease_owner, lease_expires FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+
+class GcsJobStore:
+    """
+    One JSON object per job (plus a small lease object) under <prefix>jobs/. Queued and
+    running jobs also have an empty marker under <prefix>jobs/active/, removed when they
+    finish, so resuming never reads the records of finished jobs.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        self._prefix = gcs.normalize_prefix(prefix) + "jobs/"
+        self._marked: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _record_uri(self, job_id: str) -> str:
+        return f"{self._prefix}{job_id}.json"
+
+    def _lease_uri(self, job_id: str) -> str:
+        return f"{self._prefix}{job_id}.lease"
+
+    def _active_uri(self, job_id: str) -> str:
+        return f"{self._prefix}active/{job_id}"
+
+    def save(self, record: JobRecord) -> None:
+        gcs.upload_bytes(
+            record.model_dump_json().encode("utf-8"),
+            self._record_uri(record.jobId),
+            content_type="application/json",
+        )
+        # The marker is written on the first active save seen here, not on every checkpoint.
+        with self._lock:
+            active = record.status in ACTIVE_STATUSES
+            mark = active and record.jobId not in self._marked
+            if active:
+                self._marked.add(record.jobId)
+            else:
+                self._marked.discard(record.jobId)
+        if mark:
+            gcs.upload_bytes(b"", self._active_uri(record.jobId))
+        elif not active:
+            gcs.delete_if_exists(self._active_uri(record.jobId))
+
+    def load(self, job_id: str) -> JobRecord | None:
+        raw = gcs.download_bytes_if_exists(self._record_uri(job_id))
+        return JobRecord.model_validate_json(raw) if raw else None
+
+    def list_active(self) -> List[JobRecord]:
+        records = []
+        for uri in gcs.list_uris(f"{self._prefix}active/"):
+            job_id = uri.rsplit("/", 1)[-1]
+            record = self.load(job_id)
+            if record is None or record.status not in ACTIVE_STATUSES:
+                # Finished (or never saved) after its marker was written.
+                gcs.delete_if_exists(uri)
+                continue
+            records.append(record)
+        return records
+
+    def _read_lease(self, job_id: str) -> Tuple[str | None, float | None, str | None]:
+        """(owner, expiresAt, generation); generation is None when there is no lease object."""
+        try:
+            raw, generation = gcs.download_versioned(self._lease_uri(job_id))
+        except NotFound:
+            return None, None, None
+        data = json.loads(raw) if raw else {}
+        return data.get("owner"), data.get("expiresAt"), generation
+
+    def _write_lease(self, job_id: str, owner: str | None, expires_at: float | None, generation: str | None) -> bool:
+        payload = json.dumps({"owner": owner, "expiresAt": expires_at}).encode("utf-8")
+        try:
+            gcs.upload_if_generation(payload, self._lease_uri(job_id), generation, content_type="application/json")
+        except PreconditionFailed:
+            # Another instance rewrote the lease since we read it: it won.
+            return False
+        return True
+
+    def claim(self, job_id: str, owner: str, expires_at: float) -> bool:
+        """
+        Takes or renews the lease unless another owner holds an unexpired one. The write is
+        conditioned on the generation that was read, so of two instances taking over the
+        same expired lease only one succeeds.
+        """
+        holder, holder_expires, generation = self._read_lease(job_id)
+        if holder and holder != owner and holder_expires and holder_expires > time.time():
+            return False
+        return self._write_lease(job_id, owner, expires_at, generation)
+
+    def release(self, job_id: str, owner: str) -> None:
+        holder, _, generation = self._read_lease(job_id)
+        if holder == owner:
+            self._write_lease(job_id, None, None, generation)
+
+    def lease(self, job_id: str) -> Tuple[str | None, float | None]:
+        holder, holder_expires, _ = self._read_lease(job_id)
+        return holder, holder_expires
+
+
+def open_job_store(uri: str) -> SqliteJobStore | GcsJobStore:
+    if uri.startswith(("gs://", "file://")):
+        return GcsJobStore(uri)
+    if uri.startswith("sqlite:///"):
+        uri = uri[len("sqlite:///") :]
+    return SqliteJobStore(uri)
+
+
+class JobRunner:
+    """
+    Runs whole stages (normalize + extract, or finalize) in the background and persists
+    progress after every checkpoint. Running jobs hold a lease that is renewed while this
+    instance is alive; jobs whose lease expired (instance restarted or scaled down) are
+    picked up again and continue from their last checkpoint.
+    """
+
+    def __init__(self, store: SqliteJobStore | GcsJobStore, settings: Settings) -> None:
+        self.store = store
+        self.settings = settings
+        self.instance_id = uuid.uuid4().hex
+        self._executor = ThreadPoolExecutor(max_workers=settings.jobs_workers, thread_name_prefix="jobs")
+        self._active: set[str] = set()
+        self._lost: set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, request: JobRequest) -> JobRecord:
+        now = _now_iso()
+        record = JobRecord(
+            jobId=uuid.uuid4().hex,
+            kind=request.kind,
+            rendicionId=request.rendicionId,
+            status="queued",
+            createdAt=now,
+            updatedAt=now,
+            request=request,
+        )
+        self.store.save(record)
+        self._start(record)
+        return record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        return self.store.load(job_id)
+
+    def heartbeat(self) -> List[str]:
+        """Renews leases of jobs running here and resumes active jobs whose lease expired."""
+        expires_at = time.time() + self.settings.jobs_lease_seconds
+        with self._lock:
+            active = list(self._active - self._lost)
+        for job_id in active:
+            if not self.store.claim(job_id, self.instance_id, expires_at):
+                logger.warning("Lease of job %s was taken over by another instance; stopping it here", job_id)
+                with self._lock:
+                    self._lost.add(job_id)
+
+        resumed = []
+        for record in self.store.list_active():
+            with self._lock:
+                if record.jobId in self._active:
+                    continue
+            owner, lease_expires = self.store.lease(record.jobId)
+            if owner and owner != self.instance_id and lease_expires and lease_expires > time.time():
+                continue
+            if self._start(record, resume=True):
+                resumed.append(record.jobId)
+        return resumed
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, record: JobRecord, resume: bool = False) -> bool:
+        with self._lock:
+            if record.jobId in self._active:
+                return False
+            self._active.add(record.jobId)
+        try:
+            claimed = self.store.claim(
+                record.jobId, self.instance_id, time.time() + self.settings.jobs_lease_seconds
+            )
+            if claimed and resume:
+                # Progress may have moved on since list_active; continue from the latest checkpoint.
+                record = self.store.load(record.jobId) or record
+        except BaseException:
+            with self._lock:
+                self._active.discard(record.jobId)
+            raise
+        if not claimed:
+            with self._lock:
+                self._active.discard(record.jobId)
+            logger.info("Job %s is leased by another instance; skipping", record.jobId)
+            return False
+        if resume:
+            logger.info("Resuming job %s (%s, stage=%s)", record.jobId, record.kind, record.stage)
+        self._executor.submit(self._run, record)
+        return True
+
+    def _save(self, record: JobRecord) -> None:
+        with self._lock:
+            lost = record.jobId in self._lost
+        if lost:
+            raise LeaseLost(f"Lease of job {record.jobId} is held by another instance")
+        record.updatedAt = _now_iso()
+        self.store.save(record)
+
+    def _run(self, record: JobRecord) -> None:
+        try:
+            record.status = "running"
+            self._save(record)
+            if record.kind == "normalize_extract":
+                self._run_normalize_extract(record)
+            else:
+                self._run_finalize(record)
+            if record.status == "running":
+                record.status = "succeeded"
+        except LeaseLost:
+            # The new owner continues from its last checkpoint; nothing more is written here.
+            logger.warning("Abandoning job %s: lease lost", record.jobId)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Job %s failed", record.jobId)
+            record.status = "failed"
+            record.error = ErrorPayload(
+                code="JOB_FAILED",
+                message=str(exc),
+                details={"stage": record.stage, "exceptionType": exc.__class__.__name__},
+            )
+        finally:
+            try:
+                self._save(record)
+                self.store.release(record.jobId, self.instance_id)
+            except LeaseLost:
+                pass
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to persist final state of job %s", record.jobId)
+            with self._lock:
+                self._active.discard(record.jobId)
+                self._lost.discard(record.jobId)
+
+    def _run_normalize_extract(self, record: JobRecord) -> None:
+        request = record.request
+        if record.normalize is None:
+            record.stage = "normalize"
+            self._save(record)
+            response = asyncio.run(run_normalize(request.normalize, self.settings))
+            record.normalize = response
+            record.items = [JobItem(index=i, normalized=item) for i, item in enumerate(response.items)]
+            record.total = len(record.items)
+            record.warnings = list(response.warnings or []) or None
+            self._save(record)
+            if not response.items and response.error:
+                record.status = "failed"
+                record.error = response.error
+                return
+
+        record.stage = "extract"
+        self._save(record)
+        remaining = [item for item in record.items if item.status != "done"]
+        if not remaining:
+            return
+
+        spec = request.extract
+        batch = ProcessReceiptsBatchRequest(
+            rendicionId=record.rendicionId,
+            mode=spec.mode,
+            statement=spec.statement,
+            options=spec.options,
+            receipts=[
+                DocumentRef(
+                    gcsUri=item.normalized.normalized.gcsUri,
+                    mime=item.normalized.normalized.mime,
+                    sha256=item.normalized.normalized.sha256,
+                )
+                for item in remaining
+            ],
+        )
+        last_checkpoint = time.monotonic()
+        for event in iter_process_receipts_batch(batch, self.settings):
+            if isinstance(event, ReceiptStreamRow):
+                item = remaining[event.index]
+                item.status = "done"
+                item.row = event.row
+                item.error = None
+                record.completed = sum(1 for it in record.items if it.status == "done")
+                if time.monotonic() - last_checkpoint >= self.settings.jobs_checkpoint_seconds:
+                    self._save(record)
+                    last_checkpoint = time.monotonic()
+            elif isinstance(event, ReceiptStreamSummary) and not event.ok:
+                for item in remaining:
+                    if item.status != "done":
+                        item.status = "failed"
+                        item.error = event.error
+                record.status = "failed"
+                record.error = event.error
+
+    def _run_finalize(self, record: JobRecord) -> None:
+        record.stage = "finalize"
+        self._save(record)
+        response = asyncio.run(run_finalize(record.request.finalize, self.settings))
+        record.finalize = response
+        if not response.ok:
+            record.status = "failed"
+            record.error = response.error
+
+
+@lru_cache
+def _job_runner(store_uri: str) -> JobRunner:
+    return JobRunner(open_job_store(store_uri), get_settings())
+
+
+def get_job_runner(settings: Settings) -> JobRunner:
+    return _job_runner(settings.jobs_store_uri)
@@ -1,221 +1,592 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import json
+import logging
+import queue
+import tempfile
+import threading
 import zipfile
+from contextlib import ExitStack
 from datetime import datetime, timezone
-from typing import Any, List, Tuple
+from functools import partial
+from typing import IO, Any, Callable, Iterable, List, Tuple
 
-from google.auth import default as google_auth_default  # type: ignore
-from google.auth.transport.requests import Request as GoogleAuthRequest  # type: ignore
-from googleapiclient.discovery import build  # type: ignore
-from googleapiclient.http import MediaIoBaseDownload  # type: ignore
-from pypdf import PdfReader
-from PIL import Image
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
-from .. import gcs
+from .. import drive, gcs
 from ..config import Settings
+from ..execution import bind_context, cpu_workers, get_cpu_pool
+from ..json_store import JsonStore
 from ..models import (
     ErrorPayload,
     NormalizeItem,
+    NormalizeOptions,
+    NormalizeOutput,
     NormalizeRequest,
     NormalizeResponse,
     NormalizedArtifact,
+    NormalizedPage,
     SourceInfo,
     Warning,
 )
+from ..rasterize import RasterOptions, RenderedPage, submit_rasterize
+from ..transform import Encoding, Transformed, is_supported, transform_entry
 from ..utils import (
-    SUPPORTED_IMAGE_EXTS,
     MIME_TYPE_MAP,
+    PDF_EXTS,
     decode_zip_base64,
-    image_to_jpeg_bytes,
-    apply_exif_orientation,
-    resize_image_max_side,
-    ensure_rgb,
     sha256_bytes,
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 def _exception_details(exc: Exception) -> dict[str, Any]:
     return {"error": str(exc), "exceptionType": exc.__class__.__name__}
 
 
-def _drive_service():
-    creds, _ = google_auth_default(scopes=["https://www.googleapis.com/auth/drive.readonly"])
-    if creds and creds.expired and creds.refresh_token:
-        creds.refresh(GoogleAuthRequest())
-    return build("drive", "v3", credentials=creds, cache_discovery=False)
+# (name, loader, source). Loaders return the raw bytes on demand so members of large
+# archives are only held in memory while their worker processes and uploads them.
+RawEntry = Tuple[str, Callable[[], bytes], SourceInfo]
+
+
+def _in_memory(data: bytes) -> Callable[[], bytes]:
+    return lambda: data
+
+
+def _zip_entries(zf: zipfile.ZipFile) -> List[RawEntry]:
+    return [
+        (info.filename, partial(zf.read, info), SourceInfo(originalName=info.filename))
+        for info in zf.infolist()
+        if not info.filename.endswith("/")
+    ]
+
+
+def _spool_gcs_zip(gcs_uri: str, stack: ExitStack, spool_dir: str | None) -> zipfile.ZipFile:
+    """Streams the archive to a temp file and opens it there; members are read lazily."""
+    spool = stack.enter_context(tempfile.TemporaryFile(dir=spool_dir))
+    gcs.download_to_file(gcs_uri, spool)
+    spool.seek(0)
+    return stack.enter_context(zipfile.ZipFile(spool))
 
 
-def _list_drive_folder(folder_id: str) -> List[Tuple[str, str]]:
+class _SpooledInput:
     """
-    Returns list of tuples (name, fileId).
+    Loader for an input held in a spooled temp file (Drive downloads, multipart parts): the
+    transform loads it from there and the original is streamed from the same file, so each
+    input is downloaded once and is not kept whole in memory until the upload stage.
     """
-    service = _drive_service()
-    page_token = None
-    files: List[Tuple[str, str]] = []
-    while True:
-        response = (
-            service.files()
-            .list(
-                q=f"'{folder_id}' in parents and trashed=false",
-                fields="nextPageToken, files(id, name)",
-                pageToken=page_token,
+
+    def __init__(self, spool: IO[bytes]) -> None:
+        self._spool = spool
+        self._lock = threading.Lock()
+
+    def __call__(self) -> bytes:
+        with self._lock:
+            self._spool.seek(0)
+            return self._spool.read()
+
+    def upload_to(self, uri: str) -> str:
+        with self._lock:
+            size = self._spool.seek(0, io.SEEK_END)
+            self._spool.seek(0)
+            return gcs.upload_stream(self._spool, uri, size=size)
+
+
+def _spool_drive_files(
+    file_ids: List[str], sizes: List[int | None], settings: Settings, stack: ExitStack
+) -> List[_SpooledInput | Exception]:
+    """Downloads Drive inputs concurrently on the I/O stage's worker budget, each into its own
+    spooled temp file; errors come back per file."""
+    spools = [
+        stack.enter_context(
+            tempfile.SpooledTemporaryFile(
+                max_size=settings.normalize_upload_spool_bytes, dir=settings.normalize_spool_dir
             )
-            .execute()
         )
-        for f in response.get("files", []):
-            files.append((f["name"], f["id"]))
-        page_token = response.get("nextPageToken")
-        if not page_token:
-            break
-    return files
-
-
-def _download_drive_file(file_id: str) -> bytes:
-    service = _drive_service()
-    request = service.files().get_media(fileId=file_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    return fh.getvalue()
-
+        for _ in file_ids
+    ]
+
+    def _download(pos: int) -> _SpooledInput | Exception:
+        try:
+            drive.download_to_file(
+                file_ids[pos],
+                spools[pos],
+                chunk_size=settings.drive_chunk_bytes,
+                parallel_min_bytes=settings.drive_parallel_min_bytes,
+                parallel_parts=settings.drive_parallel_parts,
+                size=sizes[pos],
+            )
+            return _SpooledInput(spools[pos])
+        except Exception as exc:  # noqa: BLE001
+            return exc
 
-def _get_drive_file_name(file_id: str) -> str:
-    service = _drive_service()
-    meta = service.files().get(fileId=file_id, fields="name").execute()
-    return meta.get("name", file_id)
+    if not file_ids:
+        return []
+    workers = max(1, min(len(file_ids), settings.normalize_workers))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive-input") as executor:
+        return list(executor.map(bind_context(_download), range(len(file_ids))))
 
 
-def _download_drive_entry(file_id: str, name: str | None) -> Tuple[str, bytes, SourceInfo]:
-    if not name:
-        name = _get_drive_file_name(file_id)
-    data = _download_drive_file(file_id)
-    return name, data, SourceInfo(driveFileId=file_id, originalName=name)
+def _original_copier(load: Callable[[], bytes]) -> Callable[[str], str]:
+    """Uploads the untouched input to a URI; spooled inputs stream from their temp file."""
+    if isinstance(load, _SpooledInput):
+        return load.upload_to
+    return lambda uri: gcs.upload_bytes(load(), uri)
 
 
-def _normalize_entry(
+def _upload_entry(
     idx: int,
     name: str,
-    data: bytes,
     source: SourceInfo,
+    transformed: Transformed,
+    original: Callable[[str], str] | None,
     *,
-    jpg_quality: int,
-    max_side: int,
-    pdf_mode: str,
-    upload_originals: bool,
     gcs_prefix: str,
-) -> Tuple[int, NormalizeItem | None, List[Warning]]:
+    rendered_pages: List[RenderedPage] | None = None,
+) -> Tuple[NormalizeItem, List[Warning]]:
     warnings: List[Warning] = []
-    ext = name.split(".")[-1].lower() if "." in name else ""
-    normalized_bytes: bytes | None = None
-    mime = ""
-    page_count = None
-    target_ext = ""
-    original_uri = None
-
-    try:
-        if ext in SUPPORTED_IMAGE_EXTS:
-            img = Image.open(io.BytesIO(data))
-            img = apply_exif_orientation(img)
-            img = resize_image_max_side(img, max_side)
-            img = ensure_rgb(img)
-            normalized_bytes = image_to_jpeg_bytes(img, jpg_quality)
-            mime = "image/jpeg"
-            target_ext = "jpg"
-        elif ext in {"pdf"}:
-            if pdf_mode == "rasterize":
-                warnings.append(
-                    Warning(
-                        code="PDF_RASTERIZE_NOT_IMPLEMENTED",
-                        message="pdfMode=rasterize not implemented; keeping PDF as-is.",
-                        details={"file": name},
-                    )
+    ext = _extension(name)
+    object_stem = f"{gcs_prefix}normalized/{idx:04d}_{transformed.sha256}"
+    gcs_uri = gcs.upload_bytes(transformed.data, f"{object_stem}.{transformed.ext}")
+
+    pages = None
+    if rendered_pages is not None:
+        pages = []
+        for page in rendered_pages:
+            page_sha = sha256_bytes(page.data)
+            pages.append(
+                NormalizedPage(
+                    pageNumber=page.page_number,
+                    parentGcsUri=gcs_uri,
+                    gcsUri=gcs.upload_bytes(
+                        page.data, f"{object_stem}_p{page.page_number:03d}.{page.ext}", content_type=page.mime
+                    ),
+                    mime=page.mime,
+                    sha256=page_sha,
+                    bytes=len(page.data),
+                    width=page.width,
+                    height=page.height,
                 )
-            normalized_bytes = data
-            mime = "application/pdf"
-            target_ext = "pdf"
-            try:
-                reader = PdfReader(io.BytesIO(data))
-                page_count = len(reader.pages)
-            except Exception:
-                page_count = None
-        else:
+            )
+
+    original_uri = None
+    if original is not None:
+        try:
+            original_path = f"{gcs_prefix}originals/{idx:04d}_{name}"
+            original_uri = original(original_path)
+        except Exception as exc:  # noqa: BLE001
             warnings.append(
                 Warning(
-                    code="UNSUPPORTED_FILE_TYPE",
-                    message=f"Skipping unsupported file: {name}",
-                    details={"extension": ext, "filename": name},
+                    code="ORIGINAL_UPLOAD_FAILED",
+                    message=f"Failed to upload original for {name}",
+                    details={
+                        "filename": name,
+                        "targetPath": original_path,
+                        **_exception_details(exc),
+                    },
                 )
             )
-            return idx, None, warnings
 
-        sha = sha256_bytes(normalized_bytes)
-        object_path = f"{gcs_prefix}normalized/{idx:04d}_{sha}.{target_ext}"
-        gcs_uri = gcs.upload_bytes(normalized_bytes, object_path)
+    item = NormalizeItem(
+        source=source,
+        normalized=NormalizedArtifact(
+            gcsUri=gcs_uri,
+            mime=transformed.mime,
+            sha256=transformed.sha256,
+            bytes=len(transformed.data),
+            width=transformed.width,
+            height=transformed.height,
+            quality=transformed.quality,
+            bytesPerPixel=(
+                round(len(transformed.data) / (transformed.width * transformed.height), 4)
+                if transformed.width and transformed.height
+                else None
+            ),
+            pageCount=transformed.page_count,
+            originalGcsUri=original_uri,
+            originalMime=MIME_TYPE_MAP.get(ext, ""),
+            pages=pages,
+        ),
+    )
+    return item, warnings
 
-        if upload_originals:
-            try:
-                original_path = f"{gcs_prefix}originals/{idx:04d}_{name}"
-                original_uri = gcs.upload_bytes(data, original_path)
-            except Exception as exc:  # noqa: BLE001
-                warnings.append(
-                    Warning(
-                        code="ORIGINAL_UPLOAD_FAILED",
-                        message=f"Failed to upload original for {name}",
-                        details={
-                            "filename": name,
-                            "targetPath": original_path,
-                            **_exception_details(exc),
-                        },
-                    )
-                )
 
-        item = NormalizeItem(
-            source=source,
-            normalized=NormalizedArtifact(
-                gcsUri=gcs_uri,
-                mime=mime,
-                sha256=sha,
-                bytes=len(normalized_bytes),
-                pageCount=page_count,
-                originalGcsUri=original_uri,
-                originalMime=MIME_TYPE_MAP.get(ext, ""),
-            ),
-        )
-        return idx, item, warnings
-    except Exception as exc:  # noqa: BLE001
-        warnings.append(
-            Warning(
-                code="NORMALIZATION_FAILED",
-                message=f"Failed to process {name}",
-                details={
-                    "filename": name,
-                    "source": source.model_dump(exclude_none=True),
-                    "extension": ext,
-                    **_exception_details(exc),
-                },
+def _extension(name: str) -> str:
+    return name.split(".")[-1].lower() if "." in name else ""
+
+
+def _failed_entry_warning(name: str, source: SourceInfo, exc: Exception) -> Warning:
+    return Warning(
+        code="NORMALIZATION_FAILED",
+        message=f"Failed to process {name}",
+        details={
+            "filename": name,
+            "source": source.model_dump(exclude_none=True),
+            "extension": _extension(name),
+            **_exception_details(exc),
+        },
+    )
+
+
+_END = object()
+
+
+class _ContentIndex:
+    """
+    raw input sha256 + normalization options -> NormalizedArtifact already uploaded under
+    the same output prefix. Existing keys are listed once per request, so misses cost no
+    extra round trips; hits skip the transform and the upload entirely.
+    """
+
+    VERSION = "v1"
+
+    def __init__(self, store: JsonStore, options: dict[str, Any]) -> None:
+        self._store = store
+        self._options = json.dumps(options, sort_keys=True)
+        self._known = set(store.keys())
+        self.hits = 0
+
+    def key(self, raw_sha: str) -> str:
+        return sha256_bytes(f"{self.VERSION}|{raw_sha}|{self._options}".encode("utf-8"))
+
+    def __contains__(self, raw_sha: str) -> bool:
+        return self.key(raw_sha) in self._known
+
+    def lookup(self, raw_sha: str) -> NormalizedArtifact | None:
+        try:
+            value = self._store.get(self.key(raw_sha))
+            artifact = NormalizedArtifact.model_validate(value["normalized"]) if value else None
+        except Exception:  # noqa: BLE001
+            logger.exception("Normalize index lookup failed")
+            return None
+        if artifact is not None:
+            self.hits += 1
+        return artifact
+
+    def record(self, raw_sha: str, artifact: NormalizedArtifact) -> None:
+        try:
+            self._store.put(self.key(raw_sha), {"sourceSha256": raw_sha, "normalized": artifact.model_dump()})
+        except Exception:  # noqa: BLE001
+            logger.exception("Normalize index write failed")
+
+
+def _open_content_index(settings: Settings, gcs_prefix: str, options: dict[str, Any]) -> _ContentIndex | None:
+    if not settings.normalize_index_enabled:
+        return None
+    if settings.normalize_index_uri:
+        # Shared location: partition by output prefix so hits never cross rendiciones.
+        uri = f"{settings.normalize_index_uri.rstrip('/')}/{sha256_bytes(gcs_prefix.encode('utf-8'))[:16]}/"
+    else:
+        uri = f"{gcs_prefix}index/"
+    try:
+        return _ContentIndex(JsonStore(uri), options)
+    except Exception:  # noqa: BLE001
+        logger.exception("Normalize index unavailable at %s; processing without it", uri)
+        return None
+
+
+def _encoding(options: NormalizeOptions | None, settings: Settings) -> Encoding:
+    if options is None:
+        return Encoding(quality=settings.default_jpg_quality)
+    return Encoding(
+        fmt=options.outputFormat,
+        quality=options.jpgQuality,
+        progressive=options.progressive,
+        target_bytes=options.targetBytes,
+        min_quality=options.minQuality,
+    )
+
+
+def _encoding_key(encoding: Encoding) -> dict[str, Any]:
+    # Only non-default encoding settings, so index keys of plain JPEG runs stay as they were.
+    key: dict[str, Any] = {}
+    if encoding.fmt != "jpeg":
+        key["outputFormat"] = encoding.fmt
+    if encoding.progressive:
+        key["progressive"] = True
+    if encoding.target_bytes:
+        key["targetBytes"] = encoding.target_bytes
+        key["minQuality"] = encoding.min_quality
+    return key
+
+
+def _resolve_options(options: NormalizeOptions | None, settings: Settings) -> dict[str, Any]:
+    return {
+        "jpgQuality": options.jpgQuality if options else settings.default_jpg_quality,
+        "maxSidePx": options.maxSidePx if options else settings.default_max_side_px,
+        "resample": options.resample if options else settings.default_resample,
+        "pdfMode": options.pdfMode if options else settings.default_pdf_mode,
+        "uploadOriginals": options.uploadOriginals if options else False,
+        **_encoding_key(_encoding(options, settings)),
+    }
+
+
+def _entry_key(name: str, source: SourceInfo) -> str:
+    # Drive inputs are known by id before they are downloaded (and named).
+    return f"drive:{source.driveFileId}" if source.driveFileId else f"name:{name}"
+
+
+class _Journal:
+    """
+    Checkpoint of one normalize run: an object per completed entry, written as soon as its
+    uploads finish, under manifests/normalize_journal/<fingerprint>/. The fingerprint covers
+    rendicionId, output prefix, options and the identity of every input, so a repeated
+    request resumes where a killed or timed-out run stopped and only processes the rest.
+    """
+
+    VERSION = "v1"
+
+    def __init__(self, store: JsonStore, fingerprint: str, workers: int) -> None:
+        self._store = store
+        self.fingerprint = fingerprint
+        self._done: dict[str, NormalizeItem] = {}
+        self.resumed = 0
+        keys = store.keys()
+        if keys:
+            with ThreadPoolExecutor(max_workers=max(1, min(len(keys), workers))) as executor:
+                for value in executor.map(store.get, keys):
+                    if value:
+                        self._done[value["entryKey"]] = NormalizeItem.model_validate(value["item"])
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def get(self, entry_key: str) -> NormalizeItem | None:
+        return self._done.get(entry_key)
+
+    def resume(self, entry_key: str) -> NormalizeItem | None:
+        item = self._done.get(entry_key)
+        if item is not None:
+            self.resumed += 1
+        return item
+
+    def record(self, entry_key: str, item: NormalizeItem) -> None:
+        try:
+            self._store.put(
+                sha256_bytes(entry_key.encode("utf-8")), {"entryKey": entry_key, "item": item.model_dump()}
             )
+        except Exception:  # noqa: BLE001
+            logger.exception("Normalize journal write failed")
+
+
+def _open_journal(
+    settings: Settings,
+    rendicion_id: str,
+    gcs_prefix: str,
+    options: dict[str, Any],
+    identities: List[str],
+) -> _Journal | None:
+    if not settings.normalize_journal_enabled:
+        return None
+    fingerprint = sha256_bytes(
+        json.dumps(
+            {
+                "version": _Journal.VERSION,
+                "rendicionId": rendicion_id,
+                "gcsPrefix": gcs_prefix,
+                "options": options,
+                "inputs": identities,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    uri = f"{gcs_prefix}manifests/normalize_journal/{fingerprint[:32]}/"
+    try:
+        journal = _Journal(JsonStore(uri), fingerprint, settings.normalize_workers)
+    except Exception:  # noqa: BLE001
+        logger.exception("Normalize journal unavailable at %s; processing without it", uri)
+        return None
+    if len(journal):
+        logger.info("Resuming normalize run %s: %d entries already done", rendicion_id, len(journal))
+    return journal
+
+
+def _zip_identities(zf: zipfile.ZipFile) -> List[str]:
+    return [
+        f"zip:{info.filename}:{info.CRC}:{info.file_size}" for info in zf.infolist() if not info.filename.endswith("/")
+    ]
+
+
+def _not_loaded() -> bytes:
+    raise RuntimeError("Entry was resumed from the journal and not downloaded")
+
+
+def _normalize_entries(
+    raw_entries: Iterable[RawEntry],
+    settings: Settings,
+    *,
+    encoding: Encoding,
+    max_side: int,
+    resample: str,
+    pdf_mode: str,
+    upload_originals: bool,
+    gcs_prefix: str,
+    journal: _Journal | None = None,
+) -> Tuple[List[NormalizeItem | None], List[Warning]]:
+    """
+    Two-stage pipeline: image transforms run on the shared CPU process pool (sized to the
+    cores), uploads run on `normalize_workers` I/O threads. The stages are joined by a
+    bounded queue, so at most `normalize_queue_size` entries are loaded and waiting at once.
+    Inputs already normalized under this prefix with the same options are served from the
+    content index without transforming or uploading them again. With a journal, entries
+    completed by an earlier attempt of the same run are not even loaded, and each entry is
+    checkpointed as soon as it completes.
+    """
+    items_by_idx: dict[int, NormalizeItem] = {}
+    attempted = 0
+    warnings: List[Warning] = []
+    warnings_lock = threading.Lock()
+    cpu_pool = get_cpu_pool(settings)
+    handoff: queue.Queue = queue.Queue(maxsize=settings.normalize_queue_size)
+    index = _open_content_index(
+        settings,
+        gcs_prefix,
+        {
+            "jpgQuality": encoding.quality,
+            "maxSidePx": max_side,
+            "resample": resample,
+            "pdfMode": pdf_mode,
+            "uploadOriginals": upload_originals,
+            **_encoding_key(encoding),
+        },
+    )
+
+    def _add_warnings(new: List[Warning]) -> None:
+        if new:
+            with warnings_lock:
+                warnings.extend(new)
+
+    raster_opts = RasterOptions(
+        max_side=max_side, fmt=encoding.fmt, quality=encoding.quality, max_dpi=settings.raster_max_dpi
+    )
+
+    def _submit_pages(ext: str, data: bytes) -> Callable[[], List[RenderedPage]] | None:
+        if ext not in PDF_EXTS or pdf_mode != "rasterize":
+            return None
+        return submit_rasterize(data, raster_opts, cpu_pool, cpu_workers(settings))
+
+    def _process(
+        idx, name, source, transformed, original, raw_sha, pages=None
+    ) -> Tuple[NormalizeItem, List[Warning]]:
+        item, entry_warnings = _upload_entry(
+            idx,
+            name,
+            source,
+            transformed(),
+            original,
+            gcs_prefix=gcs_prefix,
+            rendered_pages=pages() if pages else None,
         )
-        return idx, None, warnings
+        if index is not None:
+            index.record(raw_sha, item.normalized)
+        return item, entry_warnings
+
+    def _reuse(idx, name, source, load, ext, raw_sha) -> Tuple[NormalizeItem, List[Warning]]:
+        artifact = index.lookup(raw_sha)
+        if artifact is not None:
+            return NormalizeItem(source=source, normalized=artifact), []
+        data = load()
+        transformed = partial(transform_entry, ext, data, encoding, max_side, resample)
+        original = _original_copier(load) if upload_originals else None
+        return _process(idx, name, source, transformed, original, raw_sha, _submit_pages(ext, data))
+
+    def _upload_worker() -> None:
+        while True:
+            task = handoff.get()
+            if task is _END:
+                return
+            idx, name, source, work = task
+            try:
+                item, entry_warnings = work()
+                items_by_idx[idx] = item
+                if journal is not None:
+                    journal.record(_entry_key(name, source), item)
+            except Exception as exc:  # noqa: BLE001
+                entry_warnings = [_failed_entry_warning(name, source, exc)]
+            _add_warnings(entry_warnings)
+
+    workers = settings.normalize_workers
+    if isinstance(raw_entries, list):
+        workers = max(1, min(len(raw_entries), workers))
+    uploaders = [threading.Thread(target=_upload_worker, name=f"normalize-upload-{i}") for i in range(workers)]
+    for thread in uploaders:
+        thread.start()
+    try:
+        for idx, (name, load, source) in enumerate(raw_entries):
+            attempted = idx + 1
+            if journal is not None:
+                done = journal.resume(_entry_key(name, source))
+                if done is not None:
+                    items_by_idx[idx] = done
+                    continue
+            ext = _extension(name)
+            if not is_supported(ext):
+                _add_warnings(
+                    [
+                        Warning(
+                            code="UNSUPPORTED_FILE_TYPE",
+                            message=f"Skipping unsupported file: {name}",
+                            details={"extension": ext, "filename": name},
+                        )
+                    ]
+                )
+                continue
+            try:
+                data = load()
+            except Exception as exc:  # noqa: BLE001
+                _add_warnings([_failed_entry_warning(name, source, exc)])
+                continue
+            raw_sha = sha256_bytes(data)
+            if index is not None and raw_sha in index:
+                work = partial(_reuse, idx, name, source, load, ext, raw_sha)
+            else:
+                if cpu_pool is not None:
+                    transformed = cpu_pool.submit(transform_entry, ext, data, encoding, max_side, resample).result
+                else:
+                    transformed = partial(transform_entry, ext, data, encoding, max_side, resample)
+                try:
+                    pages = _submit_pages(ext, data)
+                except Exception as exc:  # noqa: BLE001
+                    _add_warnings([_failed_entry_warning(name, source, exc)])
+                    continue
+                original = _original_copier(load) if upload_originals else None
+                work = partial(_process, idx, name, source, transformed, original, raw_sha, pages)
+            del data
+            # Blocks while the queue is full: back-pressure on loading and transforming.
+            handoff.put((idx, name, source, work))
+    finally:
+        for _ in uploaders:
+            handoff.put(_END)
+        for thread in uploaders:
+            thread.join()
+    if index is not None and index.hits:
+        logger.info("Normalize index: reused %d of %d entries under %s", index.hits, attempted, gcs_prefix)
+    if journal is not None and journal.resumed:
+        logger.info("Normalize journal: resumed %d of %d entries under %s", journal.resumed, attempted, gcs_prefix)
+    return [items_by_idx.get(idx) for idx in range(attempted)], warnings
 
 
 async def run_normalize(request: NormalizeRequest, settings: Settings) -> NormalizeResponse:
-    jpg_quality = request.options.jpgQuality if request.options else settings.default_jpg_quality
-    max_side = request.options.maxSidePx if request.options else settings.default_max_side_px
-    pdf_mode = request.options.pdfMode if request.options else settings.default_pdf_mode
-    upload_originals = request.options.uploadOriginals if request.options else False
+    with ExitStack() as stack:
+        return await _run_normalize(request, settings, stack)
 
+
+async def _run_normalize(request: NormalizeRequest, settings: Settings, stack: ExitStack) -> NormalizeResponse:
     warnings: List[Warning] = []
-    items: List[NormalizeItem] = []
+    gcs_prefix = gcs.normalize_prefix(request.output.gcsPrefix)
+    open_journal = partial(
+        _open_journal, settings, request.rendicionId, gcs_prefix, _resolve_options(request.options, settings)
+    )
+    journal: _Journal | None = None
 
     try:
         # Resolve inputs
-        raw_entries: List[Tuple[str, bytes, SourceInfo]] = []
+        raw_entries: List[RawEntry] = []
         sort_entries = False
         if request.input.driveFileIds:
             if not settings.drive_enabled:
@@ -232,32 +603,52 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                 )
             file_ids = request.input.driveFileIds
             if file_ids:
-                workers = min(len(file_ids), settings.normalize_workers)
-                entries: List[Tuple[str, bytes, SourceInfo] | None] = [None] * len(file_ids)
-                with ThreadPoolExecutor(max_workers=workers) as executor:
-                    futures = {
-                        executor.submit(_download_drive_entry, fid, None): idx
-                        for idx, fid in enumerate(file_ids)
-                    }
-                    for fut in as_completed(futures):
-                        idx = futures[fut]
-                        fid = file_ids[idx]
-                        try:
-                            entries[idx] = fut.result()
-                        except Exception as exc:  # noqa: BLE001
-                            warnings.append(
-                                Warning(
-                                    code="DRIVE_DOWNLOAD_FAILED",
-                                    message=f"Failed to download {fid}",
-                                    details={"fileId": fid, **_exception_details(exc)},
-                                )
+                journal = open_journal([f"drive:{fid}" for fid in file_ids])
+                entries: List[Tuple[str, _SpooledInput | None, SourceInfo] | None] = [None] * len(file_ids)
+                pending = []
+                for idx, fid in enumerate(file_ids):
+                    done = journal.get(f"drive:{fid}") if journal else None
+                    if done is not None:
+                        entries[idx] = (done.source.originalName or fid, None, done.source)
+                    else:
+                        pending.append(idx)
+                try:
+                    # One batch call for all names/sizes instead of a metadata round trip per file.
+                    metadata = drive.get_metadata(file_ids[idx] for idx in pending) if pending else {}
+                except Exception:  # noqa: BLE001
+                    logger.exception("Drive batch metadata lookup failed; falling back to per-file lookups")
+                    metadata = {}
+                sizes = []
+                for idx in pending:
+                    size = metadata.get(file_ids[idx], {}).get("size")
+                    sizes.append(int(size) if size is not None else None)
+                spooled = _spool_drive_files([file_ids[idx] for idx in pending], sizes, settings, stack)
+                for idx, loaded in zip(pending, spooled):
+                    fid = file_ids[idx]
+                    try:
+                        if isinstance(loaded, Exception):
+                            raise loaded
+                        name = metadata.get(fid, {}).get("name") or drive.get_file_name(fid)
+                        entries[idx] = (name, loaded, SourceInfo(driveFileId=fid, originalName=name))
+                    except Exception as exc:  # noqa: BLE001
+                        warnings.append(
+                            Warning(
+                                code="DRIVE_DOWNLOAD_FAILED",
+                                message=f"Failed to download {fid}",
+                                details={"fileId": fid, **_exception_details(exc)},
                             )
-                raw_entries.extend([entry for entry in entries if entry])
+                        )
+                raw_entries.extend(
+                    (name, _not_loaded if load is None else load, source)
+                    for name, load, source in filter(None, entries)
+                )
         elif request.input.files:
+            identities = []
             for file in request.input.files:
                 try:
                     data = base64.b64decode(file.contentBase64)
-                    raw_entries.append((file.filename, data, SourceInfo(originalName=file.filename)))
+                    raw_entries.append((file.filename, _in_memory(data), SourceInfo(originalName=file.filename)))
+                    identities.append(f"file:{file.filename}:{sha256_bytes(data)}")
                 except Exception as exc:  # noqa: BLE001
                     warnings.append(
                         Warning(
@@ -266,6 +657,7 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                             details={"filename": file.filename, **_exception_details(exc)},
                         )
                     )
+            journal = open_journal(identities)
         elif request.input.zipBase64:
             sort_entries = True
             try:
@@ -282,16 +674,12 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                         details={"zipBase64Length": len(request.input.zipBase64), **_exception_details(exc)},
                     ),
                 )
-            for name in zf.namelist():
-                if name.endswith("/"):
-                    continue
-                with zf.open(name) as f:
-                    raw_entries.append((name, f.read(), SourceInfo(originalName=name)))
+            journal = open_journal(_zip_identities(zf))
+            raw_entries.extend(_zip_entries(zf))
         elif request.input.zipGcsUri:
             sort_entries = True
             try:
-                zip_bytes = gcs.download_bytes(request.input.zipGcsUri)
-                zf = zipfile.ZipFile(io.BytesIO(zip_bytes))
+                zf = _spool_gcs_zip(request.input.zipGcsUri, stack, settings.normalize_spool_dir)
             except Exception as exc:  # noqa: BLE001
                 return NormalizeResponse(
                     ok=False,
@@ -304,11 +692,8 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                         details={"zipGcsUri": request.input.zipGcsUri, **_exception_details(exc)},
                     ),
                 )
-            for name in zf.namelist():
-                if name.endswith("/"):
-                    continue
-                with zf.open(name) as f:
-                    raw_entries.append((name, f.read(), SourceInfo(originalName=name)))
+            journal = open_journal(_zip_identities(zf))
+            raw_entries.extend(_zip_entries(zf))
         elif request.input.driveFolderId:
             sort_entries = True
             if not settings.drive_enabled:
@@ -324,7 +709,7 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                     ),
                 )
             try:
-                drive_files = _list_drive_folder(request.input.driveFolderId)
+                drive_files = drive.list_folder(request.input.driveFolderId)
             except Exception as exc:  # noqa: BLE001
                 return NormalizeResponse(
                     ok=False,
@@ -338,27 +723,34 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                     ),
                 )
             if drive_files:
-                workers = min(len(drive_files), settings.normalize_workers)
-                entries: List[Tuple[str, bytes, SourceInfo] | None] = [None] * len(drive_files)
-                with ThreadPoolExecutor(max_workers=workers) as executor:
-                    futures = {
-                        executor.submit(_download_drive_entry, fid, fname): idx
-                        for idx, (fname, fid) in enumerate(drive_files)
-                    }
-                    for fut in as_completed(futures):
-                        idx = futures[fut]
-                        fname, fid = drive_files[idx]
-                        try:
-                            entries[idx] = fut.result()
-                        except Exception as exc:  # noqa: BLE001
-                            warnings.append(
-                                Warning(
-                                    code="DRIVE_DOWNLOAD_FAILED",
-                                    message=f"Failed to download {fname}",
-                                    details={"fileId": fid, "fileName": fname, **_exception_details(exc)},
-                                )
+                journal = open_journal([f"drive:{fid}:{fname}" for fname, fid in drive_files])
+                entries: List[Tuple[str, _SpooledInput | None, SourceInfo] | None] = [None] * len(drive_files)
+                pending = []
+                for idx, (fname, fid) in enumerate(drive_files):
+                    done = journal.get(f"drive:{fid}") if journal else None
+                    if done is not None:
+                        entries[idx] = (fname, None, done.source)
+                    else:
+                        pending.append(idx)
+                spooled = _spool_drive_files(
+                    [drive_files[idx][1] for idx in pending], [None] * len(pending), settings, stack
+                )
+                for idx, loaded in zip(pending, spooled):
+                    fname, fid = drive_files[idx]
+                    if isinstance(loaded, Exception):
+                        warnings.append(
+                            Warning(
+                                code="DRIVE_DOWNLOAD_FAILED",
+                                message=f"Failed to download {fname}",
+                                details={"fileId": fid, "fileName": fname, **_exception_details(loaded)},
                             )
-                raw_entries.extend([entry for entry in entries if entry])
+                        )
+                    else:
+                        entries[idx] = (fname, loaded, SourceInfo(driveFileId=fid, originalName=fname))
+                raw_entries.extend(
+                    (name, _not_loaded if load is None else load, source)
+                    for name, load, source in filter(None, entries)
+                )
 
         if sort_entries:
             raw_entries = sorted(raw_entries, key=lambda entry: entry[0].lower())
@@ -375,52 +767,58 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
             ),
         )
 
-    gcs_prefix = gcs.normalize_prefix(request.output.gcsPrefix)
+    return await _normalize_and_report(
+        request.rendicionId, request.output, request.options, raw_entries, warnings, settings, journal=journal
+    )
 
-    if raw_entries:
-        workers = min(len(raw_entries), settings.normalize_workers)
-        items_by_idx: List[NormalizeItem | None] = [None] * len(raw_entries)
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {
-                executor.submit(
-                    _normalize_entry,
-                    idx,
-                    name,
-                    data,
-                    source,
-                    jpg_quality=jpg_quality,
-                    max_side=max_side,
-                    pdf_mode=pdf_mode,
-                    upload_originals=upload_originals,
-                    gcs_prefix=gcs_prefix,
-                ): idx
-                for idx, (name, data, source) in enumerate(raw_entries)
-            }
-            for fut in as_completed(futures):
-                idx = futures[fut]
-                try:
-                    _, item, entry_warnings = fut.result()
-                except Exception as exc:  # noqa: BLE001
-                    warnings.append(
-                        Warning(
-                            code="NORMALIZATION_FAILED",
-                            message="Failed to process item",
-                            details={"index": idx, **_exception_details(exc)},
-                        )
-                    )
-                    continue
-                if item:
-                    items_by_idx[idx] = item
-                if entry_warnings:
-                    warnings.extend(entry_warnings)
-        items = [item for item in items_by_idx if item]
+
+async def run_normalize_entries(
+    rendicion_id: str,
+    output: NormalizeOutput,
+    options: NormalizeOptions | None,
+    entries: Iterable[RawEntry],
+    settings: Settings,
+) -> NormalizeResponse:
+    """
+    Normalizes entries as the iterable yields them (e.g. multipart parts as they arrive),
+    keeping their order in the response. The iterable is consumed on a worker thread.
+    """
+    return await _normalize_and_report(rendicion_id, output, options, entries, [], settings)
+
+
+async def _normalize_and_report(
+    rendicion_id: str,
+    output: NormalizeOutput,
+    options: NormalizeOptions | None,
+    raw_entries: Iterable[RawEntry],
+    warnings: List[Warning],
+    settings: Settings,
+    journal: _Journal | None = None,
+) -> NormalizeResponse:
+    gcs_prefix = gcs.normalize_prefix(output.gcsPrefix)
+    resolved = _resolve_options(options, settings)
+    items_by_idx, entry_warnings = await asyncio.to_thread(
+        _normalize_entries,
+        raw_entries,
+        settings,
+        encoding=_encoding(options, settings),
+        max_side=resolved["maxSidePx"],
+        resample=resolved["resample"],
+        pdf_mode=resolved["pdfMode"],
+        upload_originals=resolved["uploadOriginals"],
+        gcs_prefix=gcs_prefix,
+        journal=journal,
+    )
+    warnings.extend(entry_warnings)
+    items = [item for item in items_by_idx if item]
 
     # Manifest (optional)
     manifest_uri = None
     try:
         manifest = {
-            "rendicionId": request.rendicionId,
+            "rendicionId": rendicion_id,
             "generatedAt": datetime.now(timezone.utc).isoformat(),
+            "resumedItems": journal.resumed if journal is not None else 0,
             "items": [
                 {
                     "source": item.source.model_dump(),
@@ -455,7 +853,7 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
                 "failedWarnings": [w.model_dump() for w in failed_warnings],
                 "failedCount": len(failed_warnings),
                 "totalWarnings": len(warnings),
-                "attemptedItems": len(raw_entries),
+                "attemptedItems": len(items_by_idx),
                 "successfulItems": len(items),
             },
         )
@@ -463,7 +861,7 @@ async def run_normalize(request: NormalizeRequest, settings: Settings) -> Normal
 
     return NormalizeResponse(
         ok=ok,
-        rendicionId=request.rendicionId,
+        rendicionId=rendicion_id,
         items=items,
         manifestGcsUri=manifest_uri,
         warnings=warnings or None,
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import queue
+import tempfile
+from typing import IO, AsyncIterator, Iterator, List
+
+from pydantic import ValidationError
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from ..config import Settings
+from ..models import ErrorPayload, NormalizeResponse, NormalizeUploadMetadata, SourceInfo
+from .normalize import RawEntry, _SpooledInput, run_normalize_entries
+
+
+METADATA_FIELD = "metadata"
+FILES_FIELD = "files"
+
+_END = object()
+
+
+class InvalidUpload(ValueError):
+    """The multipart body does not follow the /v1/normalize/upload layout."""
+
+
+class _MultipartFeed:
+    """
+    Incremental multipart/form-data parser. Each file part is written to a spooled temp
+    file while it streams in and handed to the normalize pipeline as soon as it ends, so
+    large uploads are never held as one body (nor as base64) in memory.
+    """
+
+    def __init__(self, content_type: str, settings: Settings) -> None:
+        ctype, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if ctype != b"multipart/form-data" or not boundary:
+            raise InvalidUpload("Expected multipart/form-data with a boundary")
+        self._settings = settings
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+        self.metadata: NormalizeUploadMetadata | None = None
+        self.entries: queue.Queue = queue.Queue()
+        self._spools: List[IO[bytes]] = []
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._name: str | None = None
+        self._filename: str | None = None
+        self._target: IO[bytes] | None = None
+        self._buffer = bytearray()
+        self._in_part = False
+        self._error: InvalidUpload | None = None
+        self._aborted = False
+
+    def write(self, chunk: bytes) -> None:
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as exc:
+            self._fail(f"Malformed multipart body: {exc}")
+        if self._error is not None:
+            raise self._error
+
+    def finish(self) -> None:
+        try:
+            self._parser.finalize()
+        except MultipartParseError as exc:
+            self._fail(f"Malformed multipart body: {exc}")
+        if self._in_part:
+            self._fail("Truncated multipart body (last part has no closing boundary)")
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        """Stops handing out parts; the worker finishes the ones it already took."""
+        self._aborted = True
+        self.entries.put(_END)
+
+    def close(self) -> None:
+        for spool in self._spools:
+            spool.close()
+
+    def iter_entries(self) -> Iterator[RawEntry]:
+        """Blocking iterator for the normalize worker thread; ends when the body is done or aborted."""
+        while True:
+            entry = self.entries.get()
+            if entry is _END or self._aborted:
+                return
+            yield entry
+
+    def _on_part_begin(self) -> None:
+        self._in_part = True
+        self._headers = {}
+        self._name = self._filename = None
+        self._target = None
+        self._buffer = bytearray()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = b""
+        self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = params.get(b"name", b"").decode("utf-8", "replace")
+        filename = params.get(b"filename")
+        self._name = name
+        self._filename = filename.decode("utf-8", "replace") if filename is not None else None
+        if name == FILES_FIELD and self._filename is not None:
+            if self.metadata is None:
+                self._fail(f"The '{METADATA_FIELD}' field must come before any file part")
+                return
+            self._target = tempfile.SpooledTemporaryFile(
+                max_size=self._settings.normalize_upload_spool_bytes, dir=self._settings.normalize_spool_dir
+            )
+            self._spools.append(self._target)
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._error is not None:
+            return
+        if self._target is not None:
+            self._target.write(data[start:end])
+        elif self._name == METADATA_FIELD:
+            self._buffer += data[start:end]
+
+    def _on_part_end(self) -> None:
+        self._in_part = False
+        if self._error is not None:
+            return
+        if self._target is not None:
+            self.entries.put(
+                (self._filename, _SpooledInput(self._target), SourceInfo(originalName=self._filename))
+            )
+        elif self._name == METADATA_FIELD:
+            try:
+                self.metadata = NormalizeUploadMetadata.model_validate(json.loads(bytes(self._buffer)))
+            except (ValueError, ValidationError) as exc:
+                self._fail(f"Invalid '{METADATA_FIELD}' field: {exc}")
+
+    def _fail(self, message: str) -> None:
+        if self._error is None:
+            self._error = InvalidUpload(message)
+
+
+def _invalid(rendicion_id: str, exc: Exception) -> NormalizeResponse:
+    return NormalizeResponse(
+        ok=False,
+        rendicionId=rendicion_id,
+        items=[],
+        warnings=[],
+        error=ErrorPayload(code="INVALID_ARGUMENT", message=str(exc), details={"input": "multipart"}),
+    )
+
+
+async def run_normalize_upload(
+    content_type: str, body: AsyncIterator[bytes], settings: Settings
+) -> NormalizeResponse:
+    """
+    multipart/form-data variant of /v1/normalize: a `metadata` JSON field
+    ({rendicionId, output, options}) followed by one `files` part per input file.
+    Files are normalized in part order while the rest of the body is still arriving.
+    """
+    try:
+        feed = _MultipartFeed(content_type, settings)
+    except InvalidUpload as exc:
+        return _invalid("", exc)
+
+    task: asyncio.Task | None = None
+    try:
+        try:
+            async for chunk in body:
+                # Parsing and spool writes (on disk past normalize_upload_spool_bytes) stay off the event loop.
+                await asyncio.to_thread(feed.write, chunk)
+                if task is None and feed.metadata is not None:
+                    meta = feed.metadata
+                    task = asyncio.ensure_future(
+                        run_normalize_entries(
+                            meta.rendicionId, meta.output, meta.options, feed.iter_entries(), settings
+                        )
+                    )
+            await asyncio.to_thread(feed.finish)
+        except InvalidUpload as exc:
+            return _invalid(feed.metadata.rendicionId if feed.metadata else "", exc)
+        finally:
+            feed.entries.put(_END)
+
+        if task is None:
+            return _invalid("", InvalidUpload(f"Missing '{METADATA_FIELD}' field"))
+        # Shielded: cancelling the request must not detach the worker thread from its task.
+        return await asyncio.shield(task)
+    finally:
+        if task is not None and not task.done():
+            # Invalid body, client gone or request cancelled: skip the parts not started yet and
+            # wait for the worker thread, which may still be reading spools, before closing them.
+            feed.abort()
+            await asyncio.gather(task, return_exceptions=True)
+        feed.close()
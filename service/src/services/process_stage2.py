@@ -4,19 +4,30 @@ import csv
 import json
 import io
 import mimetypes
+import re
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, List, Tuple
+from typing import Any, Callable, Iterator, List, Tuple
 from urllib.parse import urlparse
 
 from docflow.core.extraction.engine import ExtractionResult, extract
 from docflow.core.providers.base import ProviderOptions
 from docflow.core.providers.gemini import GeminiProvider
-from docflow.sdk import profiles
-from docflow.sdk.config import SdkConfig
 
 from ..config import Settings
-from ..fetch import fetch_bytes
+from ..execution import (
+    OffloadCancelled,
+    bind_context,
+    cancellable_sleep,
+    cpu_workers,
+    get_cpu_pool,
+    raise_if_cancelled,
+)
+from ..fetch import Fetched, fetch_bytes, fetch_many
 from ..models import (
     DocflowRow,
     DocumentRef,
@@ -25,41 +36,108 @@ from ..models import (
     ProcessReceiptsBatchResponse,
     ProcessStatementRequest,
     ProcessStatementResponse,
+    ReceiptStreamRow,
+    ReceiptStreamStart,
+    ReceiptStreamSummary,
     Warning,
 )
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..rasterize import RasterOptions, parse_page_ranges, rasterize_pdf
+from ..utils import sha256_bytes
+from .extraction_cache import build_cache_key, get_extraction_cache
+from .profile_registry import get_profile_registry
+from .scheduler import get_scheduler
+from .statement_windows import merge_statement_windows, plan_windows
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import random
-import time
 
 
 class BytesSource:
-    def __init__(self, name: str, data: bytes) -> None:
+    def __init__(
+        self,
+        name: str,
+        data: bytes | None = None,
+        *,
+        loader: Callable[[], bytes] | None = None,
+        sha256: str | None = None,
+    ) -> None:
+        if data is None and loader is None:
+            raise ValueError("BytesSource needs data or a loader")
         self._name = name
         self._data = data
+        self._loader = loader
+        self._sha256 = sha256
 
     def load(self) -> bytes:
+        if self._data is None:
+            self._data = self._loader()
         return self._data
 
     def display_name(self) -> str:
         return self._name
 
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = sha256_bytes(self.load())
+        return self._sha256
+
+    def known_sha256(self) -> str | None:
+        return self._sha256
 
-def _profile_dir(settings: Settings) -> Path:
-    base = Path(__file__).resolve().parents[2]
-    raw = settings.docflow_profile_dir
-    path = Path(raw)
-    if not path.is_absolute():
-        path = (base / path).resolve()
-    return path
+    def release(self) -> None:
+        """Drops the bytes once the result is recorded (reloaded on demand if a loader exists)."""
+        if self._loader is not None:
+            self.sha256()
+            self._data = None
 
 
 def _load_profile(profile_name: str, settings: Settings):
-    cfg = SdkConfig(profile_dir=_profile_dir(settings))
-    return profiles.load_profile(profile_name, cfg)
+    return get_profile_registry(settings).get(profile_name)
+
+
+class ProviderPool:
+    """
+    Keeps constructed GeminiProvider instances (and their authenticated clients and
+    HTTP connections) warm across requests and retries. A provider is leased to one
+    call at a time and returned afterwards, so instances are never shared concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._idle: dict[Tuple[str | None, str | None, str | None], List[GeminiProvider]] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._leases = 0
+
+    @contextmanager
+    def lease(self, project: str | None, location: str | None, model: str | None) -> Iterator[GeminiProvider]:
+        key = (project, location, model)
+        with self._lock:
+            self._leases += 1
+            idle = self._idle.setdefault(key, [])
+            provider = idle.pop() if idle else None
+        if provider is None:
+            provider = GeminiProvider(project=project, location=location)
+            with self._lock:
+                self._created += 1
+        try:
+            yield provider
+        finally:
+            with self._lock:
+                self._idle[key].append(provider)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "created": self._created,
+                "leases": self._leases,
+                "idle": sum(len(v) for v in self._idle.values()),
+            }
+
 
+_provider_pool = ProviderPool()
 
-def _provider(settings: Settings) -> GeminiProvider:
-    return GeminiProvider(project=settings.docflow_project, location=settings.docflow_location)
+
+def get_provider_pool() -> ProviderPool:
+    return _provider_pool
 
 
 def _name_from_ref(ref: DocumentRef) -> str:
@@ -80,9 +158,42 @@ def _name_from_ref(ref: DocumentRef) -> str:
 
 
 def _ref_to_source(ref: DocumentRef, settings: Settings) -> BytesSource:
-    data = fetch_bytes(ref.model_dump(), settings)
-    name = _name_from_ref(ref)
-    return BytesSource(name, data)
+    """Lazy source: bytes are fetched on first load() (by the prefetcher or on a cache miss)."""
+    payload = ref.model_dump()
+    return BytesSource(
+        _name_from_ref(ref),
+        loader=lambda: fetch_bytes(payload, settings),
+        sha256=ref.sha256,
+    )
+
+
+class _BatchLoader:
+    """
+    Shared loader for a set of refs that are always needed together (statement pages): the
+    first load() downloads every ref at once through fetch_many instead of one page at a
+    time. Nothing is fetched while all results come from the extraction cache, and a page
+    loaded again after release() is fetched on its own.
+    """
+
+    def __init__(self, refs: List[DocumentRef], settings: Settings) -> None:
+        self._refs = refs
+        self._settings = settings
+        self._lock = threading.Lock()
+        self._fetched: dict[int, Fetched] | None = None
+
+    def source(self, idx: int) -> BytesSource:
+        ref = self._refs[idx]
+        return BytesSource(_name_from_ref(ref), loader=lambda: self._load(idx), sha256=ref.sha256)
+
+    def _load(self, idx: int) -> bytes:
+        with self._lock:
+            if self._fetched is None:
+                results = fetch_many([ref.model_dump() for ref in self._refs], self._settings)
+                self._fetched = dict(enumerate(results))
+            fetched = self._fetched.pop(idx, None)
+        if fetched is None:
+            return fetch_bytes(self._refs[idx].model_dump(), self._settings)
+        return fetched.unwrap()
 
 
 def _is_pdf_bytes(data: bytes, name: str | None, mime: str | None) -> bool:
@@ -93,25 +204,22 @@ def _is_pdf_bytes(data: bytes, name: str | None, mime: str | None) -> bool:
     return data[:4] == b"%PDF"
 
 
-def _rasterize_pdf_bytes(pdf_bytes: bytes, base_name: str, max_side: int) -> List[BytesSource]:
-    try:
-        import fitz  # PyMuPDF
-    except Exception as exc:  # noqa: BLE001
-        raise RuntimeError("PyMuPDF no está instalado") from exc
-
-    sources: List[BytesSource] = []
-    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
-        if doc.page_count < 1:
-            raise ValueError("PDF sin páginas")
-        for i in range(doc.page_count):
-            page = doc[i]
-            width, height = page.rect.width, page.rect.height
-            scale = max_side / max(width, height)
-            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
-            img_bytes = pix.tobytes("png")
-            name = f"{base_name}_page_{i+1}.png"
-            sources.append(BytesSource(name, img_bytes))
-    return sources
+def _raster_options(request: ProcessStatementRequest, settings: Settings) -> RasterOptions:
+    opts = request.options
+    return RasterOptions(
+        max_side=opts.maxSidePx if opts and opts.maxSidePx else settings.default_max_side_px,
+        fmt=opts.rasterFormat if opts and opts.rasterFormat else settings.raster_format,
+        quality=opts.rasterQuality if opts and opts.rasterQuality else settings.raster_quality,
+        max_dpi=settings.raster_max_dpi,
+        pages=opts.pages if opts else None,
+    )
+
+
+def _rasterize_pdf_bytes(
+    pdf_bytes: bytes, base_name: str, opts: RasterOptions, settings: Settings
+) -> List[BytesSource]:
+    pages = rasterize_pdf(pdf_bytes, opts, executor=get_cpu_pool(settings), workers=cpu_workers(settings))
+    return [BytesSource(f"{base_name}_page_{p.page_number}.{p.ext}", p.data) for p in pages]
 
 
 def _statement_to_csv(statement_parsed: dict[str, Any]) -> str:
@@ -168,78 +276,206 @@ def _build_statement_prompt(base_prompt: str | None, statement_parsed: dict[str,
     return "\n\n".join(p for p in parts if p)
 
 
-def _run_extract(
+def _cached_extract(
     docs: List[BytesSource],
+    profile_name: str,
     profile,
     settings: Settings,
-    model: str | None = None,
-    multi_mode: str = "per_file",
-) -> List[ExtractionResult]:
-    options = ProviderOptions(model_name=model) if model else None
-    result = _extract_with_retry(
-        docs=docs,
-        profile=profile,
-        settings=settings,
-        options=options,
-        multi_mode=multi_mode,
-    )
-    if multi_mode == "aggregate":
-        return [result] if not isinstance(result, list) else result
-    if isinstance(result, list):
-        return result
+    model: str | None,
+    multi_mode: str,
+    compute: Callable[[], Any],
+):
+    cache = get_extraction_cache(settings)
+    if cache is None:
+        return compute()
+    key = build_cache_key([doc.sha256() for doc in docs], profile_name, profile, model, multi_mode)
+    return cache.get_or_compute(key, compute)
+
+
+def _single_result(result) -> ExtractionResult:
+    """
+    DocFlow returns a list (per_file), an object with per_file, or one result (aggregate).
+    Callers here always want one result, and the cache stores exactly that shape.
+    """
     if hasattr(result, "per_file"):
-        return list(result.per_file)
-    return [result]
+        result = list(result.per_file)
+    if isinstance(result, list):
+        if not result:
+            raise ValueError("No extraction results returned")
+        return result[0]
+    return result
 
 
-def _run_extract_single(
-    doc: BytesSource,
+def _run_extract(
+    docs: List[BytesSource],
+    profile_name: str,
     profile,
     settings: Settings,
     model: str | None = None,
+    multi_mode: str = "per_file",
 ) -> ExtractionResult:
+    """One result for `docs` (a single file, or several pages aggregated)."""
     options = ProviderOptions(model_name=model) if model else None
-    result = _extract_with_retry(
-        docs=[doc],
-        profile=profile,
-        settings=settings,
-        options=options,
-        multi_mode="per_file",
-    )
-    if isinstance(result, list):
-        return result[0]
-    if hasattr(result, "per_file"):
-        return list(result.per_file)[0]
-    return result
 
+    def _compute() -> ExtractionResult:
+        return _single_result(
+            _extract_with_retry(
+                docs=docs,
+                profile=profile,
+                settings=settings,
+                options=options,
+                multi_mode=multi_mode,
+            )
+        )
 
-def _run_extract_parallel(
-    docs: List[BytesSource],
+    return _cached_extract(docs, profile_name, profile, settings, model, multi_mode, _compute)
+
+
+def _run_extract_single(
+    doc: BytesSource,
+    profile_name: str,
     profile,
     settings: Settings,
     model: str | None = None,
-) -> List[ExtractionResult]:
-    if len(docs) <= 1:
-        return [_run_extract_single(docs[0], profile, settings, model=model)]
-    workers = min(len(docs), settings.docflow_workers)
-    results: List[Tuple[int, ExtractionResult]] = []
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = {
-            executor.submit(_run_extract_single, doc, profile, settings, model): idx
-            for idx, doc in enumerate(docs)
-        }
-        for fut in as_completed(futures):
-            idx = futures[fut]
-            results.append((idx, fut.result()))
-    results.sort(key=lambda x: x[0])
-    return [r[1] for r in results]
-
-
-def _chunk_list(items: List[BytesSource], size: int) -> List[List[BytesSource]]:
-    if not items:
-        return []
-    n = max(1, size or 1)
-    return [items[i : i + n] for i in range(0, len(items), n)]
+) -> ExtractionResult:
+    return _run_extract([doc], profile_name, profile, settings, model, "per_file")
+
+
+def _prefetch(
+    sources: List[BytesSource],
+    lookahead: int,
+    warm: Callable[[BytesSource], None],
+) -> Iterator[Tuple[int, BytesSource]]:
+    """
+    Downloads up to `lookahead` sources concurrently and yields (idx, source) as soon as
+    each one is ready, so extraction starts on the first arrival instead of after the
+    whole batch is in memory. A new download starts only when a ready source is taken.
+    """
+    if not sources:
+        return
+    pending_idx = iter(range(len(sources)))
+    with ThreadPoolExecutor(max_workers=max(1, min(lookahead, len(sources)))) as executor:
+        inflight: dict = {}
+
+        def _submit_next() -> None:
+            idx = next(pending_idx, None)
+            if idx is not None:
+                inflight[executor.submit(bind_context(warm), sources[idx])] = idx
+
+        for _ in range(max(1, lookahead)):
+            _submit_next()
+        while inflight:
+            done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = inflight.pop(fut)
+                fut.result()
+                yield idx, sources[idx]
+                _submit_next()
+
+
+_RETRY_HINT_RE = re.compile(r"retry[ _-]?(?:after|delay)\W*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def _retry_after_hint(exc: Exception) -> float | None:
+    """Seconds the server asked us to wait (Retry-After header, retryDelay detail or message)."""
+    hint = getattr(exc, "retry_after", None)
+    if isinstance(hint, (int, float)):
+        return float(hint)
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        try:
+            value = headers.get("Retry-After") or headers.get("retry-after")
+            if value:
+                return float(value)
+        except (TypeError, ValueError):
+            pass
+    match = _RETRY_HINT_RE.search(str(exc))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class AdaptiveLimiter:
+    """
+    Process-wide AIMD limit on in-flight Gemini calls.
+
+    Every success grows the limit by ~1 per window of `limit` calls; a quota error
+    multiplies it by `decrease` (at most once per `cooldown` seconds, so a burst of 429s
+    from the same overload counts once) and, when the server sends a retry-after hint,
+    holds every new call until it expires.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease: float = 0.5, cooldown: float = 2.0) -> None:
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._limit = float(max_limit)
+        self._inflight = 0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._throttled = 0
+        self._succeeded = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                raise_if_cancelled()
+                now = time.monotonic()
+                if now >= self._blocked_until and self._inflight < int(self._limit):
+                    self._inflight += 1
+                    return
+                timeout = max(self._blocked_until - now, 0.0) or 0.5
+                # Wake up periodically so cancelled requests do not wait out the block.
+                self._cond.wait(min(timeout, 0.5))
+
+    def release(self) -> None:
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._succeeded += 1
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+            self._cond.notify()
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        with self._cond:
+            self._throttled += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self._limit = max(float(self.min_limit), self._limit * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "limitExact": round(self._limit, 3),
+                "maxLimit": self.max_limit,
+                "inflight": self._inflight,
+                "throttled": self._throttled,
+                "succeeded": self._succeeded,
+                "blockedForSeconds": max(0.0, self._blocked_until - time.monotonic()),
+            }
+
+
+@lru_cache
+def _adaptive_limiter(max_limit: int, min_limit: int, decrease: float) -> AdaptiveLimiter:
+    return AdaptiveLimiter(max_limit=max_limit, min_limit=min_limit, decrease=decrease)
+
+
+def get_rate_limiter(settings: Settings) -> AdaptiveLimiter:
+    return _adaptive_limiter(
+        settings.docflow_max_inflight,
+        settings.docflow_min_inflight,
+        settings.docflow_limit_decrease,
+    )
 
 
 def _extract_with_retry(
@@ -250,27 +486,45 @@ def _extract_with_retry(
     multi_mode: str,
 ):
     attempts = max(1, settings.docflow_retry_max_attempts)
+    limiter = get_rate_limiter(settings)
     last_exc: Exception | None = None
     for attempt in range(1, attempts + 1):
+        raise_if_cancelled()
+        limiter.acquire()
         try:
-            return extract(
-                docs=docs,
-                profile=profile,
-                provider=_provider(settings),
-                options=options,
-                multi_mode=multi_mode,
-            )
+            with _provider_pool.lease(
+                settings.docflow_project,
+                settings.docflow_location,
+                options.model_name if options else None,
+            ) as provider:
+                result = extract(
+                    docs=docs,
+                    profile=profile,
+                    provider=provider,
+                    options=options,
+                    multi_mode=multi_mode,
+                )
+            limiter.on_success()
+            return result
         except Exception as exc:  # noqa: BLE001
             last_exc = exc
-            if not _is_retryable_error(exc) or attempt >= attempts:
+            if not _is_retryable_error(exc):
+                raise
+            retry_after = _retry_after_hint(exc)
+            limiter.on_throttle(retry_after)
+            if attempt >= attempts:
                 raise
             delay = min(
                 settings.docflow_retry_max_delay,
                 settings.docflow_retry_base_delay
                 * (settings.docflow_retry_backoff ** (attempt - 1)),
             )
+            if retry_after:
+                delay = max(delay, retry_after)
             jitter = random.random() * 0.3
-            time.sleep(delay + jitter)
+        finally:
+            limiter.release()
+        cancellable_sleep(delay + jitter)
     if last_exc:
         raise last_exc
     raise RuntimeError("DocFlow extract failed without exception")
@@ -289,6 +543,60 @@ def _is_retryable_error(exc: Exception) -> bool:
     return False
 
 
+def _extract_statement_windowed(
+    docs: List[BytesSource],
+    profile_name: str,
+    profile,
+    settings: Settings,
+    model: str | None,
+    window_pages: int,
+    overlap: int,
+) -> Tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Extracts overlapping page windows concurrently on the shared scheduler and merges
+    them in page order, so latency follows the window size instead of the page count.
+    """
+    windows = plan_windows(len(docs), window_pages, min(overlap, window_pages - 1))
+
+    def _extract_window(start: int, end: int) -> ExtractionResult:
+        raise_if_cancelled()
+        window_docs = docs[start:end]
+        multi_mode = "aggregate" if len(window_docs) > 1 else "per_file"
+        return _run_extract(window_docs, profile_name, profile, settings, model=model, multi_mode=multi_mode)
+
+    with get_scheduler(settings).session() as session:
+        futures = [session.submit(_extract_window, start, end) for start, end in windows]
+        results = [fut.result() for fut in futures]
+
+    data, dropped = merge_statement_windows([result.data for result in results], windows)
+    meta = dict(results[0].meta or {})
+    meta["mode"] = "windowed"
+    meta["docs"] = [doc.display_name() for doc in docs]
+    meta["windows"] = [
+        {"pages": [docs[start].display_name(), docs[end - 1].display_name()], "meta": result.meta}
+        for (start, end), result in zip(windows, results)
+    ]
+    meta["boundaryDuplicatesDropped"] = dropped
+    return data, meta
+
+
+def _statement_sources(request: ProcessStatementRequest, settings: Settings) -> List[BytesSource]:
+    if request.pages:
+        # Pages rendered once by normalize (pdfMode=rasterize): fetched lazily, never re-rendered.
+        selected = parse_page_ranges(request.options.pages if request.options else None, len(request.pages))
+        if not selected:
+            raise ValueError("El rango de páginas no selecciona ninguna página")
+        loader = _BatchLoader([request.pages[i] for i in selected], settings)
+        return [loader.source(idx) for idx in range(len(selected))]
+    ref = request.statement
+    data = fetch_bytes(ref.model_dump(), settings)
+    name = _name_from_ref(ref)
+    if _is_pdf_bytes(data, name, ref.mime):
+        base = Path(name).stem or "statement"
+        return _rasterize_pdf_bytes(data, base, _raster_options(request, settings), settings)
+    return [BytesSource(name, data)]
+
+
 def run_process_statement(request: ProcessStatementRequest, settings: Settings) -> ProcessStatementResponse:
     warnings: List[Warning] = []
     profile_name = request.options.profile if request.options and request.options.profile else "estado/v0"
@@ -296,32 +604,30 @@ def run_process_statement(request: ProcessStatementRequest, settings: Settings)
 
     try:
         profile = _load_profile(profile_name, settings)
-        ref = request.statement
-        data = fetch_bytes(ref.model_dump(), settings)
-        name = _name_from_ref(ref)
-        if _is_pdf_bytes(data, name, ref.mime):
-            base = Path(name).stem or "statement"
-            max_side = (
-                request.options.maxSidePx
-                if request.options and request.options.maxSidePx
-                else settings.default_max_side_px
+        docs = _statement_sources(request, settings)
+        window_pages = (
+            request.options.windowPages
+            if request.options and request.options.windowPages is not None
+            else settings.statement_window_pages
+        )
+        if window_pages and len(docs) > window_pages:
+            data, meta = _extract_statement_windowed(
+                docs, profile_name, profile, settings, model, window_pages, settings.statement_window_overlap
             )
-            docs = _rasterize_pdf_bytes(data, base, max_side)
         else:
-            docs = [BytesSource(name, data)]
-        multi_mode = "aggregate" if len(docs) > 1 else "per_file"
-        results = _run_extract(docs, profile, settings, model=model, multi_mode=multi_mode)
-        if not results:
-            raise ValueError("No extraction results returned")
-        result = results[0]
+            multi_mode = "aggregate" if len(docs) > 1 else "per_file"
+            result = _run_extract(docs, profile_name, profile, settings, model=model, multi_mode=multi_mode)
+            data, meta = result.data, result.meta
         return ProcessStatementResponse(
             ok=True,
             rendicionId=request.rendicionId,
-            data=result.data,
-            meta=result.meta,
+            data=data,
+            meta=meta,
             warnings=warnings or None,
             error=None,
         )
+    except OffloadCancelled:
+        raise
     except Exception as exc:  # noqa: BLE001
         return ProcessStatementResponse(
             ok=False,
@@ -333,25 +639,69 @@ def run_process_statement(request: ProcessStatementRequest, settings: Settings)
         )
 
 
+def _receipts_profile(request: ProcessReceiptsBatchRequest, settings: Settings) -> Tuple[str, Any, str | None]:
+    profile_name = request.options.profile if request.options and request.options.profile else "lineas_gastos/v0"
+    model = request.options.model if request.options else None
+    profile = _load_profile(profile_name, settings)
+
+    if request.statement and request.statement.parsed:
+        prompt = _build_statement_prompt(profile.prompt, request.statement.parsed)
+        profile = replace(profile, prompt=prompt)
+    return profile_name, profile, model
+
+
+def _iter_receipt_results(
+    request: ProcessReceiptsBatchRequest,
+    settings: Settings,
+    profile_name: str,
+    profile,
+    model: str | None,
+) -> Iterator[Tuple[int, ExtractionResult]]:
+    """Yields (receipt index, result) as each extraction completes."""
+    docs = [_ref_to_source(it, settings) for it in request.receipts]
+    cache = get_extraction_cache(settings)
+
+    def _warm(doc: BytesSource) -> None:
+        sha = doc.known_sha256()
+        if cache is not None and sha:
+            key = build_cache_key([sha], profile_name, profile, model, "per_file")
+            if cache.contains(key):
+                return
+        doc.load()
+
+    arrivals = _prefetch(docs, settings.docflow_prefetch, _warm)
+    exhausted = False
+    pending: dict[Future, int] = {}
+    with get_scheduler(settings).session() as session:
+        while True:
+            # Keep docflow_workers extractions of this request in flight on the shared scheduler.
+            while not exhausted and len(pending) < settings.docflow_workers:
+                arrival = next(arrivals, None)
+                if arrival is None:
+                    exhausted = True
+                    break
+                idx, doc = arrival
+                pending[session.submit(_run_extract_single, doc, profile_name, profile, settings, model)] = idx
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = pending.pop(fut)
+                result = fut.result()
+                docs[idx].release()
+                yield idx, result
+
+
 def run_process_receipts_batch(
     request: ProcessReceiptsBatchRequest, settings: Settings
 ) -> ProcessReceiptsBatchResponse:
     warnings: List[Warning] = []
-    profile_name = request.options.profile if request.options and request.options.profile else "lineas_gastos/v0"
-    model = request.options.model if request.options else None
 
     try:
-        profile = _load_profile(profile_name, settings)
-
-        if request.statement and request.statement.parsed:
-            prompt = _build_statement_prompt(profile.prompt, request.statement.parsed)
-            profile = replace(profile, prompt=prompt)
-
-        docs = [_ref_to_source(it, settings) for it in request.receipts]
-        batches = _chunk_list(docs, settings.docflow_batch_size)
-        results: List[ExtractionResult] = []
-        for batch in batches:
-            results.extend(_run_extract_parallel(batch, profile, settings, model=model))
+        profile_name, profile, model = _receipts_profile(request, settings)
+        results: List[ExtractionResult | None] = [None] * len(request.receipts)
+        for idx, res in _iter_receipt_results(request, settings, profile_name, profile, model):
+            results[idx] = res
 
         rows = [DocflowRow(data=res.data, meta=res.meta) for res in results]
         return ProcessReceiptsBatchResponse(
@@ -361,6 +711,8 @@ def run_process_receipts_batch(
             warnings=warnings or None,
             error=None,
         )
+    except OffloadCancelled:
+        raise
     except Exception as exc:  # noqa: BLE001
         return ProcessReceiptsBatchResponse(
             ok=False,
@@ -369,3 +721,42 @@ def run_process_receipts_batch(
             warnings=warnings or None,
             error=ErrorPayload(code="PROCESS_RECEIPTS_FAILED", message=str(exc), details={}),
         )
+
+
+def iter_process_receipts_batch(
+    request: ProcessReceiptsBatchRequest, settings: Settings
+) -> Iterator[ReceiptStreamStart | ReceiptStreamRow | ReceiptStreamSummary]:
+    """
+    Streaming variant of run_process_receipts_batch: a start record, one row per receipt
+    as soon as its extraction completes (in completion order, tagged with its index),
+    and a final summary.
+    """
+    warnings: List[Warning] = []
+    total = len(request.receipts)
+    completed = 0
+    yield ReceiptStreamStart(rendicionId=request.rendicionId, total=total)
+
+    try:
+        profile_name, profile, model = _receipts_profile(request, settings)
+        for idx, res in _iter_receipt_results(request, settings, profile_name, profile, model):
+            completed += 1
+            yield ReceiptStreamRow(index=idx, row=DocflowRow(data=res.data, meta=res.meta))
+        yield ReceiptStreamSummary(
+            ok=True,
+            rendicionId=request.rendicionId,
+            total=total,
+            completed=completed,
+            warnings=warnings or None,
+            error=None,
+        )
+    except OffloadCancelled:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        yield ReceiptStreamSummary(
+            ok=False,
+            rendicionId=request.rendicionId,
+            total=total,
+            completed=completed,
+            warnings=warnings or None,
+            error=ErrorPayload(code="PROCESS_RECEIPTS_FAILED", message=str(exc), details={}),
+        )
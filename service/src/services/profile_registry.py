@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from docflow.sdk import profiles
+from docflow.sdk.config import SdkConfig
+
+from ..config import Settings
+
+
+PROFILE_FILES = ("prompt.txt", "schema.json", "system_instruction.txt")
+
+_Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+def resolve_profile_dir(settings: Settings) -> Path:
+    base = Path(__file__).resolve().parents[2]
+    path = Path(settings.docflow_profile_dir)
+    if not path.is_absolute():
+        path = (base / path).resolve()
+    return path
+
+
+class ProfileRegistry:
+    """
+    Parsed DocFlow profiles keyed by name (e.g. "lineas_gastos/v0").
+
+    Entries are re-validated against the mtimes of the profile files on each lookup, so
+    edited profiles and newly added versions (e.g. "lineas_gastos/v1" for an A/B run
+    selected through options.profile) are picked up without restarting the service.
+    """
+
+    def __init__(self, profile_dir: Path) -> None:
+        self.profile_dir = profile_dir
+        self._config = SdkConfig(profile_dir=profile_dir)
+        self._entries: dict[str, Tuple[_Fingerprint, Any]] = {}
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._hits = 0
+
+    def _fingerprint(self, name: str) -> _Fingerprint:
+        folder = self.profile_dir / "profiles" / name
+        parts = []
+        for filename in PROFILE_FILES:
+            path = folder / filename
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            parts.append((filename, stat.st_mtime_ns, stat.st_size))
+        return tuple(parts)
+
+    def discover(self) -> List[str]:
+        root = self.profile_dir / "profiles"
+        if not root.is_dir():
+            return []
+        names = []
+        for folder in sorted(root.glob("*/*")):
+            if folder.is_dir() and any((folder / f).exists() for f in PROFILE_FILES):
+                names.append(folder.relative_to(root).as_posix())
+        return names
+
+    def preload(self) -> List[str]:
+        names = self.discover()
+        for name in names:
+            self.get(name)
+        return names
+
+    def get(self, name: str):
+        fingerprint = self._fingerprint(name)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == fingerprint:
+                self._hits += 1
+                return entry[1]
+        profile = profiles.load_profile(name, self._config)
+        with self._lock:
+            self._entries[name] = (fingerprint, profile)
+            self._loads += 1
+        return profile
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"profiles": sorted(self._entries), "loads": self._loads, "hits": self._hits}
+
+
+@lru_cache
+def _profile_registry(profile_dir: str) -> ProfileRegistry:
+    return ProfileRegistry(Path(profile_dir))
+
+
+def get_profile_registry(settings: Settings) -> ProfileRegistry:
+    return _profile_registry(str(resolve_profile_dir(settings)))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any, Callable, Deque, Tuple
+
+from ..config import Settings
+from ..execution import bind_context
+
+
+_Task = Tuple[Future, Callable[[], Any]]
+
+
+class SchedulerSession:
+    """Per-request handle: tasks submitted here share the scheduler's workers with other requests."""
+
+    def __init__(self, scheduler: "ExtractionScheduler", session_id: int) -> None:
+        self._scheduler = scheduler
+        self._id = session_id
+        self._closed = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if self._closed:
+            raise RuntimeError("Scheduler session already closed")
+        bound = bind_context(fn)
+        return self._scheduler._enqueue(self._id, lambda: bound(*args, **kwargs))
+
+    def close(self) -> None:
+        """Cancels this session's tasks that have not started yet."""
+        if not self._closed:
+            self._closed = True
+            self._scheduler._drop(self._id)
+
+    def __enter__(self) -> "SchedulerSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ExtractionScheduler:
+    """
+    Process-wide pool of extraction workers shared by every request.
+
+    Each request gets its own queue; idle workers take the next task round-robin across
+    request queues, so one large batch cannot starve a small one and no request waits
+    on a chunk barrier. Results are delivered through futures, so callers restore their
+    own ordering.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._queues: "OrderedDict[int, Deque[_Task]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"docflow-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def session(self) -> SchedulerSession:
+        return SchedulerSession(self, next(self._ids))
+
+    def _enqueue(self, session_id: int, call: Callable[[], Any]) -> Future:
+        future: Future = Future()
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append((future, call))
+            self._cond.notify()
+        return future
+
+    def _drop(self, session_id: int) -> None:
+        with self._cond:
+            tasks = self._queues.pop(session_id, None) or ()
+            self._cancelled += len(tasks)
+        for future, _ in tasks:
+            future.cancel()
+
+    def _next_task(self) -> _Task:
+        with self._cond:
+            while not self._queues:
+                self._cond.wait()
+            session_id, tasks = next(iter(self._queues.items()))
+            task = tasks.popleft()
+            if tasks:
+                # Rotate so the next worker serves another request first.
+                self._queues.move_to_end(session_id)
+            else:
+                del self._queues[session_id]
+            self._busy += 1
+            return task
+
+    def _worker(self) -> None:
+        while True:
+            future, call = self._next_task()
+            started = time.monotonic()
+            outcome = "_cancelled"
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(call())
+                        outcome = "_completed"
+                    except BaseException as exc:  # noqa: BLE001
+                        future.set_exception(exc)
+                        outcome = "_failed"
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._busy_seconds += time.monotonic() - started
+                    setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            uptime = max(time.monotonic() - self._started_at, 1e-9)
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queued": sum(len(q) for q in self._queues.values()),
+                "activeSessions": len(self._queues),
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+                "utilization": self._busy / self.workers,
+                "utilizationAvg": self._busy_seconds / (self.workers * uptime),
+            }
+
+
+@lru_cache
+def _scheduler(workers: int) -> ExtractionScheduler:
+    return ExtractionScheduler(workers)
+
+
+def get_scheduler(settings: Settings) -> ExtractionScheduler:
+    return _scheduler(settings.docflow_scheduler_workers)
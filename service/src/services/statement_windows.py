@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Hashable, List, Tuple
+
+
+TRANSACTIONS_KEY = "transacciones"
+AMOUNT_FIELDS = ("importe_origen", "importe_uyu", "importe_usd")
+
+
+def plan_windows(page_count: int, size: int, overlap: int) -> List[Tuple[int, int]]:
+    """
+    [start, end) page windows of `size` pages, consecutive windows sharing `overlap`
+    pages so rows cut at a page break are seen whole by at least one window.
+    """
+    if page_count <= 0:
+        return []
+    size = max(1, size)
+    step = max(1, size - max(0, overlap))
+    windows = []
+    start = 0
+    while True:
+        end = min(start + size, page_count)
+        windows.append((start, end))
+        if end >= page_count:
+            return windows
+        start += step
+
+
+def _normalize_text(value: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(value or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r"[^0-9a-z]+", "", text.lower())
+
+
+def _normalize_amount(value: Any) -> Hashable:
+    if value in (None, ""):
+        return None
+    try:
+        return round(abs(float(value)), 2)
+    except (TypeError, ValueError):
+        return _normalize_text(value)
+
+
+def transaction_key(tx: Any) -> Hashable:
+    """Comparison key for a transaction row, tolerant to whitespace/case/sign differences."""
+    if not isinstance(tx, dict):
+        return ("raw", _normalize_text(tx))
+    return (
+        _normalize_text(tx.get("fecha")),
+        _normalize_text(tx.get("detalle")),
+        *(_normalize_amount(tx.get(field)) for field in AMOUNT_FIELDS),
+    )
+
+
+def _boundary_overlap(previous: List[Hashable], current: List[Hashable], limit: int) -> int:
+    """Length of the longest suffix of `previous` (at most `limit`) that is also a prefix of `current`."""
+    for k in range(min(len(previous), len(current), limit), 0, -1):
+        if previous[-k:] == current[:k]:
+            return k
+    return 0
+
+
+def _shared_rows(row_count: int, page_count: int, shared_pages: int) -> int:
+    """
+    Rows of a window that can come from its `shared_pages` (rows carry no page number, so
+    they are assumed spread evenly over the window's pages; rounded up).
+    """
+    if row_count <= 0 or page_count <= 0 or shared_pages <= 0:
+        return 0
+    return min(row_count, -(-row_count * min(shared_pages, page_count) // page_count))
+
+
+def merge_transactions(
+    windows: List[List[Any]], spans: List[Tuple[int, int]] | None = None
+) -> Tuple[List[Any], int]:
+    """
+    Concatenates per-window rows in page order. With `spans` (the [start, end) pages of each
+    window, from plan_windows) rows repeated across a boundary are dropped, but only where
+    consecutive windows actually share pages and only among the rows of those shared pages;
+    without spans, or without overlap, every row is kept (identical consecutive charges are real).
+    """
+    merged: List[Any] = []
+    previous_keys: List[Hashable] = []
+    previous_span: Tuple[int, int] | None = None
+    dropped = 0
+    for idx, rows in enumerate(windows):
+        keys = [transaction_key(tx) for tx in rows]
+        span = spans[idx] if spans else None
+        skip = 0
+        if span and previous_span:
+            shared = previous_span[1] - span[0]
+            limit = min(
+                _shared_rows(len(previous_keys), previous_span[1] - previous_span[0], shared),
+                _shared_rows(len(keys), span[1] - span[0], shared),
+            )
+            skip = _boundary_overlap(previous_keys, keys, limit)
+        dropped += skip
+        merged.extend(rows[skip:])
+        previous_keys, previous_span = keys, span
+    return merged, dropped
+
+
+def _is_total_field(key: str) -> bool:
+    return key.startswith("total")
+
+
+def merge_statement_windows(
+    parts: List[Any], spans: List[Tuple[int, int]] | None = None
+) -> Tuple[dict[str, Any], int]:
+    """
+    Merges per-window statement payloads (in page order) into one.
+
+    - `transacciones`: concatenated; rows repeated on pages shared by consecutive `spans` removed.
+    - Totals (`total_*`): taken from the last window that reports them (summary page).
+    - Other header fields (`fecha_emision`, `usuario`, ...): first window that has them.
+    - `warnings`: distinct messages joined in window order.
+    Returns (merged payload, number of duplicated boundary rows dropped).
+    """
+    dicts = [p if isinstance(p, dict) else {} for p in parts]
+    keys: List[str] = []
+    for data in dicts:
+        keys.extend(k for k in data if k not in keys)
+
+    merged: dict[str, Any] = {}
+    dropped = 0
+    for key in keys:
+        values = [data.get(key) for data in dicts if data.get(key) not in (None, "", [])]
+        if key == TRANSACTIONS_KEY:
+            merged[key], dropped = merge_transactions(
+                [data.get(key) if isinstance(data.get(key), list) else [] for data in dicts], spans
+            )
+        elif key == "warnings":
+            distinct = list(dict.fromkeys(str(v).strip() for v in values if str(v).strip()))
+            merged[key] = "\n".join(distinct) or None
+        elif _is_total_field(key):
+            merged[key] = values[-1] if values else None
+        else:
+            merged[key] = values[0] if values else None
+    return merged, dropped
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+
+from pypdf import PdfReader
+
+from .utils import (
+    IMAGE_ENCODINGS,
+    PDF_EXTS,
+    SUPPORTED_IMAGE_EXTS,
+    decode_resized,
+    encode_image,
+    encode_within_budget,
+    sha256_bytes,
+)
+
+# CPU stage of /v1/normalize. Runs in the shared process pool, so this module must stay
+# free of GCS/Drive/FastAPI imports to keep spawned workers cheap.
+
+
+@dataclass(frozen=True)
+class Encoding:
+    """How normalized images are written: format, quality and an optional byte budget."""
+
+    fmt: str = "jpeg"
+    quality: int = 90
+    progressive: bool = False
+    target_bytes: int | None = None
+    min_quality: int = 40
+
+
+@dataclass
+class Transformed:
+    data: bytes
+    mime: str
+    ext: str
+    sha256: str
+    page_count: int | None = None
+    width: int | None = None
+    height: int | None = None
+    quality: int | None = None
+
+
+def is_supported(ext: str) -> bool:
+    return ext in SUPPORTED_IMAGE_EXTS or ext in PDF_EXTS
+
+
+def transform_entry(
+    ext: str, data: bytes, encoding: Encoding, max_side: int, resample: str = "balanced"
+) -> Transformed:
+    """Image -> oriented, resized RGB JPEG/WebP (fitted to the byte budget, if any); PDF -> kept as-is."""
+    if ext in SUPPORTED_IMAGE_EXTS:
+        img = decode_resized(data, max_side, resample)
+        if encoding.target_bytes:
+            out, quality = encode_within_budget(
+                img, encoding.fmt, encoding.quality, encoding.min_quality, encoding.target_bytes, encoding.progressive
+            )
+        else:
+            out, quality = encode_image(img, encoding.fmt, encoding.quality, encoding.progressive), encoding.quality
+        _, out_ext, mime = IMAGE_ENCODINGS[encoding.fmt]
+        return Transformed(
+            data=out,
+            mime=mime,
+            ext=out_ext,
+            sha256=sha256_bytes(out),
+            width=img.width,
+            height=img.height,
+            quality=quality,
+        )
+    if ext in PDF_EXTS:
+        try:
+            page_count = len(PdfReader(io.BytesIO(data)).pages)
+        except Exception:
+            page_count = None
+        return Transformed(
+            data=data, mime="application/pdf", ext="pdf", sha256=sha256_bytes(data), page_count=page_count
+        )
+    raise ValueError(f"Unsupported extension: {ext}")
@@ -4,9 +4,9 @@ import base64
 import hashlib
 import io
 import zipfile
-from typing import Iterable, List, Tuple
+from typing import Tuple
 
-from PIL import Image, ImageOps
+from PIL import Image
 
 
 SUPPORTED_IMAGE_EXTS = {"jpg", "jpeg", "png", "webp", "bmp", "tiff"}
@@ -41,20 +41,69 @@ def ensure_rgb(image: Image.Image) -> Image.Image:
     return image
 
 
-def apply_exif_orientation(image: Image.Image) -> Image.Image:
-    try:
-        return ImageOps.exif_transpose(image)
-    except Exception:
-        return image
+# Resample tiers for normalize: (use JPEG draft decoding, resample filter, reducing_gap).
+# "archival" is the historical full-decode + LANCZOS path.
+RESAMPLE_TIERS = {
+    "fast": (True, Image.Resampling.BILINEAR, 2.0),
+    "balanced": (True, Image.Resampling.LANCZOS, 3.0),
+    "archival": (False, Image.Resampling.LANCZOS, None),
+}
+# Modes every resample filter accepts; anything else is converted before resizing.
+_RESAMPLABLE_MODES = ("L", "LA", "RGB", "RGBA")
+
+_EXIF_ORIENTATION = 0x0112
+_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
 
 
-def resize_image_max_side(image: Image.Image, max_side: int) -> Image.Image:
-    width, height = image.size
+def _fit_size(size: Tuple[int, int], max_side: int) -> Tuple[int, int]:
+    width, height = size
     if max(width, height) <= max_side:
-        return image
+        return size
     scale = max_side / float(max(width, height))
-    new_size = (int(width * scale), int(height * scale))
-    return image.resize(new_size, Image.LANCZOS)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    if img.mode == "I" or img.mode.startswith("I;16"):
+        # 16-bit samples: keep the high byte instead of clipping everything above 255 to white.
+        img = img.convert("I").point(lambda v: v / 256).convert("L")
+    return img.convert("RGB")
+
+
+def decode_resized(data: bytes, max_side: int, tier: str = "balanced") -> Image.Image:
+    """
+    Decodes an image straight to an upright RGB image whose longest side is <= max_side.
+
+    - JPEGs are decoded with DCT scaling (draft) to the smallest size >= target, so a
+      4000x3000 photo is never fully materialized for a 2000px output.
+    - Resizing happens before EXIF rotation and RGB conversion (when the mode allows it),
+      so those steps touch the small image; nothing is copied when already upright/RGB.
+    """
+    use_draft, resample, reducing_gap = RESAMPLE_TIERS[tier]
+    img = Image.open(io.BytesIO(data))
+    orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+    target = _fit_size(img.size, max_side)
+    if use_draft and target != img.size and img.format == "JPEG":
+        img.draft("RGB", target)
+    if img.mode not in _RESAMPLABLE_MODES:
+        # Palette, bilevel, CMYK and 16-bit/integer images cannot be resampled with every filter.
+        img = _to_rgb(img)
+    if img.size != target:
+        img = img.resize(target, resample, reducing_gap=reducing_gap)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    method = _ORIENTATION_TRANSPOSE.get(orientation)
+    if method is not None:
+        img = img.transpose(method)
+    return img
 
 
 def image_to_jpeg_bytes(image: Image.Image, quality: int) -> bytes:
@@ -63,5 +112,54 @@ def image_to_jpeg_bytes(image: Image.Image, quality: int) -> bytes:
     return buf.getvalue()
 
 
-def sort_entries(entries: Iterable[Tuple[str, bytes]]) -> List[Tuple[str, bytes]]:
-    return sorted(entries, key=lambda kv: kv[0].lower())
+# Output encodings for normalized images: PIL format name, extension, MIME.
+IMAGE_ENCODINGS = {
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+    "webp": ("WEBP", "webp", "image/webp"),
+}
+
+
+def encode_image(image: Image.Image, fmt: str, quality: int, progressive: bool = False) -> bytes:
+    if fmt == "jpeg":
+        if not progressive:
+            return image_to_jpeg_bytes(image, quality)
+        buf = io.BytesIO()
+        image.save(buf, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return buf.getvalue()
+    buf = io.BytesIO()
+    image.save(buf, format=IMAGE_ENCODINGS[fmt][0], quality=quality, method=4)
+    return buf.getvalue()
+
+
+def encode_within_budget(
+    image: Image.Image,
+    fmt: str,
+    max_quality: int,
+    min_quality: int,
+    target_bytes: int,
+    progressive: bool = False,
+) -> Tuple[bytes, int]:
+    """
+    Highest quality in [min_quality, max_quality] whose output fits target_bytes (binary
+    search, ~log2(range) encodes; clean scans usually fit at max_quality on the first try).
+    Returns the min_quality encoding when nothing fits.
+    """
+    best = encode_image(image, fmt, max_quality, progressive)
+    if len(best) <= target_bytes or min_quality >= max_quality:
+        return best, max_quality
+    lo, hi = min_quality, max_quality - 1
+    best_quality = None
+    smallest = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        out = encode_image(image, fmt, mid, progressive)
+        if len(out) <= target_bytes:
+            best, best_quality = out, mid
+            lo = mid + 1
+        else:
+            if mid == min_quality:
+                smallest = out
+            hi = mid - 1
+    if best_quality is None:
+        return smallest or encode_image(image, fmt, min_quality, progressive), min_quality
+    return best, best_quality
@@ -0,0 +1,90 @@
+import importlib.util
+import sys
+import types
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _install_docflow_stub() -> None:
+    """
+    Registers a minimal `docflow` package when DocFlow is not installed, so the modules that
+    import it (process_stage2, profile_registry, jobs) can be tested. Only the names the
+    service imports exist; tests fake extraction and profile loading themselves, and the
+    stubs raise if a test reaches them.
+    """
+    if importlib.util.find_spec("docflow") is not None:
+        return
+
+    def _missing(*args, **kwargs):
+        raise RuntimeError("DocFlow is not installed; fake this call in the test")
+
+    @dataclass
+    class ExtractionResult:
+        data: Any
+        meta: dict
+
+    @dataclass
+    class ProviderOptions:
+        model_name: str | None = None
+
+    class GeminiProvider:
+        def __init__(self, project: str | None = None, location: str | None = None) -> None:
+            self.project = project
+            self.location = location
+
+    @dataclass
+    class SdkConfig:
+        profile_dir: Path | None = None
+
+    attrs = {
+        "docflow": {},
+        "docflow.core": {},
+        "docflow.core.extraction": {},
+        "docflow.core.extraction.engine": {"ExtractionResult": ExtractionResult, "extract": _missing},
+        "docflow.core.providers": {},
+        "docflow.core.providers.base": {"ProviderOptions": ProviderOptions},
+        "docflow.core.providers.gemini": {"GeminiProvider": GeminiProvider},
+        "docflow.sdk": {},
+        "docflow.sdk.config": {"SdkConfig": SdkConfig},
+        "docflow.sdk.profiles": {"load_profile": _missing},
+    }
+    for name, values in attrs.items():
+        module = types.ModuleType(name)
+        module.__dict__.update(values)
+        sys.modules[name] = module
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+
+
+_install_docflow_stub()
+
+from src import gcs  # noqa: E402
+from src.config import Settings, get_settings  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _isolated_settings(monkeypatch, tmp_path):
+    """Every test starts from fresh settings, with the fetch cache in its own directory."""
+    monkeypatch.setenv("REN_FETCH_CACHE_DIR", str(tmp_path / "fetch-cache"))
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return get_settings()
+
+
+@pytest.fixture
+def memory_backend():
+    backend = gcs.MemoryBackend()
+    previous = gcs.set_backend(backend)
+    yield backend
+    gcs.set_backend(previous)
@@ -0,0 +1,12 @@
+import pytest
+from pydantic import ValidationError
+
+from src.config import Settings
+
+
+def test_raster_format_is_validated(monkeypatch):
+    monkeypatch.setenv("REN_RASTER_FORMAT", "webp")
+    assert Settings().raster_format == "webp"
+    monkeypatch.setenv("REN_RASTER_FORMAT", "gif")
+    with pytest.raises(ValidationError):
+        Settings()
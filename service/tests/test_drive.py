@@ -0,0 +1,85 @@
+import io
+import threading
+from types import SimpleNamespace
+
+from src import drive
+
+
+class _FakeDrive:
+    """Just enough of the Drive v3 client for metadata batches."""
+
+    def __init__(self, known):
+        self.known = known
+        self.batches = []
+
+    def files(self):
+        return SimpleNamespace(get=lambda fileId, fields: (fileId, fields))
+
+    def new_batch_http_request(self, callback):
+        calls = []
+        self.batches.append(calls)
+
+        def execute():
+            for file_id, _ in calls:
+                if file_id in self.known:
+                    callback(file_id, {"name": self.known[file_id]}, None)
+                else:
+                    callback(file_id, None, IOError("404"))
+
+        return SimpleNamespace(add=lambda request, request_id: calls.append(request), execute=execute)
+
+
+def test_get_metadata_batches_and_skips_failures(monkeypatch):
+    ids = [f"f{i}" for i in range(250)]
+    fake = _FakeDrive({file_id: f"{file_id}.jpg" for file_id in ids if file_id != "f7"})
+    monkeypatch.setattr(drive, "service", lambda scope=drive.READONLY: fake)
+
+    found = drive.get_metadata(ids + ["f0", "f1"])
+
+    assert [len(batch) for batch in fake.batches] == [100, 100, 50]
+    assert "f7" not in found and len(found) == 249
+    assert found["f3"] == {"name": "f3.jpg"}
+
+
+def test_service_is_built_once_per_thread_and_scope(monkeypatch):
+    built = []
+    monkeypatch.setattr(drive, "_fresh_credentials", lambda scope: None)
+    monkeypatch.setattr(drive, "build", lambda *args, **kwargs: built.append(args) or object())
+    monkeypatch.setattr(drive, "_local", threading.local())
+
+    first = drive.service()
+    assert drive.service() is first
+    assert drive.service(drive.FULL) is not first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(drive.service()))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+    assert len(built) == 3
+
+
+def test_large_files_download_as_parallel_ranges(monkeypatch):
+    content = bytes(range(256)) * 40
+    ranges = []
+
+    def download_range(file_id, start, end, scope):
+        ranges.append((start, end))
+        return content[start : end + 1]
+
+    monkeypatch.setattr(drive, "_download_range", download_range)
+    monkeypatch.setattr(drive, "get_file_size", lambda file_id, scope: len(content))
+    data = drive.download_file("big", chunk_size=1024, parallel_min_bytes=4096, parallel_parts=4)
+
+    assert data == content
+    assert sorted(ranges) == [(0, 2559), (2560, 5119), (5120, 7679), (7680, 10239)]
+
+
+def test_download_to_file_writes_after_existing_content(monkeypatch):
+    content = b"x" * 5000
+    monkeypatch.setattr(drive, "_download_range", lambda file_id, start, end, scope: content[start : end + 1])
+    fh = io.BytesIO(b"head")
+    fh.seek(0, io.SEEK_END)
+    drive.download_to_file("big", fh, chunk_size=1024, parallel_min_bytes=1, parallel_parts=3, size=len(content))
+    assert fh.getvalue() == b"head" + content
+    assert fh.tell() == 4 + len(content)
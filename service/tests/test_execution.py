@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.execution import OffloadCancelled, OffloadPool, OffloadRejected, bind_context, raise_if_cancelled
+
+
+def test_offload_runs_off_the_event_loop():
+    pool = OffloadPool(max_workers=2, max_pending=0)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        return loop_thread, await pool.run(threading.get_ident)
+
+    try:
+        loop_thread, worker_thread = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert loop_thread != worker_thread
+    assert pool.stats()["completed"] == 1
+
+
+def test_offload_rejects_beyond_max_pending():
+    pool = OffloadPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(OffloadRejected):
+            await pool.run(lambda: "rejected")
+        release.set()
+        return await running, await queued
+
+    try:
+        assert asyncio.run(main()) == (True, "queued")
+    finally:
+        pool.shutdown()
+    assert pool.stats()["rejected"] == 1
+
+
+def test_offload_disconnect_cancels_running_work():
+    pool = OffloadPool(max_workers=1, max_pending=0)
+    started = threading.Event()
+    stopped = threading.Event()
+
+    def work():
+        started.set()
+        while True:
+            try:
+                raise_if_cancelled()
+            except OffloadCancelled:
+                stopped.set()
+                raise
+            threading.Event().wait(0.01)
+
+    async def disconnected():
+        return started.is_set()
+
+    async def main():
+        with pytest.raises(OffloadCancelled):
+            await pool.run(work, is_disconnected=disconnected, poll_interval=0.01)
+
+    try:
+        asyncio.run(main())
+        assert stopped.wait(1)
+    finally:
+        pool.shutdown()
+
+
+def test_bind_context_carries_cancellation_into_nested_threads():
+    pool = OffloadPool(max_workers=1, max_pending=0)
+    seen = []
+
+    def nested():
+        try:
+            raise_if_cancelled()
+            seen.append("running")
+        except OffloadCancelled:
+            seen.append("cancelled")
+
+    def work(gate):
+        gate.wait(1)
+        thread = threading.Thread(target=bind_context(nested))
+        thread.start()
+        thread.join()
+
+    async def main():
+        gate = threading.Event()
+        task = asyncio.ensure_future(pool.run(work, gate))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    try:
+        asyncio.run(main())
+        pool._executor.shutdown(wait=True)
+    finally:
+        pool.shutdown()
+    assert seen == ["cancelled"]
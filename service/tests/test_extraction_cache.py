@@ -0,0 +1,94 @@
+import threading
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from src.services.extraction_cache import ExtractionCache, build_cache_key
+
+
+def _result(data):
+    return SimpleNamespace(data=data, meta={"model": "m"})
+
+
+def test_hit_returns_the_computed_payload():
+    cache = ExtractionCache(max_items=4)
+    computed = cache.get_or_compute("k", lambda: _result({"rows": [1, 2]}))
+    cached = cache.get_or_compute("k", lambda: pytest.fail("recomputed on a hit"))
+    assert (cached.data, cached.meta) == (computed.data, computed.meta)
+    assert cache.stats()["memoryHits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_evicts_oldest_entry():
+    cache = ExtractionCache(max_items=2)
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda key=key: _result(key))
+    assert not cache.contains("a")
+    assert cache.get("c").data == "c"
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = ExtractionCache(max_items=4)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def _compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return _result("once")
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", _compute)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", _compute)))
+    follower.start()
+    while cache.stats()["coalesced"] == 0:
+        pass
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert [r.data for r in results] == ["once", "once"]
+    assert len(calls) == 1
+
+
+def test_failed_compute_is_not_cached():
+    cache = ExtractionCache(max_items=4)
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    assert cache.get_or_compute("k", lambda: _result("ok")).data == "ok"
+
+
+def test_persistent_tier_survives_a_new_instance(memory_backend):
+    first = ExtractionCache(max_items=4, persistent_uri="gs://bucket/cache/")
+    first.get_or_compute("k", lambda: _result({"rows": [1]}))
+    second = ExtractionCache(max_items=4, persistent_uri="gs://bucket/cache/")
+    assert second.get("k").data == {"rows": [1]}
+    assert second.stats()["persistentHits"] == 1
+
+
+def test_persistent_tier_round_trips_non_json_meta(memory_backend):
+    class Usage(BaseModel):
+        tokens: int
+
+    meta = {"at": datetime(2026, 1, 2, 3, 4), "cost": Decimal("0.25"), "usage": Usage(tokens=7)}
+    first = ExtractionCache(max_items=4, persistent_uri="gs://bucket/meta-cache/")
+    first.get_or_compute("k", lambda: SimpleNamespace(data={"rows": [1]}, meta=meta))
+    assert first.stats()["persistentErrors"] == 0
+
+    cached = ExtractionCache(max_items=4, persistent_uri="gs://bucket/meta-cache/").get("k")
+    assert cached.data == {"rows": [1]}
+    assert cached.meta == {"at": "2026-01-02T03:04:00", "cost": "0.25", "usage": {"tokens": 7}}
+
+
+def test_cache_key_depends_on_documents_and_mode():
+    profile = SimpleNamespace(prompt="p", system_instruction=None, schema={"type": "object"})
+    base = build_cache_key(["h1"], "recibo", profile, None, "per_file")
+    assert base == build_cache_key(["h1"], "recibo", profile, None, "per_file")
+    assert base != build_cache_key(["h2"], "recibo", profile, None, "per_file")
+    assert base != build_cache_key(["h1"], "recibo", profile, None, "aggregate")
@@ -0,0 +1,168 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from src import fetch, gcs
+from src.fetch_cache import FetchCache, get_fetch_cache
+
+
+def _count(op):
+    return gcs.stats().get("memory", {}).get(op, 0)
+
+
+def test_fetch_cache_miss_is_one_download(memory_backend, settings):
+    gcs.upload_bytes(b"v1", "gs://b/doc.pdf")
+    downloads, lookups = _count("download"), _count("metadata")
+    assert fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings) == b"v1"
+    assert (_count("download") - downloads, _count("metadata") - lookups) == (1, 0)
+
+    # Cached: only the generation is checked.
+    assert fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings) == b"v1"
+    assert (_count("download") - downloads, _count("metadata") - lookups) == (1, 1)
+    assert get_fetch_cache(settings).stats()["hits"] == 1
+
+
+def test_fetch_cache_counts_cold_and_stale_reads_as_misses(memory_backend, settings):
+    gcs.upload_bytes(b"v1", "gs://b/doc.pdf")
+    cache = get_fetch_cache(settings)
+    fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings)
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 0)
+    fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings)
+    assert (cache.stats()["misses"], cache.stats()["hits"]) == (1, 1)
+
+    gcs.upload_bytes(b"v2", "gs://b/doc.pdf")
+    fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings)
+    assert (cache.stats()["misses"], cache.stats()["stores"]) == (2, 2)
+
+
+def test_fetch_cache_rewritten_object_is_refetched(memory_backend, settings):
+    gcs.upload_bytes(b"v1", "gs://b/doc.pdf")
+    fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings)
+    gcs.upload_bytes(b"v2", "gs://b/doc.pdf")
+    assert fetch.fetch_bytes({"gcsUri": "gs://b/doc.pdf"}, settings) == b"v2"
+    stats = get_fetch_cache(settings).stats()
+    # The stale version was dropped when the new one was stored.
+    assert stats["items"] == 1
+    assert stats["bytes"] == 2
+
+
+def test_fetch_cache_evicts_least_recently_used(tmp_path):
+    cache = FetchCache(str(tmp_path / "c"), max_bytes=10)
+    cache.put("a", "1", b"aaaa")
+    cache.put("b", "1", b"bbbb")
+    assert cache.get("a", "1") == b"aaaa"
+    cache.put("c", "1", b"cccc")
+    assert cache.get("b", "1") is None
+    assert cache.get("a", "1") == b"aaaa"
+    assert not cache.has_source("b")
+    cache.put("big", "1", b"x" * 11)
+    assert not cache.has_source("big")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_fetch_cache_adopts_previous_files(tmp_path):
+    directory = str(tmp_path / "c")
+    FetchCache(directory, max_bytes=100).put("gs://b/x", "7", b"data")
+    cache = FetchCache(directory, max_bytes=100)
+    assert cache.has_source("gs://b/x")
+    assert cache.get("gs://b/x", "7") == b"data"
+    assert cache.get("gs://b/x", "8") is None
+
+
+def test_drive_miss_skips_metadata(settings, monkeypatch):
+    monkeypatch.setattr(settings, "drive_enabled", True)
+    monkeypatch.setattr(fetch.drive, "download_file", lambda file_id, scope, **kwargs: b"pdf")
+    lookups = []
+
+    def md5(file_id, scope):
+        lookups.append(file_id)
+        return "437175ba4191210ee004e1d937494d09"  # md5 of "pdf"
+
+    monkeypatch.setattr(fetch.drive, "get_md5_checksum", md5)
+    assert fetch.fetch_bytes({"driveFileId": "f1"}, settings) == b"pdf"
+    assert lookups == []
+    assert fetch.fetch_bytes({"driveFileId": "f1"}, settings) == b"pdf"
+    assert lookups == ["f1"]
+    assert get_fetch_cache(settings).stats()["hits"] == 1
+
+
+def test_fetch_many_keeps_input_order_and_per_item_errors(memory_backend, settings, monkeypatch):
+    for name in ("a", "b", "c"):
+        gcs.upload_bytes(name.encode(), f"gs://b/{name}")
+
+    def slow_first(real):
+        def call(uri):
+            if uri.endswith("/a"):
+                time.sleep(0.05)
+            return real(uri)
+
+        return call
+
+    # Slow on the first (download) and second (cached, generation check) pass alike.
+    monkeypatch.setattr(gcs, "download_versioned", slow_first(gcs.download_versioned))
+    monkeypatch.setattr(gcs, "generation", slow_first(gcs.generation))
+    refs = [{"gcsUri": "gs://b/a"}, {"gcsUri": "gs://b/missing"}, {}, {"gcsUri": "gs://b/c"}]
+    results = fetch.fetch_many(refs, settings, workers=4)
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert results[0].unwrap() == b"a"
+    assert not results[1].ok and not results[2].ok
+    assert isinstance(results[2].error, ValueError)
+    assert results[3].data == b"c"
+
+    unordered = list(fetch.iter_fetch_many(refs, settings, workers=4, ordered=False))
+    assert sorted(r.index for r in unordered) == [0, 1, 2, 3]
+    assert unordered[-1].index == 0
+
+
+def test_fetch_many_bounds_inflight(memory_backend, settings, monkeypatch):
+    for idx in range(10):
+        gcs.upload_bytes(b"x", f"gs://b/{idx}")
+    lock = threading.Lock()
+    current = [0]
+    peak = [0]
+    real = gcs.download_versioned
+
+    def tracked(uri):
+        with lock:
+            current[0] += 1
+            peak[0] = max(peak[0], current[0])
+        time.sleep(0.01)
+        with lock:
+            current[0] -= 1
+        return real(uri)
+
+    monkeypatch.setattr(gcs, "download_versioned", tracked)
+    results = fetch.fetch_many([{"gcsUri": f"gs://b/{idx}"} for idx in range(10)], settings, workers=3)
+    assert all(r.ok for r in results)
+    assert peak[0] <= 3
+
+
+def test_signed_url_must_be_http(settings):
+    with pytest.raises(ValueError, match="http"):
+        fetch.fetch_bytes({"signedUrl": "file:///etc/passwd"}, settings)
+
+
+def test_signed_urls_share_one_session_per_host(settings, monkeypatch):
+    used = []
+
+    def get(session, url, timeout):
+        used.append((session, url))
+        return SimpleNamespace(content=url.encode(), raise_for_status=lambda: None)
+
+    monkeypatch.setattr(requests.Session, "get", get)
+    fetch._session.cache_clear()
+    urls = [f"https://{host}/r{i}.jpg?sig=x" for i in range(3) for host in ("a.example", "b.example")]
+    try:
+        results = fetch.fetch_many([{"signedUrl": url} for url in urls], settings, workers=4)
+    finally:
+        fetch._session.cache_clear()
+
+    assert [r.unwrap() for r in results] == [url.encode() for url in urls]
+    sessions = {url.split("/")[2]: set() for url in urls}
+    for session, url in used:
+        sessions[url.split("/")[2]].add(session)
+    assert all(len(s) == 1 for s in sessions.values())
+    assert sessions["a.example"] != sessions["b.example"]
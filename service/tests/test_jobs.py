@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from src import gcs
+from src.models import JobRequest
+from src.services import jobs
+
+
+def _record(job_id: str = "job-1") -> jobs.JobRecord:
+    request = JobRequest(
+        kind="finalize",
+        finalize={
+            "rendicionId": "r1",
+            "inputs": {"cover": {"gcsUri": "gs://b/cover.pdf"}, "normalizedItems": []},
+            "output": {"gcsPrefix": "gs://b/final/"},
+        },
+    )
+    now = jobs._now_iso()
+    return jobs.JobRecord(
+        jobId=job_id, kind="finalize", rendicionId="r1", status="running",
+        createdAt=now, updatedAt=now, request=request,
+    )
+
+
+@pytest.fixture(params=["sqlite", "gcs"])
+def store(request, tmp_path, memory_backend):
+    if request.param == "sqlite":
+        store = jobs.SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+    else:
+        store = jobs.GcsJobStore("gs://b/state/")
+    store.save(_record())
+    return store
+
+
+def test_claim_blocks_other_owner_until_expiry(store):
+    assert store.claim("job-1", "a", time.time() + 60)
+    assert store.claim("job-1", "a", time.time() + 60)  # renewal by the holder
+    assert not store.claim("job-1", "b", time.time() + 60)
+    assert store.lease("job-1")[0] == "a"
+
+
+def test_expired_lease_is_taken_over(store):
+    assert store.claim("job-1", "a", time.time() - 1)
+    assert store.claim("job-1", "b", time.time() + 60)
+    assert not store.claim("job-1", "a", time.time() + 60)
+    assert store.lease("job-1")[0] == "b"
+
+
+def test_release_only_by_holder(store):
+    store.claim("job-1", "a", time.time() + 60)
+    store.release("job-1", "b")
+    assert store.lease("job-1")[0] == "a"
+    store.release("job-1", "a")
+    assert store.lease("job-1")[0] is None
+    assert store.claim("job-1", "b", time.time() + 60)
+
+
+def test_list_active_skips_finished_jobs(store):
+    store.save(_record("job-2"))
+    done = _record("job-2")
+    done.status = "succeeded"
+    store.save(done)
+    queued = _record("job-3")
+    queued.status = "queued"
+    store.save(queued)
+    assert sorted(r.jobId for r in store.list_active()) == ["job-1", "job-3"]
+
+
+def test_gcs_list_active_reads_only_active_records(memory_backend):
+    store = jobs.GcsJobStore("gs://b/history/")
+    for idx in range(5):
+        record = _record(f"old-{idx}")
+        record.status = "queued"
+        store.save(record)
+        record.status = "succeeded"
+        store.save(record)
+    queued = _record("new")
+    queued.status = "queued"
+    store.save(queued)
+
+    downloads = gcs.stats()["memory"]["download"]
+    assert [r.jobId for r in store.list_active()] == ["new"]
+    assert gcs.stats()["memory"]["download"] - downloads == 1
+
+
+def test_gcs_takeover_race_has_one_winner(memory_backend, monkeypatch):
+    store = jobs.GcsJobStore("gs://b/state/")
+    store.claim("job-1", "old", time.time() - 1)
+
+    # "b" reads the expired lease; before it writes, "a" takes it over.
+    real_upload = gcs.upload_if_generation
+    raced = []
+
+    def racing_upload(data, uri, generation, content_type=None):
+        if not raced:
+            raced.append(True)
+            assert store.claim("job-1", "a", time.time() + 60)
+        return real_upload(data, uri, generation, content_type=content_type)
+
+    monkeypatch.setattr(gcs, "upload_if_generation", racing_upload)
+    assert not store.claim("job-1", "b", time.time() + 60)
+    assert store.lease("job-1")[0] == "a"
+
+
+@pytest.fixture
+def runner(tmp_path, settings, monkeypatch):
+    started = []
+    monkeypatch.setattr(jobs.JobRunner, "_run", lambda self, record: started.append(record.jobId))
+    runner = jobs.JobRunner(jobs.SqliteJobStore(str(tmp_path / "jobs.sqlite3")), settings)
+    runner.started = started
+    yield runner
+    runner.shutdown()
+
+
+def test_runner_skips_job_leased_elsewhere(runner):
+    runner.store.save(_record())
+    runner.store.claim("job-1", "other", time.time() + 60)
+    assert runner.heartbeat() == []
+    assert not runner._active
+
+
+def test_runner_resumes_expired_job(runner):
+    runner.store.save(_record())
+    runner.store.claim("job-1", "other", time.time() - 1)
+    assert runner.heartbeat() == ["job-1"]
+    runner._executor.shutdown(wait=True)
+    assert runner.started == ["job-1"]
+    assert runner.store.lease("job-1")[0] == runner.instance_id
+
+
+def test_lost_lease_stops_checkpoints(runner):
+    record = _record()
+    runner.store.save(record)
+    runner._active.add("job-1")
+    runner.store.claim("job-1", "other", time.time() + 60)
+    runner.heartbeat()
+    assert "job-1" in runner._lost
+    with pytest.raises(jobs.LeaseLost):
+        runner._save(record)
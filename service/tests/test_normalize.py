@@ -0,0 +1,212 @@
+import asyncio
+import base64
+import io
+import zipfile
+
+import pytest
+from PIL import Image
+
+from src import drive, execution, gcs
+from src.models import NormalizeRequest
+from src.services import normalize
+from src.services.normalize import run_normalize
+
+
+def _jpeg(color: str, size=(64, 48)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def drive_files(monkeypatch, settings):
+    """Fake Drive: file id -> bytes, with a log of every media download."""
+    files = {"a": _jpeg("red"), "b": _jpeg("green")}
+    downloads = []
+
+    def _download_to_file(file_id, fileobj, scope=drive.READONLY, **kwargs):
+        downloads.append(file_id)
+        if file_id not in files:
+            raise IOError(f"missing {file_id}")
+        fileobj.write(files[file_id])
+
+    monkeypatch.setattr(settings, "drive_enabled", True)
+    monkeypatch.setattr(drive, "download_to_file", _download_to_file)
+    monkeypatch.setattr(
+        drive, "get_metadata", lambda ids, fields="name, size": {i: {"name": f"{i}.jpg"} for i in ids if i in files}
+    )
+    return files, downloads
+
+
+def _request(input_, prefix="gs://bucket/run/", **options):
+    return NormalizeRequest(rendicionId="r1", input=input_, output={"gcsPrefix": prefix}, options=options or None)
+
+
+def test_drive_originals_are_downloaded_once(memory_backend, settings, drive_files):
+    files, downloads = drive_files
+    response = asyncio.run(
+        run_normalize(_request({"driveFileIds": ["a", "b", "gone"]}, uploadOriginals=True), settings)
+    )
+
+    assert sorted(downloads) == ["a", "b", "gone"]
+    assert [item.source.originalName for item in response.items] == ["a.jpg", "b.jpg"]
+    for item, fid in zip(response.items, ["a", "b"]):
+        assert gcs.download_bytes(item.normalized.originalGcsUri) == files[fid]
+    assert [w.code for w in response.warnings] == ["DRIVE_DOWNLOAD_FAILED"]
+
+
+def test_large_drive_inputs_spill_to_disk(memory_backend, monkeypatch, settings, drive_files):
+    files, downloads = drive_files
+    monkeypatch.setattr(settings, "normalize_upload_spool_bytes", 16)
+    response = asyncio.run(run_normalize(_request({"driveFileIds": ["a"]}, uploadOriginals=True), settings))
+    assert gcs.download_bytes(response.items[0].normalized.originalGcsUri) == files["a"]
+    assert downloads == ["a"]
+
+
+def test_content_index_reuses_earlier_results(memory_backend, settings):
+    data = base64.b64encode(_jpeg("blue")).decode()
+    request = _request({"files": [{"filename": "x.jpg", "contentBase64": data}]})
+    first = asyncio.run(run_normalize(request, settings))
+    uploads = gcs.stats()["memory"]["upload"]
+    second = asyncio.run(run_normalize(request, settings))
+    assert second.items[0].normalized == first.items[0].normalized
+    # Only the manifest is written again; the normalized image is reused from the index.
+    assert gcs.stats()["memory"]["upload"] - uploads <= 2
+
+
+def _zip(members) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in members:
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_zip_gcs_uri_is_spooled_and_read_in_name_order(memory_backend, monkeypatch, settings, tmp_path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    monkeypatch.setattr(settings, "normalize_spool_dir", str(spool_dir))
+    archive = _zip([("b.jpg", _jpeg("red")), ("docs/", b""), ("A.jpg", _jpeg("green")), ("notes.txt", b"hi")])
+    uri = gcs.upload_bytes(archive, "gs://bucket/in/receipts.zip")
+
+    response = asyncio.run(run_normalize(_request({"zipGcsUri": uri}), settings))
+
+    assert response.ok
+    assert [item.source.originalName for item in response.items] == ["A.jpg", "b.jpg"]
+    assert [w.code for w in response.warnings] == ["UNSUPPORTED_FILE_TYPE"]
+    # The archive is read through a temp file that is gone once the request finishes.
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_invalid_zip_gcs_uri(memory_backend, settings):
+    uri = gcs.upload_bytes(b"not a zip", "gs://bucket/in/broken.zip")
+    response = asyncio.run(run_normalize(_request({"zipGcsUri": uri}), settings))
+    assert not response.ok
+    assert response.error.code == "INVALID_ARGUMENT"
+
+
+def test_interrupted_run_resumes_from_journal(memory_backend, monkeypatch, settings):
+    monkeypatch.setattr(settings, "normalize_index_enabled", False)
+    monkeypatch.setattr(settings, "cpu_workers", 1)
+    images = {name: _jpeg(color) for name, color in [("a.jpg", "red"), ("b.jpg", "green"), ("c.jpg", "blue")]}
+    uri = gcs.upload_bytes(_zip(list(images.items())), "gs://bucket/in/receipts.zip")
+    by_data = {data: name for name, data in images.items()}
+    transformed = []
+    killed = []
+    real_transform = normalize.transform_entry
+
+    def flaky_transform(ext, data, *args):
+        transformed.append(by_data[data])
+        if by_data[data] == "c.jpg" and not killed:
+            killed.append(True)
+            raise RuntimeError("instance killed")
+        return real_transform(ext, data, *args)
+
+    monkeypatch.setattr(normalize, "transform_entry", flaky_transform)
+    first = asyncio.run(run_normalize(_request({"zipGcsUri": uri}), settings))
+    assert [item.source.originalName for item in first.items] == ["a.jpg", "b.jpg"]
+
+    transformed.clear()
+    second = asyncio.run(run_normalize(_request({"zipGcsUri": uri}), settings))
+    assert transformed == ["c.jpg"]
+    assert [item.source.originalName for item in second.items] == ["a.jpg", "b.jpg", "c.jpg"]
+    assert second.items[:2] == first.items
+
+    # Different options are a different run: nothing is resumed.
+    transformed.clear()
+    asyncio.run(run_normalize(_request({"zipGcsUri": uri}, maxSidePx=32), settings))
+    assert sorted(transformed) == ["a.jpg", "b.jpg", "c.jpg"]
+
+
+def test_pdf_rasterize_uploads_each_page(memory_backend, monkeypatch, settings):
+    import fitz
+
+    monkeypatch.setattr(settings, "cpu_workers", 1)
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page(width=612, height=792)
+    files = {"files": [{"filename": "statement.pdf", "contentBase64": base64.b64encode(doc.tobytes()).decode()}]}
+
+    response = asyncio.run(run_normalize(_request(files, pdfMode="rasterize", maxSidePx=300), settings))
+
+    artifact = response.items[0].normalized
+    assert artifact.mime == "application/pdf" and artifact.pageCount == 3
+    assert [page.pageNumber for page in artifact.pages] == [1, 2, 3]
+    for page in artifact.pages:
+        assert page.parentGcsUri == artifact.gcsUri
+        image = Image.open(io.BytesIO(gcs.download_bytes(page.gcsUri)))
+        assert max(image.size) == 300 and page.mime == "image/jpeg"
+
+    kept = asyncio.run(run_normalize(_request(files), settings))
+    assert kept.items[0].normalized.pages is None
+
+
+def test_content_index_is_keyed_by_options_and_prefix(memory_backend, monkeypatch, settings, tmp_path):
+    monkeypatch.setattr(settings, "normalize_journal_enabled", False)
+    monkeypatch.setattr(settings, "normalize_index_uri", str(tmp_path / "index"))
+    monkeypatch.setattr(settings, "cpu_workers", 1)
+    transforms = []
+    real_transform = normalize.transform_entry
+    monkeypatch.setattr(
+        normalize, "transform_entry", lambda *args: transforms.append(args[0]) or real_transform(*args)
+    )
+    data = base64.b64encode(_jpeg("blue")).decode()
+
+    def run(filename, prefix="gs://bucket/run/", **options):
+        files = {"files": [{"filename": filename, "contentBase64": data}]}
+        return asyncio.run(run_normalize(_request(files, prefix=prefix, **options), settings))
+
+    first = run("x.jpg")
+    # Same bytes under another name: reused without transforming.
+    renamed = run("renamed.jpg")
+    assert len(transforms) == 1
+    assert renamed.items[0].normalized == first.items[0].normalized
+    assert renamed.items[0].source.originalName == "renamed.jpg"
+
+    run("x.jpg", maxSidePx=20)
+    run("x.jpg", prefix="gs://bucket/other-run/")
+    assert len(transforms) == 3
+
+
+def test_process_pool_transform_matches_inline(memory_backend, monkeypatch, settings):
+    monkeypatch.setattr(settings, "normalize_index_enabled", False)
+    monkeypatch.setattr(settings, "normalize_journal_enabled", False)
+    files = {
+        "files": [
+            {"filename": f"{color}.jpg", "contentBase64": base64.b64encode(_jpeg(color)).decode()}
+            for color in ("red", "green", "blue", "white")
+        ]
+    }
+
+    def run(cpu_workers, prefix):
+        monkeypatch.setattr(settings, "cpu_workers", cpu_workers)
+        return asyncio.run(run_normalize(_request(files, prefix=prefix), settings))
+
+    inline = run(1, "gs://bucket/inline/")
+    try:
+        pooled = run(2, "gs://bucket/pooled/")
+        assert execution.get_cpu_pool(settings) is not None
+    finally:
+        execution.shutdown_cpu_pool()
+    assert [i.normalized.sha256 for i in pooled.items] == [i.normalized.sha256 for i in inline.items]
+    assert [i.source.originalName for i in pooled.items] == ["red.jpg", "green.jpg", "blue.jpg", "white.jpg"]
@@ -0,0 +1,111 @@
+import asyncio
+import io
+import json
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from src import gcs
+from src.services.normalize import _SpooledInput
+from src.services.normalize_upload import _MultipartFeed, run_normalize_upload
+
+BOUNDARY = "test-boundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+METADATA = {"rendicionId": "r1", "output": {"gcsPrefix": "gs://bucket/upload/"}}
+
+
+def _jpeg(color: str) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (40, 30), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _body(parts, closed=True) -> bytes:
+    out = b""
+    for name, filename, data in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        out += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    if closed:
+        out += f"--{BOUNDARY}--\r\n".encode()
+    return out
+
+
+async def _chunks(body: bytes, size: int = 7):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def _upload(body: bytes, settings, content_type: str = CONTENT_TYPE):
+    return asyncio.run(run_normalize_upload(content_type, _chunks(body), settings))
+
+
+def test_files_are_normalized_in_part_order(memory_backend, monkeypatch, settings):
+    monkeypatch.setattr(settings, "normalize_upload_spool_bytes", 64)  # spill to disk mid-part
+    images = {"b.jpg": _jpeg("red"), "a.jpg": _jpeg("green")}
+    body = _body(
+        [("metadata", None, json.dumps(METADATA).encode())]
+        + [("files", name, data) for name, data in images.items()]
+    )
+    response = _upload(body, settings)
+    assert response.ok
+    assert [item.source.originalName for item in response.items] == ["b.jpg", "a.jpg"]
+    for item in response.items:
+        assert gcs.download_bytes(item.normalized.gcsUri)
+
+
+def test_invalid_uploads(memory_backend, settings):
+    metadata = ("metadata", None, json.dumps(METADATA).encode())
+    image = ("files", "a.jpg", _jpeg("red"))
+    cases = {
+        "must come before": _body([image, metadata]),
+        "Missing 'metadata'": _body([("note", None, b"hi")]),
+        "Invalid 'metadata'": _body([("metadata", None, b"{not json")]),
+        "Truncated": _body([metadata, image], closed=False),
+    }
+    for message, body in cases.items():
+        response = _upload(body, settings)
+        assert not response.ok and response.error.code == "INVALID_ARGUMENT"
+        assert message in response.error.message, message
+
+    response = _upload(_body([metadata]), settings, content_type="application/json")
+    assert response.error.code == "INVALID_ARGUMENT"
+
+
+def test_disconnect_waits_for_the_worker_before_closing_spools(memory_backend, monkeypatch, settings):
+    events, write_threads = [], set()
+    entered = threading.Event()
+    real_load, real_close, real_write = _SpooledInput.__call__, _MultipartFeed.close, _MultipartFeed.write
+
+    def slow_load(self):
+        entered.set()
+        time.sleep(0.2)
+        data = real_load(self)  # raises on a closed spool
+        events.append("read")
+        return data
+
+    def write(self, chunk):
+        write_threads.add(threading.get_ident())
+        real_write(self, chunk)
+
+    monkeypatch.setattr(_SpooledInput, "__call__", slow_load)
+    monkeypatch.setattr(_MultipartFeed, "close", lambda self: (events.append("close"), real_close(self)))
+    monkeypatch.setattr(_MultipartFeed, "write", write)
+
+    body = _body([("metadata", None, json.dumps(METADATA).encode()), ("files", "a.jpg", _jpeg("red"))])
+
+    async def disconnecting():
+        yield body
+        await asyncio.to_thread(entered.wait, 1)
+        raise ConnectionError("client went away")
+
+    async def run():
+        loop_thread = threading.get_ident()
+        with pytest.raises(ConnectionError):
+            await run_normalize_upload(CONTENT_TYPE, disconnecting(), settings)
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    assert events == ["read", "close"]
+    assert loop_thread not in write_threads
@@ -0,0 +1,273 @@
+import contextlib
+import io
+import json
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from src import gcs
+from src.models import DocumentRef, ProcessReceiptsBatchRequest, ProcessStatementRequest
+from src.services import process_stage2
+from src.utils import sha256_bytes
+
+
+@pytest.fixture
+def fake_extract(monkeypatch):
+    """DocFlow stand-in: per_file returns a list (like docflow), aggregate a single result."""
+    calls = []
+
+    def _extract(docs, profile, settings, options, multi_mode):
+        calls.append([doc.display_name() for doc in docs])
+        if multi_mode == "aggregate":
+            rows = [{"detalle": doc.display_name()} for doc in docs]
+            return SimpleNamespace(data={"transacciones": rows}, meta={"mode": multi_mode})
+        return [
+            SimpleNamespace(data={"transacciones": [{"detalle": doc.display_name()}]}, meta={"mode": multi_mode})
+            for doc in docs
+        ]
+
+    monkeypatch.setattr(process_stage2, "_extract_with_retry", _extract)
+    monkeypatch.setattr(process_stage2, "_load_profile", lambda name, settings: SimpleNamespace(prompt=name))
+    return calls
+
+
+def _jpeg(color: str) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_repeated_single_image_statement_is_served_from_cache(memory_backend, settings, fake_extract):
+    uri = gcs.upload_bytes(_jpeg("white"), f"gs://bucket/{uuid.uuid4().hex}/statement.jpg")
+    request = ProcessStatementRequest(rendicionId="r1", statement={"gcsUri": uri})
+
+    first = process_stage2.run_process_statement(request, settings)
+    second = process_stage2.run_process_statement(request, settings)
+
+    assert first.ok and second.ok
+    assert first.data == {"transacciones": [{"detalle": "statement.jpg"}]}
+    assert second.data == first.data
+    assert second.meta == first.meta
+    assert len(fake_extract) == 1
+
+
+def test_repeated_one_page_windows_are_served_from_cache(memory_backend, settings, fake_extract):
+    run = uuid.uuid4().hex
+    colors = ["red", "green", "blue"]
+    pages = [{"gcsUri": gcs.upload_bytes(_jpeg(c), f"gs://bucket/{run}/p{i}.jpg")} for i, c in enumerate(colors)]
+    request = ProcessStatementRequest(
+        rendicionId="r1", statement=pages[0], pages=pages, options={"windowPages": 1}
+    )
+
+    first = process_stage2.run_process_statement(request, settings)
+    second = process_stage2.run_process_statement(request, settings)
+
+    assert first.ok and second.ok
+    assert [row["detalle"] for row in first.data["transacciones"]] == ["p0.jpg", "p1.jpg", "p2.jpg"]
+    assert second.data == first.data
+    assert len(fake_extract) == 3
+
+
+def test_limiter_shrinks_on_throttle_and_grows_back():
+    limiter = process_stage2.AdaptiveLimiter(max_limit=8, min_limit=2, decrease=0.5, cooldown=0.0)
+    limiter.on_throttle()
+    assert limiter.stats()["limit"] == 4
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.stats()["limit"] == 2  # never below min_limit
+    for _ in range(20):
+        limiter.on_success()
+    assert 4 <= limiter.stats()["limit"] < 8
+    for _ in range(200):
+        limiter.on_success()
+    assert limiter.stats()["limit"] == 8  # capped at max_limit
+
+
+def test_limiter_counts_a_burst_of_throttles_once():
+    limiter = process_stage2.AdaptiveLimiter(max_limit=8, decrease=0.5, cooldown=60.0)
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.stats()["limit"] == 4
+    assert limiter.stats()["throttled"] == 5
+
+
+def test_limiter_bounds_inflight_and_honours_retry_after():
+    limiter = process_stage2.AdaptiveLimiter(max_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    waiter.start()
+    assert not acquired.wait(0.1)
+    limiter.release()
+    assert acquired.wait(1)
+    waiter.join()
+    limiter.release()
+
+    limiter.on_throttle(retry_after=0.2)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.15
+    limiter.release()
+
+
+def test_retryable_errors_feed_the_limiter(monkeypatch, settings):
+    class QuotaError(Exception):
+        retry_after = 0.0
+
+    calls = []
+
+    def flaky_extract(**kwargs):
+        calls.append(1)
+        if len(calls) < 3:
+            raise QuotaError("429 resource exhausted")
+        return "ok"
+
+    limiter = process_stage2.AdaptiveLimiter(max_limit=4, cooldown=0.0)
+    monkeypatch.setattr(process_stage2, "get_rate_limiter", lambda settings: limiter)
+    monkeypatch.setattr(process_stage2, "extract", flaky_extract)
+    monkeypatch.setattr(process_stage2, "cancellable_sleep", lambda seconds: None)
+    monkeypatch.setattr(process_stage2._provider_pool, "lease", lambda *args: contextlib.nullcontext(None))
+
+    assert process_stage2._extract_with_retry([], None, settings, None, "per_file") == "ok"
+    stats = limiter.stats()
+    assert (stats["throttled"], stats["succeeded"], stats["inflight"]) == (2, 1, 0)
+    assert stats["limit"] == 2  # 4 -> 2 -> 1, then +1 on the success
+
+
+def _receipts_request(run: str, colors, **extra) -> ProcessReceiptsBatchRequest:
+    receipts = [{"gcsUri": gcs.upload_bytes(_jpeg(c), f"gs://bucket/{run}/r{i}.jpg")} for i, c in enumerate(colors)]
+    return ProcessReceiptsBatchRequest(rendicionId="r1", mode="efectivo", receipts=receipts, **extra)
+
+
+def test_receipt_stream_yields_start_rows_and_summary(memory_backend, settings, fake_extract):
+    request = _receipts_request(uuid.uuid4().hex, ["red", "green", "blue"])
+    events = list(process_stage2.iter_process_receipts_batch(request, settings))
+
+    assert [event.type for event in events] == ["start", "row", "row", "row", "summary"]
+    assert events[0].total == 3
+    rows = {event.index: event.row.data["transacciones"][0]["detalle"] for event in events[1:-1]}
+    assert rows == {0: "r0.jpg", 1: "r1.jpg", 2: "r2.jpg"}
+    assert events[-1].ok and events[-1].completed == 3
+
+
+def test_receipt_stream_reports_failure_in_summary(memory_backend, settings, fake_extract):
+    request = _receipts_request(uuid.uuid4().hex, ["red"])
+    request.receipts.append(DocumentRef(gcsUri="gs://bucket/missing/receipt.jpg"))
+    events = list(process_stage2.iter_process_receipts_batch(request, settings))
+
+    assert events[0].type == "start" and events[-1].type == "summary"
+    summary = events[-1]
+    assert not summary.ok and summary.error.code == "PROCESS_RECEIPTS_FAILED"
+    assert summary.completed == len(events) - 2
+
+
+@pytest.mark.parametrize("media_type", ["application/x-ndjson", "text/event-stream"])
+def test_receipt_stream_endpoint_formats(memory_backend, fake_extract, media_type):
+    from fastapi.testclient import TestClient
+
+    from src.main import app
+
+    request = _receipts_request(uuid.uuid4().hex, ["red", "green"])
+    # No `with`: the lifespan would shut down the process-wide pools other tests share.
+    response = TestClient(app).post(
+        "/v1/process_receipts_stream", json=request.model_dump(mode="json"), headers={"accept": media_type}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(media_type)
+    if media_type == "text/event-stream":
+        records = [block for block in response.text.split("\n\n") if block]
+        assert [block.splitlines()[0] for block in records] == [
+            "event: start", "event: row", "event: row", "event: summary"
+        ]
+        payloads = [json.loads(block.splitlines()[1].removeprefix("data: ")) for block in records]
+    else:
+        payloads = [json.loads(line) for line in response.text.splitlines()]
+    assert [p["type"] for p in payloads] == ["start", "row", "row", "summary"]
+    assert payloads[-1]["ok"] and payloads[-1]["completed"] == 2
+
+
+def test_prefetch_yields_in_arrival_order_within_lookahead():
+    gates = [threading.Event() for _ in range(4)]
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def _loader(idx):
+        def load():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            gates[idx].wait(1)
+            with lock:
+                active[0] -= 1
+            return b"x"
+
+        return load
+
+    sources = [process_stage2.BytesSource(f"s{i}", loader=_loader(i)) for i in range(4)]
+    arrivals = process_stage2._prefetch(sources, 2, lambda source: source.load())
+    gates[1].set()
+    assert next(arrivals)[0] == 1  # the slow first source does not hold up the second
+    for gate in gates:
+        gate.set()
+    assert sorted([1] + [idx for idx, _ in arrivals]) == [0, 1, 2, 3]
+    assert peak[0] <= 2
+
+
+def test_cached_receipts_with_known_hash_are_not_downloaded(memory_backend, settings, fake_extract):
+    run = uuid.uuid4().hex
+    receipts = []
+    # Colours unique to this run, so the first pass misses the shared extraction cache.
+    for i, color in enumerate([f"#{run[:6]}", f"#{run[6:12]}"]):
+        data = _jpeg(color)
+        uri = gcs.upload_bytes(data, f"gs://bucket/{run}/r{i}.jpg")
+        receipts.append({"gcsUri": uri, "sha256": sha256_bytes(data)})
+    request = ProcessReceiptsBatchRequest(rendicionId="r1", mode="efectivo", receipts=receipts)
+
+    first = process_stage2.run_process_receipts_batch(request, settings)
+    downloads = gcs.stats()["memory"]["download"]
+    second = process_stage2.run_process_receipts_batch(request, settings)
+
+    assert first.ok and second.ok and second.rows == first.rows
+    assert gcs.stats()["memory"]["download"] == downloads
+    assert len(fake_extract) == 2
+
+
+def test_batch_loader_fetches_pages_together_and_refetches_after_release(monkeypatch, settings):
+    batches, singles = [], []
+
+    def fetch_many(payloads, settings):
+        batches.append(len(payloads))
+        return [SimpleNamespace(unwrap=lambda p=p: p["driveFileId"].encode()) for p in payloads]
+
+    def fetch_bytes(payload, settings):
+        singles.append(payload["driveFileId"])
+        return payload["driveFileId"].encode()
+
+    monkeypatch.setattr(process_stage2, "fetch_many", fetch_many)
+    monkeypatch.setattr(process_stage2, "fetch_bytes", fetch_bytes)
+    loader = process_stage2._BatchLoader([DocumentRef(driveFileId=f"p{i}") for i in range(3)], settings)
+    sources = [loader.source(i) for i in range(3)]
+
+    assert [source.load() for source in sources] == [b"p0", b"p1", b"p2"]
+    assert batches == [3] and singles == []
+    sources[1].release()
+    assert sources[1].load() == b"p1"
+    assert batches == [3] and singles == ["p1"]
+
+
+def test_provider_pool_reuses_idle_providers(monkeypatch):
+    monkeypatch.setattr(process_stage2, "GeminiProvider", lambda project, location: object())
+    pool = process_stage2.ProviderPool()
+
+    with pool.lease("p", "us", "flash") as first:
+        with pool.lease("p", "us", "flash") as concurrent:
+            assert concurrent is not first  # never shared by two calls at once
+    with pool.lease("p", "us", "flash") as again:
+        assert again in (first, concurrent)
+    with pool.lease("p", "eu", "flash") as other:
+        assert other not in (first, concurrent)
+
+    assert pool.stats() == {"created": 3, "leases": 4, "idle": 3}
@@ -0,0 +1,38 @@
+import os
+
+from src.services import profile_registry
+from src.services.profile_registry import ProfileRegistry
+
+
+def _write_profile(root, name: str, prompt: str) -> None:
+    folder = root / "profiles" / name
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "prompt.txt").write_text(prompt)
+
+
+def test_profiles_are_cached_until_their_files_change(tmp_path, monkeypatch):
+    loads = []
+
+    def load_profile(name, config):
+        loads.append(name)
+        return (tmp_path / "profiles" / name / "prompt.txt").read_text()
+
+    monkeypatch.setattr(profile_registry.profiles, "load_profile", load_profile)
+    _write_profile(tmp_path, "lineas_gastos/v0", "first")
+    registry = ProfileRegistry(tmp_path)
+
+    assert registry.get("lineas_gastos/v0") == "first"
+    assert registry.get("lineas_gastos/v0") == "first"
+    assert loads == ["lineas_gastos/v0"]
+
+    prompt = tmp_path / "profiles" / "lineas_gastos/v0" / "prompt.txt"
+    prompt.write_text("second version")
+    stat = prompt.stat()
+    os.utime(prompt, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert registry.get("lineas_gastos/v0") == "second version"
+
+    _write_profile(tmp_path, "lineas_gastos/v1", "candidate")
+    assert registry.preload() == ["lineas_gastos/v0", "lineas_gastos/v1"]
+    stats = registry.stats()
+    assert stats["profiles"] == ["lineas_gastos/v0", "lineas_gastos/v1"]
+    assert (stats["loads"], stats["hits"]) == (3, 2)
@@ -0,0 +1,59 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+from PIL import Image
+
+from src.rasterize import RasterOptions, page_scale, parse_page_ranges, rasterize_pdf
+
+
+def _pdf(pages: int, size=(612, 792)) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=size[0], height=size[1])
+        page.insert_text((72, 72), f"page {i + 1}")
+    return doc.tobytes()
+
+
+def test_parse_page_ranges():
+    assert parse_page_ranges(None, 3) == [0, 1, 2]
+    assert parse_page_ranges("1-3,5", 10) == [0, 1, 2, 4]
+    assert parse_page_ranges("8-", 10) == [7, 8, 9]
+    assert parse_page_ranges("2,2,1", 3) == [0, 1]
+    assert parse_page_ranges("4-9", 3) == []
+    for bad in ("0", "3-1", "a"):
+        with pytest.raises(ValueError):
+            parse_page_ranges(bad, 5)
+
+
+def test_page_scale_caps_dpi():
+    # A letter page fitted to 1000px would need ~91 DPI; 2000px is capped at 200 DPI.
+    assert page_scale(612, 792, 1000, 200) == pytest.approx(1000 / 792)
+    assert page_scale(612, 792, 4000, 200) == pytest.approx(200 / 72)
+    assert page_scale(612, 792, 4000, None) == pytest.approx(4000 / 792)
+
+
+@pytest.mark.parametrize("fmt, pil_format", [("png", "PNG"), ("jpeg", "JPEG"), ("webp", "WEBP")])
+def test_rasterize_formats(fmt, pil_format):
+    pages = rasterize_pdf(_pdf(1), RasterOptions(max_side=400, fmt=fmt))
+    image = Image.open(io.BytesIO(pages[0].data))
+    assert image.format == pil_format
+    assert max(image.size) == 400 and image.size == (pages[0].width, pages[0].height)
+
+
+def test_parallel_rasterize_keeps_page_order():
+    data = _pdf(7)
+    opts = RasterOptions(max_side=200, pages="2-")
+    serial = rasterize_pdf(data, opts)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        parallel = rasterize_pdf(data, opts, executor, workers=3)
+    assert [p.page_number for p in parallel] == [2, 3, 4, 5, 6, 7]
+    assert [p.data for p in parallel] == [p.data for p in serial]
+
+
+def test_rasterize_rejects_empty_selection_and_unknown_format():
+    with pytest.raises(ValueError):
+        rasterize_pdf(_pdf(2), RasterOptions(max_side=200, pages="5-"))
+    with pytest.raises(ValueError):
+        rasterize_pdf(_pdf(2), RasterOptions(max_side=200, fmt="gif"))
@@ -0,0 +1,43 @@
+import threading
+
+from src.services.scheduler import ExtractionScheduler
+
+
+def test_sessions_are_served_round_robin():
+    scheduler = ExtractionScheduler(workers=1)
+    gate = threading.Event()
+    order = []
+    blocker = scheduler.session()
+    blocker.submit(gate.wait)
+
+    big, small = scheduler.session(), scheduler.session()
+    futures = [big.submit(order.append, f"big{i}") for i in range(3)]
+    futures.append(small.submit(order.append, "small0"))
+    gate.set()
+    for fut in futures:
+        fut.result(timeout=1)
+    # The small request does not wait behind the whole large batch.
+    assert order == ["big0", "small0", "big1", "big2"]
+
+
+def test_results_errors_and_close():
+    scheduler = ExtractionScheduler(workers=1)
+    gate, started = threading.Event(), threading.Event()
+    with scheduler.session() as session:
+        blocked = session.submit(lambda: started.set() or gate.wait())
+        started.wait(1)
+        failing = session.submit(lambda: 1 / 0)
+        pending = session.submit(lambda: "never")
+        other = scheduler.session()
+        ok = other.submit(lambda: 42)
+        session.close()
+        gate.set()
+        assert blocked.result(timeout=1) is True
+    assert failing.cancelled() and pending.cancelled()
+    assert ok.result(timeout=1) == 42
+
+    with scheduler.session() as session:
+        fut = session.submit(lambda: 1 / 0)
+        assert isinstance(fut.exception(timeout=1), ZeroDivisionError)
+    stats = scheduler.stats()
+    assert stats["failed"] == 1 and stats["cancelled"] == 2
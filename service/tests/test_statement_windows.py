@@ -0,0 +1,59 @@
+from src.services.statement_windows import merge_statement_windows, merge_transactions, plan_windows
+
+
+def _tx(detalle, importe=100.0, fecha="2024-01-05"):
+    return {"fecha": fecha, "detalle": detalle, "importe_uyu": importe}
+
+
+def test_plan_windows_edges():
+    assert plan_windows(0, 4, 1) == []
+    assert plan_windows(3, 4, 1) == [(0, 3)]
+    assert plan_windows(4, 4, 1) == [(0, 4)]
+    assert plan_windows(10, 4, 1) == [(0, 4), (3, 7), (6, 10)]
+    assert plan_windows(8, 4, 0) == [(0, 4), (4, 8)]
+    # Overlap >= size still advances one page at a time.
+    assert plan_windows(3, 2, 5) == [(0, 2), (1, 3)]
+
+
+def test_merge_without_overlap_keeps_identical_rows():
+    first = [_tx("a"), _tx("cafe")]
+    second = [_tx("cafe"), _tx("b")]
+    merged, dropped = merge_transactions([first, second], [(0, 4), (4, 8)])
+    assert dropped == 0
+    assert [tx["detalle"] for tx in merged] == ["a", "cafe", "cafe", "b"]
+    # No spans: nothing is deduplicated either.
+    assert merge_transactions([first, second])[1] == 0
+
+
+def test_merge_drops_rows_of_shared_page():
+    # Two pages per window, one shared (page 1): its two rows appear in both windows.
+    first = [_tx("a"), _tx("b"), _tx("c"), _tx("d")]
+    second = [_tx(" C "), _tx("d", importe=-100.0), _tx("e"), _tx("f")]
+    merged, dropped = merge_statement_windows(
+        [{"transacciones": first}, {"transacciones": second}], [(0, 2), (1, 3)]
+    )
+    assert dropped == 2
+    assert [tx["detalle"] for tx in merged["transacciones"]] == ["a", "b", "c", "d", "e", "f"]
+
+
+def test_merge_limits_dedup_to_shared_pages():
+    # Windows of four pages sharing one: at most one page worth of rows can repeat,
+    # so a longer common run is only partly dropped.
+    first = [_tx("x"), _tx("x"), _tx("x"), _tx("x")]
+    second = [_tx("x"), _tx("x"), _tx("x"), _tx("x")]
+    merged, dropped = merge_transactions([first, second], [(0, 4), (3, 7)])
+    assert dropped == 1
+    assert len(merged) == 7
+
+
+def test_merge_statement_header_and_totals():
+    parts = [
+        {"fecha_emision": "2024-01-31", "usuario": None, "total_uyu": None, "warnings": "w1", "transacciones": []},
+        {"usuario": "Ana", "total_uyu": 10.0, "warnings": "w1", "transacciones": []},
+        {"total_uyu": 250.0, "warnings": "w2", "transacciones": []},
+    ]
+    merged, _ = merge_statement_windows(parts, [(0, 4), (3, 7), (6, 9)])
+    assert merged["fecha_emision"] == "2024-01-31"
+    assert merged["usuario"] == "Ana"
+    assert merged["total_uyu"] == 250.0
+    assert merged["warnings"] == "w1\nw2"
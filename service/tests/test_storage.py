@@ -0,0 +1,132 @@
+import io
+import os
+
+import pytest
+from google.api_core.exceptions import NotFound, PreconditionFailed
+from pydantic import ValidationError
+
+from src import gcs
+from src.config import get_settings
+from src.models import DocumentRef, NormalizeOutput
+
+
+@pytest.fixture
+def local_root(monkeypatch, tmp_path):
+    root = tmp_path / "storage"
+    root.mkdir()
+    monkeypatch.setenv("REN_LOCAL_STORAGE_ROOT", str(root))
+    get_settings.cache_clear()
+    return root
+
+
+def test_file_uris_disabled_by_default(tmp_path):
+    with pytest.raises(ValueError, match="disabled"):
+        gcs.download_bytes("file:///etc/hostname")
+    with pytest.raises(ValueError, match="disabled"):
+        gcs.upload_bytes(b"x", f"file://{tmp_path}/x.txt")
+    assert not (tmp_path / "x.txt").exists()
+
+
+def test_request_models_reject_file_uris_by_default():
+    with pytest.raises(ValidationError):
+        DocumentRef(gcsUri="file:///etc/hostname")
+    with pytest.raises(ValidationError):
+        NormalizeOutput(gcsPrefix="file:///tmp/out/")
+    assert DocumentRef(gcsUri="gs://bucket/a.jpg").gcsUri == "gs://bucket/a.jpg"
+
+
+def test_local_backend_round_trip_inside_root(local_root):
+    uri = gcs.upload_bytes(b"data", f"file://{local_root}/a/b.txt")
+    assert gcs.download_bytes(uri) == b"data"
+    assert gcs.list_uris(f"file://{local_root}/a/") == [uri]
+    assert DocumentRef(gcsUri=uri).gcsUri == uri
+    gcs.delete_if_exists(uri)
+    with pytest.raises(NotFound):
+        gcs.download_bytes(uri)
+
+
+@pytest.mark.parametrize("suffix", ["/../outside.txt", "/sub/../../outside.txt"])
+def test_local_backend_rejects_parent_segments(local_root, suffix):
+    with pytest.raises(ValueError, match=r"'\.\.'"):
+        gcs.upload_bytes(b"x", f"file://{local_root}{suffix}")
+    assert not (local_root.parent / "outside.txt").exists()
+
+
+def test_local_backend_rejects_paths_outside_root(local_root, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "secret.txt").write_bytes(b"secret")
+    os.symlink(outside, local_root / "link")
+    with pytest.raises(ValueError, match="outside"):
+        gcs.download_bytes(f"file://{local_root}/link/secret.txt")
+    with pytest.raises(ValueError, match="outside"):
+        gcs.download_bytes(f"file://{outside}/secret.txt")
+
+
+def test_memory_backend_generation_precondition(memory_backend):
+    gcs.upload_if_generation(b"1", "gs://b/x", None)
+    _, generation = gcs.download_versioned("gs://b/x")
+    with pytest.raises(PreconditionFailed):
+        gcs.upload_if_generation(b"2", "gs://b/x", None)
+    gcs.upload_if_generation(b"2", "gs://b/x", generation)
+    with pytest.raises(PreconditionFailed):
+        gcs.upload_if_generation(b"3", "gs://b/x", generation)
+    assert gcs.download_bytes("gs://b/x") == b"2"
+
+
+def test_client_backend_uses_pooled_session(monkeypatch):
+    from google.auth.credentials import AnonymousCredentials
+
+    monkeypatch.setattr(gcs.google.auth, "default", lambda scopes=None: (AnonymousCredentials(), "proj"))
+    backend = gcs.ClientBackend(pool_size=24)
+    session = backend._client._http
+    assert isinstance(session, gcs.AuthorizedSession)
+    assert session.get_adapter("https://storage.googleapis.com/")._pool_maxsize == 24
+
+
+def _payload(size: int) -> bytes:
+    return bytes(range(256)) * (size // 256)
+
+
+def test_upload_stream_small_sources_go_in_one_request(memory_backend, settings):
+    uri = gcs.upload_stream(io.BytesIO(b"small"), "gs://b/small.txt", content_type="text/plain")
+    assert gcs.download_bytes(uri) == b"small"
+    assert memory_backend.content_type(uri) == "text/plain"
+
+
+def test_upload_stream_failed_source_leaves_no_object(memory_backend, monkeypatch, settings):
+    monkeypatch.setattr(settings, "gcs_resumable_threshold_bytes", 0)
+
+    def chunks():
+        yield b"partial"
+        raise IOError("source went away")
+
+    with pytest.raises(IOError):
+        gcs.upload_stream(chunks(), "gs://b/broken.bin")
+    assert gcs.download_bytes_if_exists("gs://b/broken.bin") is None
+    assert gcs.upload_stream(iter([b"a", b"", b"b"]), "gs://b/iter.bin") == "gs://b/iter.bin"
+    assert gcs.download_bytes("gs://b/iter.bin") == b"ab"
+
+
+def test_upload_stream_composite_in_two_levels(memory_backend, monkeypatch, settings):
+    chunk = 256 * 1024
+    monkeypatch.setattr(settings, "gcs_resumable_threshold_bytes", 0)
+    monkeypatch.setattr(settings, "gcs_composite_threshold_bytes", 1)
+    monkeypatch.setattr(settings, "gcs_composite_parts", 4)
+    monkeypatch.setattr(settings, "gcs_chunk_bytes", chunk)
+    composes = []
+    real_compose = memory_backend.compose
+
+    def compose(bucket, parts, path, content_type):
+        composes.append(len(parts))
+        return real_compose(bucket, parts, path, content_type)
+
+    monkeypatch.setattr(memory_backend, "compose", compose)
+    data = _payload(40 * chunk)
+    uri = gcs.upload_stream(io.BytesIO(data), "gs://b/out/big.pdf", content_type="application/pdf")
+
+    assert gcs.download_bytes(uri) == data
+    assert memory_backend.content_type(uri) == "application/pdf"
+    # 40 parts: two intermediate composes (32 + 8 sources), then the final one.
+    assert composes == [32, 8, 2]
+    assert gcs.list_uris("gs://b/out/") == ["gs://b/out/big.pdf"]
@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from PIL import Image
+
+from src.transform import Encoding, transform_entry
+from src.utils import RESAMPLE_TIERS, decode_resized, encode_within_budget
+
+
+def _photo(size=(400, 300), orientation=None, mode="RGB", fmt="JPEG") -> bytes:
+    img = Image.effect_noise(size, 64).convert(mode)
+    buf = io.BytesIO()
+    if orientation:
+        exif = img.getexif()
+        exif[0x0112] = orientation
+        img.save(buf, format=fmt, quality=92, exif=exif)
+    else:
+        img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("tier", sorted(RESAMPLE_TIERS))
+def test_decode_resized_fits_and_rotates(tier):
+    # EXIF 6: stored landscape, displayed portrait.
+    img = decode_resized(_photo(orientation=6), 200, tier)
+    assert img.size == (150, 200)
+    assert img.mode == "RGB"
+
+
+def test_decode_resized_keeps_small_images_and_converts_modes():
+    assert decode_resized(_photo(), 1000).size == (400, 300)
+    palette = decode_resized(_photo(mode="P", fmt="PNG"), 100)
+    assert (palette.mode, palette.size) == ("RGB", (100, 75))
+    rgba = decode_resized(_photo(mode="RGBA", fmt="PNG"), 1000)
+    assert rgba.mode == "RGB"
+
+
+def test_decode_resized_scales_16_bit_images():
+    gradient = Image.linear_gradient("L").resize((400, 300)).convert("I").point(lambda v: v * 257)
+    buf = io.BytesIO()
+    gradient.save(buf, format="PNG")
+    assert Image.open(io.BytesIO(buf.getvalue())).mode.startswith("I")
+
+    img = decode_resized(buf.getvalue(), 200)
+    assert (img.mode, img.size) == ("RGB", (200, 150))
+    top, bottom = img.getpixel((100, 2))[0], img.getpixel((100, 147))[0]
+    assert top < 16 and bottom > 240  # not clipped to white
+
+
+def test_encode_within_budget_picks_highest_fitting_quality():
+    img = Image.effect_noise((300, 300), 64).convert("RGB")
+    full, quality = encode_within_budget(img, "jpeg", 95, 20, 10**9)
+    assert quality == 95
+
+    target = len(full) // 3
+    out, quality = encode_within_budget(img, "jpeg", 95, 20, target)
+    assert len(out) <= target and 20 <= quality < 95
+    above, _ = encode_within_budget(img, "jpeg", quality + 1, quality + 1, 10**9)
+    assert len(above) > target
+
+    # Nothing fits: the min_quality encoding comes back.
+    out, quality = encode_within_budget(img, "webp", 90, 30, 10)
+    assert quality == 30 and len(out) > 10
+
+
+def test_transform_entry_encodings():
+    data = _photo(size=(800, 600))
+    webp = transform_entry("jpg", data, Encoding(fmt="webp", quality=80), 400)
+    assert (webp.mime, webp.ext, webp.width, webp.height) == ("image/webp", "webp", 400, 300)
+    assert Image.open(io.BytesIO(webp.data)).format == "WEBP"
+
+    progressive = transform_entry("jpg", data, Encoding(progressive=True), 400)
+    assert Image.open(io.BytesIO(progressive.data)).info.get("progressive")
+
+    budget = transform_entry("jpg", data, Encoding(quality=95, target_bytes=15_000, min_quality=30), 400)
+    assert len(budget.data) <= 15_000 or budget.quality == 30
+
+    with pytest.raises(ValueError):
+        transform_entry("gif", data, Encoding(), 400)